@@ -31,7 +31,10 @@ def calculate_max_reach(link_lengths):
     return sum(link_lengths)
 
 def calculate_workspace_volume(max_reach):
-    """구형 작업 범위 부피 계산"""
+    """
+    구형 작업 범위 부피 계산 (상한값)
+    실제 도달 가능한 부피는 3rd-week/workspace.py 의 Monte Carlo voxel 추정기로 계산
+    """
     return (4/3) * math.pi * (max_reach ** 3)
 
 def main():
@@ -68,6 +71,7 @@ def main():
     print(f"\n 최대 도달 거리 (팔을 최대한 펼쳤을 때): {max_reach:.2f} m")
     print(f"\n 구형 작업 공간 부피 (이론상 최대): {workspace_volume:.2f} m³")
     print(f" 해당 내용은 실제와 상이할수 있습니다. 실제 작업 범위는 링크의 배치, 관절의 제한 등 다양한 요소에 따라 달라질 수 있습니다.")
+    print(f" DH 파라미터 기반 실제 작업 공간 추정: python3 3rd-week/workspace.py --help")
 if __name__ == "__main__":
     main()
 
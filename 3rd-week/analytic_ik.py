@@ -0,0 +1,318 @@
+# UR 계열 6자유도 팔의 해석적(closed-form) 역기구학
+# olds/evasion.py, jaco-main.py, evasion-2.py 의 DH 테이블
+#   a = [0, -0.425, -0.392, 0, 0, 0], d = [0.089, 0, 0, 0.109, 0.095, 0.082]
+#   alpha = [π/2, 0, 0, π/2, -π/2, 0]
+# 과 같은 구조(2, 3, 4번 축 평행 + 손목 오프셋)면 한 pose 당 최대 8개 해가 닫힌 형태로 나옴
+# (θ1 2개) x (θ5 2개) x (θ3 팔꿈치 위/아래 2개)
+# 구조가 다르면 ik.IKSolver (DLS) 로 넘어감
+#
+# 사용법 (처리량 비교)
+# python3 analytic_ik.py --targets 20000
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from kinematics import RobotModel
+from ik import IKSolver, pose_error, wrap_angles
+
+UR_ALPHA = np.array([np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+
+def is_ur_geometry(model, atol=1e-9):
+    """해석해를 쓸 수 있는 UR 계열 DH 구조인지 확인"""
+    if model.n_joints != 6:
+        return False
+    a, d = model.a, model.d
+    return (np.allclose(model.alpha, UR_ALPHA, atol=atol)
+            and np.allclose(a[[0, 3, 4, 5]], 0.0, atol=atol)
+            and np.allclose(d[[1, 2]], 0.0, atol=atol)
+            and abs(a[1]) > atol and abs(a[2]) > atol and abs(d[5]) > atol)
+
+# --- Closed-form Solutions ---
+def ur_ik_all(model, T, q6_default=0.0):
+    """
+    T: (N, 4, 4) 또는 (4, 4) 목표 pose
+    returns: q (N, 8, 6) 라디안 [-π, π], valid (N, 8) bool
+    손목 특이점(sin θ5 ≈ 0) 에서는 θ6 을 q6_default (스칼라 또는 (N,)) 로 고정
+    """
+    T = np.asarray(T, dtype=float)
+    single = T.ndim == 2
+    if single:
+        T = T[None]
+    N = len(T)
+    a2, a3 = model.a[1], model.a[2]
+    d1, d4, d5, d6 = model.d[0], model.d[3], model.d[4], model.d[5]
+
+    R = T[:, :3, :3]
+    p = T[:, :3, 3]
+    z6 = R[:, :, 2]
+    p05 = p - d6 * z6
+
+    # θ1: frame 1 의 z 방향 성분이 d4 가 되어야 함 -> r sin(θ1 - ψ) = d4
+    r = np.hypot(p05[:, 0], p05[:, 1])
+    psi = np.arctan2(p05[:, 1], p05[:, 0])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        phi = np.arcsin(d4 / r)
+    q1 = np.stack([psi + phi, psi + np.pi - phi], axis=1)            # (N, 2)
+
+    q = np.full((N, 2, 2, 2, 6), np.nan)
+    valid = np.ones((N, 2, 2, 2), dtype=bool)
+    valid &= np.isfinite(q1)[:, :, None, None]
+
+    c1, s1 = np.cos(q1), np.sin(q1)
+    # 목표 pose 를 frame 1 기준으로: T16 = A1(θ1)⁻¹ T
+    # A1 = [[c1, 0, s1, 0], [s1, 0, -c1, 0], [0, 1, 0, d1]] 의 역변환
+    def to_frame1(v, is_point):
+        x, y, zc = v[:, 0, None], v[:, 1, None], v[:, 2, None]
+        if is_point:
+            zc = zc - d1
+        return np.stack([c1 * x + s1 * y, np.broadcast_to(zc, c1.shape), s1 * x - c1 * y], axis=-1)  # (N, 2, 3)
+
+    X1 = to_frame1(R[:, :, 0], False)
+    Y1 = to_frame1(R[:, :, 1], False)
+    Z1 = to_frame1(R[:, :, 2], False)
+    P1 = to_frame1(p, True)
+
+    # θ5: R16 = Rz(θ234) Ry(-θ5) Rz(θ6) 이므로 R16[2, 2] = cos θ5
+    c5 = np.clip(Z1[..., 2], -1.0, 1.0)
+    valid &= (np.abs(Z1[..., 2]) <= 1.0 + 1e-9)[:, :, None, None]
+    q5_base = np.arccos(c5)
+    q5 = np.stack([q5_base, -q5_base], axis=2)                         # (N, 2, 2)
+    s5 = np.sin(q5)
+
+    # θ6: R16[2, 0] = s5 c6, R16[2, 1] = -s5 s6
+    q6 = np.arctan2(-Y1[..., 2][:, :, None] * np.sign(s5), X1[..., 2][:, :, None] * np.sign(s5))
+    wrist_singular = np.abs(s5) < 1e-10
+    q6 = np.where(wrist_singular, np.broadcast_to(np.reshape(q6_default, (-1, 1, 1)), q6.shape), q6)
+
+    # θ234: R16 Rz(θ6)ᵀ Ry(-θ5)ᵀ = Rz(θ234), x 열만 필요
+    c6, s6 = np.cos(q6), np.sin(q6)
+    c5b = np.cos(q5)
+    # Rz(θ234) x축 = R16 (Ry(-θ5) Rz(θ6))ᵀ e_x = R16 [c5 c6, -c5 s6, -s5]
+    col_x = (X1[:, :, None, :] * (c5b * c6)[..., None]
+             - Y1[:, :, None, :] * (c5b * s6)[..., None]
+             - Z1[:, :, None, :] * s5[..., None])
+    q234 = np.arctan2(col_x[..., 1], col_x[..., 0])                   # (N, 2, 2)
+
+    # 손목 중심에서 frame 4 원점까지 되돌아감
+    p15 = P1[:, :, None, :] - d6 * Z1[:, :, None, :]
+    z4 = np.stack([np.sin(q234), -np.cos(q234), np.zeros_like(q234)], axis=-1)
+    p14 = p15 - d5 * z4
+    x, y = p14[..., 0], p14[..., 1]
+
+    # θ2, θ3: 평면 2R
+    c3 = (x * x + y * y - a2 * a2 - a3 * a3) / (2 * a2 * a3)
+    valid &= (np.abs(c3) <= 1.0 + 1e-9)[..., None]
+    q3_base = np.arccos(np.clip(c3, -1.0, 1.0))
+    q3 = np.stack([q3_base, -q3_base], axis=-1)                       # (N, 2, 2, 2)
+    q2 = np.arctan2(y, x)[..., None] - np.arctan2(a3 * np.sin(q3), a2 + a3 * np.cos(q3))
+    q4 = q234[..., None] - q2 - q3
+
+    q[..., 0] = q1[:, :, None, None]
+    q[..., 1] = q2
+    q[..., 2] = q3
+    q[..., 3] = q4
+    q[..., 4] = q5[..., None]
+    q[..., 5] = q6[..., None]
+    q = wrap_angles(q.reshape(N, 8, 6))
+    valid = valid.reshape(N, 8) & np.all(np.isfinite(q), axis=-1)
+    if single:
+        return q[0], valid[0]
+    return q, valid
+
+def ur_ik_single(model, T, q6_default=0.0):
+    """
+    ur_ik_all 의 pose 1개 버전 (math 모듈만 사용, numpy 호출 오버헤드 없음)
+    returns: 유효한 해들의 list [(q1, ..., q6), ...], 최대 8개
+    """
+    a2, a3 = float(model.a[1]), float(model.a[2])
+    d1, d4, d5, d6 = (float(model.d[k]) for k in (0, 3, 4, 5))
+    (r00, r01, r02, px), (r10, r11, r12, py), (r20, r21, r22, pz) = (
+        [float(v) for v in row] for row in T[:3])
+
+    x05, y05 = px - d6 * r02, py - d6 * r12
+    r = math.hypot(x05, y05)
+    if r < abs(d4):
+        return []
+    psi = math.atan2(y05, x05)
+    phi = math.asin(d4 / r)
+
+    solutions = []
+    for q1 in (psi + phi, psi + math.pi - phi):
+        c1, s1 = math.cos(q1), math.sin(q1)
+        # frame 1 기준 벡터: (c1 x + s1 y, z, s1 x - c1 y)
+        X1 = (c1 * r00 + s1 * r10, r20, s1 * r00 - c1 * r10)
+        Y1 = (c1 * r01 + s1 * r11, r21, s1 * r01 - c1 * r11)
+        Z1 = (c1 * r02 + s1 * r12, r22, s1 * r02 - c1 * r12)
+        P1 = (c1 * px + s1 * py, pz - d1, s1 * px - c1 * py)
+        if abs(Z1[2]) > 1.0 + 1e-9:
+            continue
+        q5_base = math.acos(max(-1.0, min(1.0, Z1[2])))
+        for q5 in (q5_base, -q5_base):
+            s5, c5 = math.sin(q5), math.cos(q5)
+            if abs(s5) < 1e-10:
+                q6 = q6_default
+            else:
+                sign = 1.0 if s5 > 0 else -1.0
+                q6 = math.atan2(-Y1[2] * sign, X1[2] * sign)
+            c6, s6 = math.cos(q6), math.sin(q6)
+            cx = X1[0] * c5 * c6 - Y1[0] * c5 * s6 - Z1[0] * s5
+            cy = X1[1] * c5 * c6 - Y1[1] * c5 * s6 - Z1[1] * s5
+            q234 = math.atan2(cy, cx)
+            x = P1[0] - d6 * Z1[0] - d5 * math.sin(q234)
+            y = P1[1] - d6 * Z1[1] + d5 * math.cos(q234)
+            c3 = (x * x + y * y - a2 * a2 - a3 * a3) / (2 * a2 * a3)
+            if abs(c3) > 1.0 + 1e-9:
+                continue
+            q3_base = math.acos(max(-1.0, min(1.0, c3)))
+            for q3 in (q3_base, -q3_base):
+                q2 = math.atan2(y, x) - math.atan2(a3 * math.sin(q3), a2 + a3 * math.cos(q3))
+                q4 = q234 - q2 - q3
+                solutions.append(tuple((v + math.pi) % (2 * math.pi) - math.pi
+                                       for v in (q1, q2, q3, q4, q5, q6)))
+    return solutions
+
+def select_nearest(q_all, valid, seed):
+    """
+    q_all (N, 8, n) 중 seed (N, n) 에 가장 가까운 유효 해 선택 (관절각 차이는 wrap 해서 비교)
+    returns: q (N, n) (seed 근처로 풀린 각도), found (N,) bool
+    """
+    diff = wrap_angles(q_all - seed[:, None, :])
+    dist = np.where(valid, np.sum(diff * diff, axis=-1), np.inf)
+    best = np.argmin(dist, axis=1)
+    rows = np.arange(len(q_all))
+    return seed + diff[rows, best], np.isfinite(dist[rows, best])
+
+# --- Solver ---
+class AnalyticIKSolver:
+    """
+    IKSolver 와 같은 solve(targets, q0) 인터페이스
+    UR 구조면 closed-form 8개 해 중 seed 에 가장 가까운 해, 아니면 IKSolver(DLS) 로 대체
+    verify=True 면 선택한 해를 batched FK 로 다시 확인 (tol 안 넘는 해만 converged)
+    """
+
+    def __init__(self, model, tol=1e-6, verify=True, fallback=None):
+        self.model = model
+        self.tol = tol
+        self.verify = verify
+        self.analytic = is_ur_geometry(model)
+        self.fallback = fallback if fallback is not None else IKSolver(model, tol=tol)
+        self.last_solution = None
+
+    def solve(self, targets, q0=None):
+        if not self.analytic:
+            return self.fallback.solve(targets, q0)
+
+        start = time.perf_counter()
+        targets = np.asarray(targets, dtype=float)
+        if targets.ndim == 2:
+            return self._solve_single(targets, q0, start)
+        N = len(targets)
+        if q0 is not None:
+            seed = np.array(np.broadcast_to(q0, (N, 6)), dtype=float)
+        elif self.last_solution is not None and self.last_solution.shape == (N, 6):
+            seed = self.last_solution
+        else:
+            seed = np.zeros((N, 6))
+
+        q_all, valid = ur_ik_all(self.model, targets, q6_default=seed[:, 5])
+        q, found = select_nearest(q_all, valid, seed)
+
+        error = np.full(N, np.inf)
+        if self.verify:
+            T, _ = self.model.forward_kinematics_batch(q)
+            error[found] = np.linalg.norm(pose_error(T[found], targets[found]), axis=1)
+            converged = error < self.tol
+        else:
+            error[found] = 0.0
+            converged = found
+
+        self.last_solution = q.copy()
+        elapsed = time.perf_counter() - start
+        info = {
+            "converged": converged,
+            "iterations": np.zeros(N, dtype=np.int64),
+            "error": error,
+            "n_solutions": valid.sum(axis=1),
+            "elapsed": elapsed,
+            "solves_per_sec": N / elapsed if elapsed > 0 else float("inf"),
+            "mean_iterations": 0.0,
+        }
+        return q, info
+
+    def _solve_single(self, target, q0, start):
+        # pose 1개: math 기반 경로로 numpy 오버헤드 없이 일정한 지연시간
+        if q0 is not None:
+            seed = [float(v) for v in q0]
+        elif self.last_solution is not None and self.last_solution.shape == (6,):
+            seed = self.last_solution.tolist()
+        else:
+            seed = [0.0] * 6
+        best, best_dist = None, math.inf
+        solutions = ur_ik_single(self.model, target, q6_default=seed[5])
+        for sol in solutions:
+            diff = [(s - q + math.pi) % (2 * math.pi) - math.pi for s, q in zip(sol, seed)]
+            dist = sum(v * v for v in diff)
+            if dist < best_dist:
+                best = [q + v for q, v in zip(seed, diff)]
+                best_dist = dist
+        q = np.array(best if best is not None else seed)
+
+        error = math.inf
+        if best is not None:
+            if self.verify:
+                T, _ = self.model.forward_kinematics(q)
+                error = float(np.linalg.norm(pose_error(T, target)))
+            else:
+                error = 0.0
+        self.last_solution = q.copy()
+        elapsed = time.perf_counter() - start
+        info = {
+            "converged": np.array([error < self.tol]),
+            "iterations": np.zeros(1, dtype=np.int64),
+            "error": np.array([error]),
+            "n_solutions": np.array([len(solutions)]),
+            "elapsed": elapsed,
+            "solves_per_sec": 1 / elapsed if elapsed > 0 else float("inf"),
+            "mean_iterations": 0.0,
+        }
+        return q, info
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytic vs DLS IK throughput (UR5 table)")
+    parser.add_argument("--targets", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = RobotModel([0, -0.425, -0.392, 0, 0, 0], [0.089, 0, 0, 0.109, 0.095, 0.082], UR_ALPHA)
+    rng = np.random.default_rng(args.seed)
+    q_true = rng.uniform(-np.pi, np.pi, size=(args.targets, 6))
+    targets = model.forward_kinematics_batch(q_true)[0].copy()
+    q0 = q_true + rng.normal(0, 0.3, q_true.shape)
+
+    analytic = AnalyticIKSolver(model)
+    q, info = analytic.solve(targets, q0)
+    print(f"analytic : {info['solves_per_sec']:12,.0f} solves/sec, converged {info['converged'].mean() * 100:.2f} %, "
+          f"max error {info['error'][info['converged']].max():.1e}, "
+          f"same branch as q_true {np.mean(np.all(np.abs(wrap_angles(q - q_true)) < 1e-6, axis=1)) * 100:.1f} %")
+
+    n_dls = min(args.targets, 2000)
+    _, info = IKSolver(model).solve(targets[:n_dls], q0[:n_dls])
+    print(f"DLS      : {info['solves_per_sec']:12,.0f} solves/sec, converged {info['converged'].mean() * 100:.2f} %")
+
+    # 지연시간 분포 (pose 1개씩), FK 재확인 포함/미포함
+    for verify in (False, True):
+        solver = AnalyticIKSolver(model, verify=verify)
+        lat = []
+        for k in range(1000):
+            t0 = time.perf_counter()
+            solver.solve(targets[k], q0[k])
+            lat.append(time.perf_counter() - t0)
+        lat = np.array(lat) * 1e6
+        print(f"single-pose latency (verify={verify}): p50 {np.percentile(lat, 50):.1f} us, "
+              f"p99 {np.percentile(lat, 99):.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# FK 처리량 비교 벤치마크 (configs/sec)
+# 기존 forward_kinematics 루프 vs forward_kinematics_batch
+# 슬라이더 update() 1회당 지연시간: forward_kinematics + jacobian vs forward_kinematics_jacobian (+ RobotModel)
+# 관절 하나만 움직일 때: RobotModel 전체 재계산 vs KinematicState 증분 갱신
+# out= 버퍼 (KinematicsBuffers) 경로의 이벤트당 시간 + 할당 검사 (실패하면 exit code 1)
+#
+# 사용법
+# python3 bench_kinematics.py
+# python3 bench_kinematics.py --n 200000
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from kinematics import RobotModel, KinematicState, forward_kinematics, jacobian, forward_kinematics_jacobian, forward_kinematics_batch
+
+# UR5 계열 DH 테이블 (olds/evasion.py 와 동일)
+UR5_A = np.array([0, -0.425, -0.392, 0, 0, 0])
+UR5_D = np.array([0.089, 0, 0, 0.109, 0.095, 0.082])
+UR5_ALPHA = np.array([np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+
+def bench_loop(theta, a, d, alpha):
+    start = time.perf_counter()
+    for row in theta:
+        forward_kinematics(row, a, d, alpha)
+    return time.perf_counter() - start
+
+def bench_batch(theta, a, d, alpha):
+    start = time.perf_counter()
+    forward_kinematics_batch(theta, a, d, alpha)
+    return time.perf_counter() - start
+
+def bench_event_separate(theta, a, d, alpha):
+    start = time.perf_counter()
+    for row in theta:
+        forward_kinematics(row, a, d, alpha)
+        jacobian(row, a, d, alpha)
+    return (time.perf_counter() - start) / len(theta)
+
+def bench_event_fused(theta, *robot_params):
+    start = time.perf_counter()
+    for row in theta:
+        forward_kinematics_jacobian(row, *robot_params)
+    return (time.perf_counter() - start) / len(theta)
+
+def bench_single_joint(model, joint, values, incremental, with_jacobian=True):
+    """관절 joint 만 values 로 바꿔가며 이벤트당 시간"""
+    theta = np.full(model.n_joints, 0.3)
+    state = KinematicState(model, theta)
+    start = time.perf_counter()
+    if incremental:
+        for v in values:
+            state.set_joint(joint, v)
+            if with_jacobian:
+                state.forward_kinematics_jacobian()
+            else:
+                state.forward_kinematics()
+    else:
+        for v in values:
+            theta[joint] = v
+            if with_jacobian:
+                model.forward_kinematics_jacobian(theta)
+            else:
+                model.forward_kinematics(theta)
+    return (time.perf_counter() - start) / len(values)
+
+def peak_bytes_per_call(fn, calls=200, warmup=5):
+    """
+    warm-up 뒤 tracemalloc 으로 호출 한번 동안 새로 잡힌 메모리의 최대값 (bytes) 과 calls 번 호출 뒤 누적 증가량
+    NumPy 배열 데이터도 tracemalloc 에 잡힘. ufunc 호출 자체의 파이썬 쪽 bookkeeping 이 수백 bytes 있으므로
+    판정은 "가장 작은 배열 임시값보다 작은가" 로 함 (check_allocations)
+    """
+    for _ in range(warmup):
+        fn()
+    tracemalloc.start()
+    try:
+        for _ in range(warmup):
+            fn()
+        get, reset = tracemalloc.get_traced_memory, tracemalloc.reset_peak
+        start = get()[0]
+        worst = 0
+        for _ in range(calls):
+            reset()
+            before = get()[0]
+            fn()
+            worst = max(worst, get()[1] - before)
+        growth = get()[0] - start
+    finally:
+        tracemalloc.stop()
+    return worst, growth
+
+def check_allocations(rng, budget=1024):
+    """
+    out= 경로가 warm-up 뒤 새 NumPy 배열을 만들지 않는지 검사
+    ufunc / iterator bookkeeping 은 배열 크기와 무관하게 수백 bytes 이하이므로,
+    임시 배열이 하나라도 생기면 budget 보다 훨씬 커지도록 모양을 고름:
+        단일 자세: 관절 1024 개짜리 체인 -> (n,) 임시값만 해도 8 KB
+        batch    : UR5 4096 자세 -> 자세별 임시값은 32 KB 이상
+    (4x4 하나 크기의 임시값은 bookkeeping 과 구분이 안되므로 단일 자세도 batch 와 같은 코드를 씀)
+    returns: 전부 통과하면 True
+    """
+    n_long = 1024
+    long_chain = RobotModel(rng.uniform(-0.1, 0.1, n_long), rng.uniform(-0.1, 0.1, n_long),
+                            rng.choice([0.0, np.pi / 2, -np.pi / 2], n_long))
+    ur5 = RobotModel(UR5_A, UR5_D, UR5_ALPHA)
+    q_long = rng.uniform(-np.pi, np.pi, n_long)
+    q_ur5 = rng.uniform(-np.pi, np.pi, 6)
+    q_batch = rng.uniform(-np.pi, np.pi, (4096, 6))
+    buf_long, buf_ur5, buf_batch = long_chain.buffers(), ur5.buffers(), ur5.buffers(len(q_batch))
+
+    cases = [
+        ("FK+J out=, 1024-joint chain", lambda: long_chain.forward_kinematics_jacobian(q_long, out=buf_long), True),
+        ("FK+J out=, UR5 batch 4096", lambda: ur5.forward_kinematics_jacobian_batch(q_batch, out=buf_batch), True),
+        ("FK   out=, UR5 batch 4096", lambda: ur5.forward_kinematics_batch(q_batch, out=buf_batch), True),
+        ("FK+J out=, UR5", lambda: ur5.forward_kinematics_jacobian(q_ur5, out=buf_ur5), True),
+        ("FK+J returning arrays, UR5", lambda: ur5.forward_kinematics_jacobian(q_ur5), False),
+        ("FK+J returning arrays, UR5 batch 4096", lambda: ur5.forward_kinematics_jacobian_batch(q_batch), False),
+    ]
+    ok = True
+    print(f"\nallocations per call (tracemalloc, budget {budget} B)   peak (B)  growth (B)")
+    for label, fn, checked in cases:
+        peak, growth = peak_bytes_per_call(fn)
+        if checked:
+            passed = peak < budget and growth < budget
+            ok &= passed
+            verdict = "ok" if passed else "FAIL"
+        else:
+            verdict = "(reference)"
+        print(f"{label:48s}{peak:10d}  {growth:10d}  {verdict}")
+    return ok
+
+def bench_out_event(model, theta, buffers=None):
+    start = time.perf_counter()
+    if buffers is None:
+        for row in theta:
+            model.forward_kinematics_jacobian(row)
+    else:
+        for row in theta:
+            model.forward_kinematics_jacobian(row, out=buffers)
+    return (time.perf_counter() - start) / len(theta)
+
+def check_exact(theta, a, d, alpha, samples=500):
+    T_b, pos_b = forward_kinematics_batch(theta[:samples], a, d, alpha)
+    for k in range(min(samples, len(theta))):
+        T, positions = forward_kinematics(theta[k], a, d, alpha)
+        if not (np.array_equal(T, T_b[k]) and np.array_equal(np.array(positions), pos_b[k, 1:])):
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="FK throughput benchmark")
+    parser.add_argument("--n", type=int, default=100000, help="number of joint configurations")
+    parser.add_argument("--loop-n", type=int, default=20000, help="configurations timed with the scalar loop")
+    parser.add_argument("--events", type=int, default=5000, help="slider events timed for the FK+Jacobian path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    theta = rng.uniform(-np.pi, np.pi, size=(args.n, len(UR5_A)))
+
+    print("exact match :", check_exact(theta, UR5_A, UR5_D, UR5_ALPHA))
+
+    loop_n = min(args.loop_n, args.n)
+    t_loop = bench_loop(theta[:loop_n], UR5_A, UR5_D, UR5_ALPHA)
+    t_batch = bench_batch(theta, UR5_A, UR5_D, UR5_ALPHA)
+
+    loop_rate = loop_n / t_loop
+    batch_rate = args.n / t_batch
+    print(f"loop  : {loop_rate:12.0f} configs/sec ({loop_n} configs, {t_loop:.3f} s)")
+    print(f"batch : {batch_rate:12.0f} configs/sec ({args.n} configs, {t_batch:.3f} s)")
+    print(f"speedup: {batch_rate / loop_rate:.1f}x")
+
+    # update() 에서 쓰는 FK + Jacobian 경로
+    events = theta[:args.events]
+    t_sep = bench_event_separate(events, UR5_A, UR5_D, UR5_ALPHA)
+    t_fused = bench_event_fused(events, UR5_A, UR5_D, UR5_ALPHA)
+    print(f"\nper-event FK+J (separate): {t_sep * 1e6:8.1f} us")
+    t_model = bench_event_fused(events, RobotModel(UR5_A, UR5_D, UR5_ALPHA))
+    print(f"per-event FK+J (fused)   : {t_fused * 1e6:8.1f} us")
+    print(f"per-event FK+J (model)   : {t_model * 1e6:8.1f} us")
+    print(f"speedup: {t_sep / t_fused:.1f}x (fused), {t_sep / t_model:.1f}x (model)")
+
+    # 슬라이더 하나만 움직이는 경우 (증분 FK)
+    model = RobotModel(UR5_A, UR5_D, UR5_ALPHA)
+    values = rng.uniform(-np.pi, np.pi, args.events)
+    print("\nsingle-joint event      full (us)  incremental (us)  ratio")
+    for label, with_jacobian in [("FK", False), ("FK+J", True)]:
+        for joint in (0, model.n_joints - 1):
+            t_full = bench_single_joint(model, joint, values, False, with_jacobian)
+            t_inc = bench_single_joint(model, joint, values, True, with_jacobian)
+            print(f"{label:4s} joint {joint + 1}          {t_full * 1e6:8.1f}   {t_inc * 1e6:8.1f}      {t_inc / t_full:5.2f}")
+
+    # 미리 잡아둔 out= 버퍼 (제어 루프처럼 매 호출 같은 버퍼)
+    t_ret = bench_out_event(model, events)
+    t_out = bench_out_event(model, events, model.buffers())
+    print(f"\nper-event FK+J (returning arrays): {t_ret * 1e6:8.1f} us")
+    print(f"per-event FK+J (out= buffers)    : {t_out * 1e6:8.1f} us ({t_ret / t_out:.1f}x)")
+    buffers = model.buffers(len(theta))
+    model.forward_kinematics_jacobian_batch(theta, out=buffers)
+    start = time.perf_counter()
+    model.forward_kinematics_jacobian_batch(theta)
+    t_ret = time.perf_counter() - start
+    start = time.perf_counter()
+    model.forward_kinematics_jacobian_batch(theta, out=buffers)
+    t_out = time.perf_counter() - start
+    print(f"batch FK+J (returning arrays)    : {args.n / t_ret:12,.0f} configs/sec")
+    print(f"batch FK+J (out= buffers)        : {args.n / t_out:12,.0f} configs/sec ({t_ret / t_out:.1f}x)")
+
+    ok = check_allocations(rng)
+    print("zero-allocation check:", "passed" if ok else "FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+# 기구학 마이크로 벤치마크 + 회귀 검사
+# dh_matrix (2nd-Week/DyTransform.py), dh_transform, forward_kinematics, jacobian, plot_robot 과
+# batch 버전들을 관절 수 / batch 크기별로 측정하고, 머신별 JSON baseline 과 비교
+#   - 측정값은 호출 1번당 시간. 반복 횟수는 한 번 측정이 min_time 이상 되도록 자동으로 정하고
+#     전체 항목을 repeats 바퀴 돌아가며 잰 것 중 최소값을 씀 (노이즈는 거의 항상 느려지는 쪽이라서)
+#   - threshold 를 넘은 항목은 바퀴 수를 늘려 한번 더 재고, 그래도 넘으면 회귀로 판정
+#     (vCPU 1개짜리 공유 VM 처럼 머신 전체 속도가 수 초 단위로 1.5배씩 오가는 곳에서는 --threshold 0.5 정도 필요)
+#   - baseline 은 benchmarks/<호스트>-<아키텍처>.json. numpy / python 버전도 같이 저장하고
+#     다르면 경고만 출력
+#   - baseline 보다 threshold 이상 느려진 항목이 하나라도 있으면 exit code 1
+#
+# 사용법
+# python3 bench_suite.py --save              # 이 머신의 baseline 저장 (처음 한번, 또는 의도한 변경 후)
+# python3 bench_suite.py                     # baseline 과 비교, 25% 이상 느려지면 실패
+# python3 bench_suite.py --filter batch --threshold 0.1
+# python3 bench_suite.py --quick --no-plot
+
+import argparse
+import fnmatch
+import importlib.util
+import json
+import os
+import platform
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from kinematics import (RobotModel, dh_transform, dh_transform_batch, forward_kinematics,
+                        forward_kinematics_batch, forward_kinematics_jacobian,
+                        forward_kinematics_jacobian_batch, jacobian)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(HERE, "benchmarks")
+FORMAT_VERSION = 1
+
+# --- Timing ---
+def _time_calls(fn, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+def calibrate(fn, min_time=0.02):
+    """측정 1번이 min_time 이상 걸리는 호출 횟수"""
+    number = 1
+    while True:
+        elapsed = _time_calls(fn, number)
+        if elapsed >= min_time:
+            return number
+        # 한번에 목표까지 키우되 너무 크게 뛰지 않게
+        number = max(number * 2, min(number * 10, int(number * min_time / max(elapsed, 1e-9)) + 1))
+
+def measure(cases, min_time=0.02, repeats=7):
+    """
+    cases: (key, fn) 리스트 -> dict key -> best / median / number (fn() 1번당 초)
+    항목 하나를 repeats 번 연달아 재지 않고 전체를 repeats 바퀴 돌아가며 잼.
+    공유 머신에서는 클럭/이웃 부하 때문에 수 초 단위로 빨라졌다 느려졌다 하는데, 연달아 재면
+    한 항목이 통째로 느린 구간에 걸릴 수 있음. 돌아가며 재고 최소값을 쓰면 모든 항목이 여러 구간에서 뽑힘
+    """
+    numbers = [calibrate(fn, min_time) for _, fn in cases]
+    times = np.empty((repeats, len(cases)))
+    for rep in range(repeats):
+        for j, ((_, fn), number) in enumerate(zip(cases, numbers)):
+            times[rep, j] = _time_calls(fn, number) / number
+    return {key: {"best": float(times[:, j].min()), "median": float(np.median(times[:, j])),
+                  "number": numbers[j]}
+            for j, (key, _) in enumerate(cases)}
+
+# --- Cases ---
+def _load_dy_transform():
+    # 2nd-Week 는 패키지가 아니고 디렉토리 이름에 - 가 있어서 파일 경로로 import
+    path = os.path.join(HERE, os.pardir, "2nd-Week", "DyTransform.py")
+    spec = importlib.util.spec_from_file_location("DyTransform", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _random_dh(n, rng):
+    # UR 계열처럼 alpha 는 0, ±π/2 중에서, 길이는 0.1 m 안팎
+    a = rng.uniform(-0.4, 0.4, n) * (rng.random(n) < 0.6)
+    d = rng.uniform(0.0, 0.15, n)
+    alpha = rng.choice([0.0, np.pi / 2, -np.pi / 2], n)
+    return a, d, alpha
+
+def case_key(name, **params):
+    if not params:
+        return name
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+def build_cases(joint_counts, batch_sizes, plot=True, seed=0):
+    """
+    (key, fn, items) 리스트. items 는 호출 1번에 처리하는 configuration 수 (처리량 계산용)
+    입력은 미리 만들어 두고 fn 안에서는 측정 대상 함수만 호출
+    """
+    rng = np.random.default_rng(seed)
+    cases = []
+
+    dy = _load_dy_transform()
+    theta, d, a, alpha = rng.uniform(-np.pi, np.pi, 4)
+    cases.append((case_key("dh_matrix"), lambda: dy.dh_matrix(theta, d, a, alpha), 1))
+    cases.append((case_key("dh_transform"), lambda: dh_transform(theta, d, a, alpha), 1))
+
+    for n in joint_counts:
+        a_n, d_n, alpha_n = _random_dh(n, rng)
+        model = RobotModel(a_n, d_n, alpha_n)
+        q = rng.uniform(-np.pi, np.pi, n)
+        single = model.buffers()
+
+        def add(name, fn, items=1, **params):
+            cases.append((case_key(name, joints=n, **params), fn, items))
+
+        add("forward_kinematics", lambda q=q, a=a_n, d=d_n, al=alpha_n: forward_kinematics(q, a, d, al))
+        add("jacobian", lambda q=q, a=a_n, d=d_n, al=alpha_n: jacobian(q, a, d, al))
+        add("forward_kinematics_jacobian",
+            lambda q=q, a=a_n, d=d_n, al=alpha_n: forward_kinematics_jacobian(q, a, d, al))
+        add("model.forward_kinematics", lambda m=model, q=q: m.forward_kinematics(q))
+        add("model.jacobian", lambda m=model, q=q: m.jacobian(q))
+        add("model.forward_kinematics_jacobian", lambda m=model, q=q: m.forward_kinematics_jacobian(q))
+        add("model.forward_kinematics_jacobian.out",
+            lambda m=model, q=q, b=single: m.forward_kinematics_jacobian(q, out=b))
+
+        for batch in batch_sizes:
+            Q = rng.uniform(-np.pi, np.pi, (batch, n))
+            buffers = model.buffers(batch)
+            add("dh_transform_batch", lambda Q=Q, a=a_n, d=d_n, al=alpha_n: dh_transform_batch(Q, d, a, al),
+                batch, batch=batch)
+            add("forward_kinematics_batch",
+                lambda Q=Q, a=a_n, d=d_n, al=alpha_n: forward_kinematics_batch(Q, a, d, al), batch, batch=batch)
+            add("forward_kinematics_jacobian_batch",
+                lambda Q=Q, a=a_n, d=d_n, al=alpha_n: forward_kinematics_jacobian_batch(Q, a, d, al),
+                batch, batch=batch)
+            add("model.forward_kinematics_batch.out",
+                lambda m=model, Q=Q, b=buffers: m.forward_kinematics_batch(Q, out=b), batch, batch=batch)
+            add("model.forward_kinematics_jacobian_batch.out",
+                lambda m=model, Q=Q, b=buffers: m.forward_kinematics_jacobian_batch(Q, out=b),
+                batch, batch=batch)
+
+    if plot:
+        cases.extend(_plot_cases(rng))
+    return cases
+
+def _plot_cases(rng):
+    # GUI 없이 Agg 로 그림. 슬라이더 이벤트처럼 매 호출마다 자세를 바꿈
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from renderer import RobotRenderer, _plot_robot_full
+
+    model = RobotModel([0, -42.5, -39.2, 0, 0, 0], [8.9, 0, 0, 10.9, 9.5, 8.2],
+                       [np.pi / 2, 0, 0, np.pi / 2, -np.pi / 2, 0])
+    poses = [model.forward_kinematics(q) for q in rng.uniform(-np.pi, np.pi, (16, 6))]
+    scene = ([100.0, 100.0, 100.0], 30.0, [0.0, 0.0, 0.0])
+    cases = []
+
+    fig_full = plt.figure()
+    ax_full = fig_full.add_subplot(111, projection="3d")
+    state = {"i": 0}
+
+    def plot_full():
+        T, positions = poses[state["i"] % len(poses)]
+        state["i"] += 1
+        _plot_robot_full(ax_full, positions, T, *scene)
+    cases.append((case_key("plot_robot"), plot_full, 1))
+
+    fig_fast = plt.figure()
+    renderer = RobotRenderer(fig_fast.add_subplot(111, projection="3d"), *scene)
+
+    def plot_retained():
+        T, positions = poses[state["i"] % len(poses)]
+        state["i"] += 1
+        renderer.draw(positions, T)
+    cases.append((case_key("renderer.draw"), plot_retained, 1))
+    return cases
+
+# --- Baselines ---
+def machine_info():
+    return {"node": platform.node(), "machine": platform.machine(), "processor": platform.processor(),
+            "system": platform.system(), "cpu_count": os.cpu_count(),
+            "python": platform.python_version(), "numpy": np.__version__}
+
+def default_baseline_path():
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{platform.node() or 'unknown'}-{platform.machine()}")
+    return os.path.join(BASELINE_DIR, name + ".json")
+
+def load_baseline(path):
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported baseline format {data.get('format')!r}")
+    return data
+
+def save_baseline(path, results, settings):
+    data = {"format": FORMAT_VERSION, "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "machine": machine_info(), "settings": settings,
+            "metrics": {key: {"seconds": r["best"], "median": r["median"], "items": r["items"]}
+                        for key, r in results.items()}}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def compare(results, baseline, threshold):
+    """
+    baseline 과 비교 -> dict key -> (ratio, status). ratio 는 현재 / baseline 시간
+    status: "regressed" (threshold 이상 느려짐), "improved" (threshold 이상 빨라짐), "ok", "new"
+    """
+    metrics = baseline["metrics"]
+    report = {}
+    for key, r in results.items():
+        if key not in metrics:
+            report[key] = (None, "new")
+            continue
+        ratio = r["best"] / metrics[key]["seconds"]
+        if ratio > 1.0 + threshold:
+            status = "regressed"
+        elif ratio < 1.0 / (1.0 + threshold):
+            status = "improved"
+        else:
+            status = "ok"
+        report[key] = (ratio, status)
+    return report
+
+def _format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.2f} us"
+    return f"{seconds * 1e3:9.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Kinematics microbenchmarks with per-machine regression baselines")
+    parser.add_argument("--joints", type=int, nargs="+", default=[3, 6, 12])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--filter", nargs="+", default=None,
+                        help="only run cases whose key contains one of these (glob patterns allowed)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fail when a case is slower than baseline by more than this fraction")
+    parser.add_argument("--baseline", default=None, help="baseline JSON (default: benchmarks/<machine>.json)")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--min-time", type=float, default=0.02, help="seconds per timing run")
+    parser.add_argument("--repeats", type=int, default=7, help="round-robin passes over all cases")
+    parser.add_argument("--quick", action="store_true", help="shorter runs (noisier, for smoke tests)")
+    parser.add_argument("--no-plot", action="store_true", help="skip matplotlib cases")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.threshold <= 0:
+        raise ValueError("threshold must be positive")
+    if args.quick:
+        args.min_time, args.repeats = min(args.min_time, 0.005), min(args.repeats, 3)
+    path = args.baseline or default_baseline_path()
+
+    cases = build_cases(args.joints, args.batch, plot=not args.no_plot, seed=args.seed)
+    if args.filter:
+        cases = [c for c in cases
+                 if any(fnmatch.fnmatch(c[0], p if any(ch in p for ch in "*?[") else f"*{p}*")
+                        for p in args.filter)]
+    if not cases:
+        print("no benchmark cases selected")
+        return 1
+
+    baseline = None
+    if not args.save and os.path.exists(path):
+        baseline = load_baseline(path)
+        recorded = baseline["machine"]
+        current = machine_info()
+        for field in ("python", "numpy", "processor", "cpu_count"):
+            if recorded.get(field) != current[field]:
+                print(f"warning: baseline {field} {recorded.get(field)!r} != current {current[field]!r}")
+
+    print(f"{len(cases)} cases, min_time {args.min_time} s x {args.repeats} passes", flush=True)
+    timed = measure([(key, fn) for key, fn, _ in cases], args.min_time, args.repeats)
+    width = max(len(key) for key, _, _ in cases)
+    results = {}
+    for key, fn, items in cases:
+        r = timed[key]
+        r["items"] = items
+        results[key] = r
+        line = f"{key:<{width}}  {_format_time(r['best'])}  {items / r['best']:>12,.0f} cfg/s"
+        if baseline is not None:
+            ratio, status = compare({key: r}, baseline, args.threshold)[key]
+            line += "      (new)" if ratio is None else f"  x{ratio:5.2f} {status if status != 'ok' else ''}"
+        print(line, flush=True)
+
+    if args.save:
+        if os.path.exists(path):
+            # 일부만 돌린 경우 나머지 항목은 기존 값 유지
+            previous = load_baseline(path)["metrics"]
+            for key, m in previous.items():
+                results.setdefault(key, {"best": m["seconds"], "median": m["median"], "items": m["items"]})
+        save_baseline(path, results, {"min_time": args.min_time, "repeats": args.repeats, "seed": args.seed})
+        print(f"saved {len(results)} metrics to {path}")
+        return 0
+    if baseline is None:
+        print(f"no baseline at {path}; run with --save to create one")
+        return 0
+
+    report = compare(results, baseline, args.threshold)
+    suspects = [(key, fn) for key, fn, _ in cases if report[key][1] == "regressed"]
+    if suspects:
+        # 느린 구간에 걸렸을 수도 있으니 해당 항목만 바퀴 수를 늘려 다시 재고 더 좋은 값을 씀
+        print(f"re-measuring {len(suspects)} suspected regressions", flush=True)
+        for key, r in measure(suspects, args.min_time, 2 * args.repeats).items():
+            results[key]["best"] = min(results[key]["best"], r["best"])
+        report = compare(results, baseline, args.threshold)
+    regressed = sorted(k for k, (_, s) in report.items() if s == "regressed")
+    improved = [k for k, (_, s) in report.items() if s == "improved"]
+    if improved:
+        print(f"{len(improved)} cases faster than baseline by > {args.threshold:.0%}; "
+              f"consider --save to tighten the baseline")
+    if regressed:
+        print(f"FAIL: {len(regressed)} cases slower than baseline by > {args.threshold:.0%}:")
+        for key in regressed:
+            print(f"  {key}: x{report[key][0]:.2f}")
+        return 1
+    print(f"OK: no regression beyond {args.threshold:.0%} ({len(report)} cases)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+# 고정된 DH 테이블 전용 FK / Jacobian 코드 생성
+# dh_transform 은 임의의 alpha 를 받는 범용 함수라서 alpha = 0, ±π/2 일 때 항상 0 인 항도 계산하고
+# 상수 마지막 행까지 포함한 4x4 행렬곱을 링크마다 함. 로봇마다 DH 테이블은 고정이므로
+#   - 행렬 원소를 "상수 + Σ 계수 x 변수" 로 기호적으로 들고 다니면서 링크를 하나씩 곱함
+#     0 인 항은 버리고, ±1 계수는 곱셈 없이, 상수끼리는 미리 계산 (constant folding)
+#   - 두 항 이상이거나 곱이 생긴 원소만 임시 변수로 내보냄 (한 번 계산한 cos / sin / 중간값 재사용)
+#   - 마지막 행 (0 0 0 1) 과 위치 / z 축에 안 쓰이는 계산은 생기지 않음
+#   - Jacobian 열 z_i x (p_n - p_i) 도 같은 방식으로 펼침 (z_0 = (0, 0, 1) 이면 외적 대부분이 사라짐)
+# 생성된 모듈은 RobotModel 과 같은 이름의 함수 (forward_kinematics, jacobian, forward_kinematics_jacobian,
+# *_batch) 와 a / d / alpha / n_joints 를 가지고, .cache/fk_<DH hash>.py 에 저장해서 다음부터는 import 만 함
+# 단일 자세는 math + float, batch 는 (N,) 열 배열에 같은 식을 그대로 씀
+#
+# 사용법 (UR5 테이블로 생성 + 범용 경로 대비 속도 / 오차)
+# python3 codegen.py
+# python3 codegen.py --show        (생성된 코드 출력)
+
+import argparse
+import hashlib
+import importlib.util
+import os
+import re
+import time
+
+import numpy as np
+
+from kinematics import RobotModel
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# 생성 규칙이 바뀌면 올려서 예전 캐시 파일을 쓰지 않게 함
+GENERATOR_VERSION = 1
+
+# --- Symbolic Entries ---
+# 원소 하나 = {atom: 계수}, atom "1" 은 상수항. atom 은 변수 이름 또는 변수 이름 두개의 곱 "x*y"
+_ONE = "1"
+
+def _snap(x, tol):
+    """0, ±1 에 tol 안으로 가까운 값은 정확히 그 값으로 (cos(π/2) = 6e-17 같은 항 제거)"""
+    for v in (0.0, 1.0, -1.0):
+        if abs(x - v) < tol:
+            return v
+    return x
+
+def _lin(tol, items):
+    out = {}
+    for atom, coef in items:
+        out[atom] = out.get(atom, 0.0) + coef
+    return {k: c for k, c in ((k, _snap(c, tol)) for k, c in out.items()) if c != 0.0}
+
+def _mul_atoms(x, y):
+    if x == _ONE:
+        return y
+    if y == _ONE:
+        return x
+    return "*".join(sorted((x, y)))
+
+def _mul(u, v, tol):
+    return _lin(tol, [(_mul_atoms(x, y), cx * cy) for x, cx in u.items() for y, cy in v.items()])
+
+def _add(u, v, tol, sign=1.0):
+    return _lin(tol, list(u.items()) + [(k, sign * c) for k, c in v.items()])
+
+def _format(entry):
+    """원소 -> 파이썬 식 문자열 (상수 / 계수 1 / -1 은 곱셈 없이)"""
+    if not entry:
+        return "0.0"
+    parts = []
+    for atom, coef in entry.items():
+        if atom == _ONE:
+            term, mag = repr(abs(coef)), ""
+        else:
+            mag = "" if abs(coef) == 1.0 else f"{abs(coef)!r}*"
+            term = atom
+        sign = "-" if coef < 0 else "+"
+        parts.append((sign, mag + term))
+    text = ("-" if parts[0][0] == "-" else "") + parts[0][1]
+    for sign, term in parts[1:]:
+        text += f" {sign} {term}"
+    return text
+
+class _Emitter:
+    """임시 변수 대입문을 모으고, 원소를 '상수' 또는 '계수 x 변수 하나' 형태로 줄여서 돌려줌"""
+
+    def __init__(self, tol):
+        self.tol = tol
+        self.lines = []
+        self.mul = 0
+        self.add = 0
+
+    def bind(self, name, entry):
+        if not entry or set(entry) == {_ONE}:
+            return entry
+        if len(entry) == 1:
+            (atom, coef), = entry.items()
+            if "*" not in atom:
+                return entry
+        self.lines.append(f"{name} = {_format(entry)}")
+        self.add += len(entry) - 1
+        self.mul += sum(("*" in atom) + (abs(c) != 1.0 and atom != _ONE) for atom, c in entry.items())
+        return {name: 1.0}
+
+# --- Generator ---
+def _dh_entries(i, a, d, ca, sa):
+    """링크 i 변환 행렬의 위 3행 (theta 의존: c{i}, s{i})"""
+    c, s = f"c{i}", f"s{i}"
+    return [
+        [{c: 1.0}, {s: -ca}, {s: sa}, {c: a}],
+        [{s: 1.0}, {c: ca}, {c: -sa}, {s: a}],
+        [{}, {_ONE: sa}, {_ONE: ca}, {_ONE: d}],
+    ]
+
+def generate_body(model, tol=1e-12, jacobian=True):
+    """
+    straight-line 코드 (c0..c{n-1}, s0.. 가 정의돼 있다고 가정) 와 결과 원소
+    returns: lines, T (3x4 원소), positions (n + 1 개의 3 원소), J (6 x n 원소 또는 None), (곱셈, 덧셈) 수
+    """
+    em = _Emitter(tol)
+    n = model.n_joints
+    T = [[_lin(tol, [(_ONE, float(r == c))]) for c in range(4)] for r in range(3)]
+    frames = [T]
+    for i in range(n):
+        A = _dh_entries(i, float(model.a[i]), float(model.d[i]), float(np.cos(model.alpha[i])),
+                        float(np.sin(model.alpha[i])))
+        A = [[_lin(tol, e.items()) for e in row] for row in A]
+        prev = frames[-1]
+        a_i, d_i = _snap(float(model.a[i]), tol), _snap(float(model.d[i]), tol)
+        T = []
+        for r in range(3):
+            row = []
+            for c in range(3):
+                acc = {}
+                for k in range(3):
+                    acc = _add(acc, _mul(prev[r][k], A[k][c], tol), tol)
+                row.append(em.bind(f"t{i + 1}_{r}{c}", acc))
+            # 위치 열: A 의 4열 = a x (1열) + d x z 이므로 p_{i+1} = p_i + a x_{i+1} + d z_i
+            # (새 x 축을 재사용해서 c / s 곱을 다시 하지 않음)
+            acc = _add(prev[r][3], _mul(row[0], {_ONE: a_i}, tol), tol)
+            acc = _add(acc, _mul(prev[r][2], {_ONE: d_i}, tol), tol)
+            row.append(em.bind(f"t{i + 1}_{r}3", acc))
+            T.append(row)
+        frames.append(T)
+
+    positions = [[F[r][3] for r in range(3)] for F in frames]
+    J = None
+    if jacobian:
+        p_n = positions[-1]
+        J = [[None] * n for _ in range(6)]
+        for i in range(n):
+            z = [frames[i][r][2] for r in range(3)]
+            dp = [em.bind(f"dp{i}_{r}", _add(p_n[r], positions[i][r], tol, -1.0)) for r in range(3)]
+            for r in range(3):
+                u, v = (r + 1) % 3, (r + 2) % 3
+                cross = _add(_mul(z[u], dp[v], tol), _mul(z[v], dp[u], tol), tol, -1.0)
+                J[r][i] = em.bind(f"j{i}_{r}", cross)
+                J[r + 3][i] = z[r]
+    return em.lines, frames[-1], positions, J, (em.mul, em.add)
+
+_IDENT = re.compile(r"\b[a-z_]\w*\b")
+
+def _prune(lines, outputs):
+    """outputs 에서 (간접적으로라도) 쓰이지 않는 대입문 제거"""
+    needed = set(_IDENT.findall(" ".join(outputs)))
+    kept = []
+    for line in reversed(lines):
+        name, expr = line.split(" = ", 1)
+        if name in needed:
+            needed.update(_IDENT.findall(expr))
+            kept.append(line)
+    return kept[::-1]
+
+def cache_key(model):
+    h = hashlib.sha1()
+    for arr in (model.a, model.d, model.alpha):
+        h.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+    h.update(str(GENERATOR_VERSION).encode())
+    return h.hexdigest()[:16]
+
+def generate_source(model, tol=1e-12):
+    """DH 테이블 -> 모듈 소스 문자열"""
+    n = model.n_joints
+    fk_lines, T, positions, _, fk_ops = generate_body(model, tol, jacobian=False)
+    all_lines, T_j, positions_j, J, all_ops = generate_body(model, tol, jacobian=True)
+    trig = [f"c{i}, s{i} = cos(q[{i}]), sin(q[{i}])" for i in range(n)]
+
+    def scalar(name, lines, outputs):
+        return [f"def {name}(theta_list):", "    q = [float(x) for x in theta_list]"] + \
+               [f"    {x}" for x in trig + _prune(lines, outputs) + outputs]
+
+    def batch(name, lines, outputs):
+        return [f"def {name}(theta):",
+                "    q = np.ascontiguousarray(np.atleast_2d(np.asarray(theta, dtype=float)).T)",
+                "    N = q.shape[1]",
+                "    cq, sq = np.cos(q), np.sin(q)"] + \
+               [f"    c{i}, s{i} = cq[{i}], sq[{i}]" for i in range(n)] + \
+               [f"    {x}" for x in _prune(lines, outputs) + outputs]
+
+    def matrix_literal(rows):
+        return "[" + ", ".join("[" + ", ".join(_format(e) for e in row) + "]" for row in rows) + "]"
+
+    def T_scalar(T):
+        return f"T = np.array({matrix_literal(T + [[{}, {}, {}, {_ONE: 1.0}]])})"
+
+    def P_scalar(positions):
+        return f"P = np.array({matrix_literal(positions[1:])})"
+
+    def fill_batch(target, rows):
+        return [f"{target}[:, {r}, {c}] = {_format(e)}" for r, row in enumerate(rows) for c, e in enumerate(row)]
+
+    def T_batch(T):
+        return ["T = np.zeros((N, 4, 4))", "T[:, 3, 3] = 1.0"] + fill_batch("T", T)
+
+    def P_batch(positions):
+        return ["P = np.empty((N, n_points, 3))".replace("n_points", str(n + 1))] + fill_batch("P", positions)
+
+    J_scalar = f"J = np.array({matrix_literal(J)})"
+    J_batch = ["J = np.empty((N, 6, n))".replace(", n)", f", {n})")] + fill_batch("J", J)
+
+    src = [
+        f"# 자동 생성 파일 (codegen.py, generator version {GENERATOR_VERSION}) - 직접 고치지 말 것",
+        f"# DH hash {cache_key(model)}, {n} joints",
+        f"# FK       : {fk_ops[0]} mul, {fk_ops[1]} add (+ {n} cos/sin)",
+        f"# FK + J   : {all_ops[0]} mul, {all_ops[1]} add",
+        "",
+        "from math import cos, sin",
+        "",
+        "import numpy as np",
+        "",
+        f"DH_HASH = {cache_key(model)!r}",
+        f"n_joints = {n}",
+        f"a = np.array({model.a.tolist()!r})",
+        f"d = np.array({model.d.tolist()!r})",
+        f"alpha = np.array({model.alpha.tolist()!r})",
+        "FK_OPS = " + repr(fk_ops),
+        "FK_JACOBIAN_OPS = " + repr(all_ops),
+        "",
+    ]
+    src += scalar("forward_kinematics", fk_lines, [T_scalar(T), P_scalar(positions), "return T, list(P)"])
+    src += [""]
+    src += scalar("jacobian", all_lines, [J_scalar, "return J"])
+    src += [""]
+    src += scalar("forward_kinematics_jacobian", all_lines,
+                  [T_scalar(T_j), P_scalar(positions_j), J_scalar, "return T, list(P), J"])
+    src += [""]
+    src += batch("forward_kinematics_batch", fk_lines, T_batch(T) + P_batch(positions) + ["return T, P"])
+    src += [""]
+    src += batch("forward_kinematics_jacobian_batch", all_lines,
+                 T_batch(T_j) + P_batch(positions_j) + J_batch + ["return T, P, J"])
+    return "\n".join(src) + "\n"
+
+def load_or_generate(model, cache_dir=CACHE_DIR, tol=1e-12):
+    """DH 테이블 hash 로 생성된 모듈을 찾고, 없으면 생성해서 저장한 뒤 import"""
+    path = os.path.join(cache_dir, f"fk_{cache_key(model)}.py")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        # 다른 프로세스가 반쯤 쓴 파일을 import 하지 않게 임시 파일에 쓰고 교체
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(generate_source(model, tol))
+        os.replace(tmp, path)
+    spec = importlib.util.spec_from_file_location(f"fk_{cache_key(model)}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# --- Benchmark ---
+def _per_call(fn, theta):
+    start = time.perf_counter()
+    for row in theta:
+        fn(row)
+    return (time.perf_counter() - start) / len(theta)
+
+def main():
+    from kinematics import forward_kinematics, forward_kinematics_jacobian
+
+    parser = argparse.ArgumentParser(description="Generated FK / Jacobian vs generic DH path")
+    parser.add_argument("--events", type=int, default=20000, help="single-configuration calls timed")
+    parser.add_argument("--n", type=int, default=100000, help="configurations for the batch path")
+    parser.add_argument("--show", action="store_true", help="print the generated module")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    a = np.array([0, -0.425, -0.392, 0, 0, 0])
+    d = np.array([0.089, 0, 0, 0.109, 0.095, 0.082])
+    alpha = np.array([np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+    model = RobotModel(a, d, alpha)
+
+    t0 = time.perf_counter()
+    source = generate_source(model)
+    t_gen = time.perf_counter() - t0
+    if args.show:
+        print(source)
+    t0 = time.perf_counter()
+    gen = load_or_generate(model)
+    t_load = time.perf_counter() - t0
+    print(f"generated {len(source.splitlines())} lines in {t_gen * 1e3:.1f} ms, load {t_load * 1e3:.1f} ms "
+          f"(.cache/fk_{gen.DH_HASH}.py)")
+    print(f"ops per configuration: FK {gen.FK_OPS[0]} mul + {gen.FK_OPS[1]} add, "
+          f"FK+J {gen.FK_JACOBIAN_OPS[0]} mul + {gen.FK_JACOBIAN_OPS[1]} add "
+          f"(generic 4x4 chain: {model.n_joints * 64} mul + {model.n_joints * 48} add)")
+
+    rng = np.random.default_rng(args.seed)
+    theta = rng.uniform(-np.pi, np.pi, (args.n, model.n_joints))
+    T_ref, P_ref, J_ref = model.forward_kinematics_jacobian_batch(theta)
+    T, P, J = gen.forward_kinematics_jacobian_batch(theta)
+    err = max(np.abs(T - T_ref).max(), np.abs(P - P_ref).max(), np.abs(J - J_ref).max())
+    T1, P1, J1 = gen.forward_kinematics_jacobian(theta[0])
+    err1 = max(np.abs(T1 - T_ref[0]).max(), np.abs(np.array(P1) - P_ref[0, 1:]).max(), np.abs(J1 - J_ref[0]).max())
+    print(f"max |generated - RobotModel|: batch {err:.1e}, single {err1:.1e}")
+
+    events = theta[:args.events]
+    rows = [
+        ("FK   generic function", _per_call(lambda q: forward_kinematics(q, a, d, alpha), events)),
+        ("FK   RobotModel", _per_call(model.forward_kinematics, events)),
+        ("FK   generated", _per_call(gen.forward_kinematics, events)),
+        ("FK+J generic function", _per_call(lambda q: forward_kinematics_jacobian(q, a, d, alpha), events)),
+        ("FK+J RobotModel", _per_call(model.forward_kinematics_jacobian, events)),
+        ("FK+J generated", _per_call(gen.forward_kinematics_jacobian, events)),
+    ]
+    print("\nsingle configuration          us/call")
+    for label, t in rows:
+        print(f"{label:28s}{t * 1e6:8.1f}")
+    print(f"speedup vs RobotModel: FK {rows[1][1] / rows[2][1]:.1f}x, FK+J {rows[4][1] / rows[5][1]:.1f}x")
+
+    print(f"\nbatch ({args.n:,} configurations)   configs/sec")
+    results = []
+    for label, fn in [("FK   RobotModel", model.forward_kinematics_batch),
+                      ("FK   generated", gen.forward_kinematics_batch),
+                      ("FK+J RobotModel", model.forward_kinematics_jacobian_batch),
+                      ("FK+J generated", gen.forward_kinematics_jacobian_batch)]:
+        start = time.perf_counter()
+        fn(theta)
+        rate = args.n / (time.perf_counter() - start)
+        results.append(rate)
+        print(f"{label:28s}{rate:14,.0f}")
+    print(f"speedup vs RobotModel: FK {results[1] / results[0]:.1f}x, FK+J {results[3] / results[2]:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# 충돌 검사 (collision checking)
+# is_in_obstacle 은 관절 원점만, 구 하나에 대해서만 검사해서 링크가 장애물을 관통해도 못잡음
+# 여기서는 각 링크를 capsule (선분 + 반지름) 로 보고 구/박스(AABB) 장애물 수백~수천개에 대해
+#   broadphase : 균일 격자 spatial hash (정렬된 cell key + searchsorted 로 후보 쌍 생성, 파이썬 루프 없음)
+#   narrowphase: 후보 (링크, 장애물) 쌍 전체를 한번에 벡터 연산으로 signed distance 계산
+# 단일 자세와 batch 자세 모두 같은 경로로 처리
+#
+# 사용법 (처리량 측정)
+# python3 collision.py --obstacles 1000 --configs 2000
+
+import argparse
+import time
+
+import numpy as np
+
+_KEY_BITS = 20
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+
+def _cell_key(ix, iy, iz):
+    return (((ix + _KEY_OFFSET) << (2 * _KEY_BITS)) | ((iy + _KEY_OFFSET) << _KEY_BITS)
+            | (iz + _KEY_OFFSET)).astype(np.int64)
+
+# --- Narrowphase Distances ---
+def segment_sphere_distance(p0, p1, center, radius):
+    """선분 p0-p1 과 구 사이 signed distance (음수면 관통), 모든 인자는 (..., 3) / (...,)"""
+    d = p1 - p0
+    dd = np.einsum("...i,...i->...", d, d)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(dd > 0, np.einsum("...i,...i->...", center - p0, d) / dd, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    closest = p0 + t[..., None] * d
+    return np.linalg.norm(center - closest, axis=-1) - radius
+
+def point_box_signed_distance(p, center, half):
+    """점과 AABB 사이 signed distance (내부면 음수)"""
+    q = np.abs(p - center) - half
+    outside = np.sqrt(np.sum(np.square(np.maximum(q, 0.0)), axis=-1))
+    inside = np.minimum(q.max(axis=-1), 0.0)
+    return outside + inside
+
+def segment_box_distance(p0, p1, center, half):
+    """
+    선분과 AABB 사이 signed distance (모든 인자 (..., 3))
+    p(t) = p0 + t (p1 - p0) 의 박스 signed distance 는 t 에 대해 볼록이고 구간별로
+      박스 밖: 밖으로 나간 축들의 제곱합 -> 축이 면을 지나는 t (6개) 사이 구간마다 2차식
+      박스 안: max_i (|r_i| - h_i) -> 1차식들의 최대
+    라서 최소값은 아래 후보 t 중 하나에서 나옴. 후보를 한번에 평가해서 최소 (반복 탐색 없음)
+      밖: 끝점 2, 면 통과 6, 구간별 2차식 정류점 7
+      안: |r_i| 꺾임 3, 두 축의 |r_i| - h_i 가 같아지는 점 12 (밖 후보로 관통이 확인된 선분만)
+    """
+    p0, p1, center, half = np.broadcast_arrays(p0, p1, center, half)
+    shape = p0.shape[:-1]
+    p0, p1, center, half = (x.reshape(-1, 3) for x in (p0, p1, center, half))
+    d = p1 - p0
+    o = p0 - center
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_face = np.concatenate([(half - o) / d, (-half - o) / d], axis=1)
+        # 면 통과 t 로 [0, 1] 을 나눈 구간마다 밖으로 나간 축 집합이 고정 -> 잔차 a + b t 의 제곱합 최소점
+        knots = np.empty((len(d), 8))
+        knots[:, 0], knots[:, 7] = 0.0, 1.0
+        knots[:, 1:7] = np.sort(np.clip(np.nan_to_num(t_face, nan=0.0), 0.0, 1.0), axis=1)
+        t_lo, t_hi = knots[:, :-1], knots[:, 1:]
+        r = o[:, None] + (0.5 * (t_lo + t_hi))[..., None] * d[:, None]
+        side = np.sign(r) * (np.abs(r) > half[:, None])
+        a = o[:, None] - side * half[:, None]
+        b = np.abs(side) * d[:, None]
+        t_star = np.clip(-np.sum(a * b, axis=2) / np.sum(b * b, axis=2), t_lo, t_hi)
+    t = np.concatenate([knots, t_star], axis=1)
+    dist = _min_along_segment(p0, d, center, half, t)
+
+    # 선분이 박스를 지나면 면 통과 후보의 거리가 (반올림 오차 안에서) 0
+    inside = np.flatnonzero(dist <= 1e-9 * (1.0 + np.max(np.abs(o) + np.abs(d), axis=1)))
+    if len(inside):
+        o, d, h = o[inside], d[inside], half[inside]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_in = [-o / d]
+            for i, j in ((0, 1), (0, 2), (1, 2)):
+                for si in (1.0, -1.0):
+                    for sj in (1.0, -1.0):
+                        t_in.append(((h[:, i] - h[:, j] - si * o[:, i] + sj * o[:, j])
+                                     / (si * d[:, i] - sj * d[:, j]))[:, None])
+        t_in = np.concatenate(t_in, axis=1)
+        dist[inside] = np.minimum(dist[inside],
+                                  _min_along_segment(p0[inside], d, center[inside], h, t_in))
+    return dist.reshape(shape)
+
+def _min_along_segment(p0, d, center, half, t):
+    """(M, C) 후보 t (nan / 범위 밖은 [0, 1] 로) 에서 박스 signed distance 의 최소"""
+    t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+    points = p0[:, None] + t[..., None] * d[:, None]
+    return point_box_signed_distance(points, center[:, None], half[:, None]).min(axis=1)
+
+# --- Scene ---
+class Scene:
+    """
+    구 / AABB 박스 장애물 모음 + spatial hash broadphase
+    장애물을 추가한 뒤 build() (check 가 자동으로 호출) 하면 격자를 만듦
+    장애물 index: 구가 먼저 0..n_spheres-1, 그 다음 박스
+    """
+
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size
+        self.sphere_centers = np.zeros((0, 3))
+        self.sphere_radii = np.zeros(0)
+        self.box_centers = np.zeros((0, 3))
+        self.box_half = np.zeros((0, 3))
+        self._keys = None
+        self._ids = None
+        self._cell = None
+        self._obs_lo = None
+        self._obs_hi = None
+
+    def __repr__(self):
+        return f"Scene(spheres={len(self.sphere_radii)}, boxes={len(self.box_half)})"
+
+    def __len__(self):
+        return len(self.sphere_radii) + len(self.box_half)
+
+    def add_spheres(self, centers, radii):
+        centers = np.atleast_2d(np.asarray(centers, dtype=float))
+        radii = np.broadcast_to(np.asarray(radii, dtype=float), len(centers))
+        self.sphere_centers = np.vstack([self.sphere_centers, centers])
+        self.sphere_radii = np.concatenate([self.sphere_radii, radii])
+        self._keys = None
+        return self
+
+    def add_boxes(self, centers, half_extents):
+        centers = np.atleast_2d(np.asarray(centers, dtype=float))
+        half = np.broadcast_to(np.asarray(half_extents, dtype=float), centers.shape)
+        self.box_centers = np.vstack([self.box_centers, centers])
+        self.box_half = np.vstack([self.box_half, half])
+        self._keys = None
+        return self
+
+    def _bounds(self):
+        lo = np.vstack([self.sphere_centers - self.sphere_radii[:, None], self.box_centers - self.box_half])
+        hi = np.vstack([self.sphere_centers + self.sphere_radii[:, None], self.box_centers + self.box_half])
+        return lo, hi
+
+    def build(self):
+        """장애물 AABB 가 걸치는 모든 cell 에 (cell key, 장애물 id) 를 넣고 key 로 정렬"""
+        lo, hi = self._bounds()
+        self._obs_lo, self._obs_hi = lo, hi
+        if self.cell_size is None:
+            size = np.max(hi - lo, axis=1) if len(lo) else np.ones(1)
+            self._cell = float(max(np.median(size) * 2, 1e-6))
+        else:
+            self._cell = float(self.cell_size)
+        cmin = np.floor(lo / self._cell).astype(np.int64)
+        cmax = np.floor(hi / self._cell).astype(np.int64)
+        keys, ids = _expand_cells(cmin, cmax)
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._ids = ids[order]
+        return self
+
+    def candidate_pairs(self, p0, p1, inflate):
+        """
+        capsule (p0, p1, inflate 반지름) 들과 AABB 가 겹치는 cell 을 공유하는 장애물 후보 쌍
+        returns: capsule index (K,), 장애물 index (K,) (중복 제거)
+        """
+        if self._keys is None:
+            self.build()
+        if not np.all(np.isfinite(inflate)):
+            # margin = inf: 거리 제한 없음 -> 모든 (capsule, 장애물) 쌍
+            return np.repeat(np.arange(len(p0)), len(self)), np.tile(np.arange(len(self)), len(p0))
+        lo = np.minimum(p0, p1) - inflate[:, None]
+        hi = np.maximum(p0, p1) + inflate[:, None]
+        cmin = np.floor(lo / self._cell).astype(np.int64)
+        cmax = np.floor(hi / self._cell).astype(np.int64)
+        # capsule 이 cell 보다 훨씬 크면 (긴 링크, 큰 inflate) cell 을 펼치는 것보다
+        # 모든 장애물과 AABB 를 직접 비교하는 쪽이 싸고 메모리도 작음
+        # (cell 이 아주 작으면 span 곱이 int64 를 넘으므로 float 으로 곱함)
+        if np.prod(np.max(cmax - cmin + 1, axis=0), dtype=float) > len(self):
+            return self._candidate_pairs_direct(lo, hi)
+        keys, caps = _expand_cells(cmin, cmax)
+
+        start = np.searchsorted(self._keys, keys, side="left")
+        stop = np.searchsorted(self._keys, keys, side="right")
+        counts = stop - start
+        cap_idx = np.repeat(caps, counts)
+        # 각 (capsule, cell) 구간의 장애물 id 들을 이어붙임
+        offsets = np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        obs_idx = self._ids[offsets]
+        if len(cap_idx) == 0:
+            return cap_idx, obs_idx
+        pair = np.unique(cap_idx.astype(np.int64) * len(self) + obs_idx)
+        cap_idx, obs_idx = pair // len(self), pair % len(self)
+
+        # 같은 cell 을 공유해도 AABB 끼리 떨어져 있으면 narrowphase 전에 버림
+        obs_lo, obs_hi = self._obs_lo[obs_idx], self._obs_hi[obs_idx]
+        gap = np.maximum(np.maximum(obs_lo - hi[cap_idx], lo[cap_idx] - obs_hi), 0.0)
+        near = np.all(gap <= 0.0, axis=1)
+        return cap_idx[near], obs_idx[near]
+
+    def _candidate_pairs_direct(self, lo, hi, chunk_size=4096):
+        """capsule AABB (lo, hi) 와 장애물 AABB 직접 비교, 메모리 제한을 위해 capsule chunk 단위"""
+        cap_idx, obs_idx = [], []
+        for s in range(0, len(lo), chunk_size):
+            overlap = np.all((lo[s:s + chunk_size, None] <= self._obs_hi[None])
+                             & (hi[s:s + chunk_size, None] >= self._obs_lo[None]), axis=2)
+            c, o = np.nonzero(overlap)
+            cap_idx.append(c + s)
+            obs_idx.append(o)
+        return np.concatenate(cap_idx), np.concatenate(obs_idx)
+
+    def check(self, positions, link_radius=0.0, margin=0.0):
+        """
+        positions: (n_joints + 1, 3) 또는 (N, n_joints + 1, 3) 관절 원점 (base 포함, forward_kinematics_batch 출력)
+        link_radius: 스칼라 또는 (n_links,) capsule 반지름
+        margin: 이 거리 안의 장애물까지는 정확한 거리를 보고 (그 밖은 inf)
+                np.inf 면 모든 장애물까지의 거리 (링크 수 x 장애물 수 쌍을 모두 계산)
+        returns dict
+            distance  (N, n_links) 링크별 최소 signed distance (음수 = 관통)
+            obstacle  (N, n_links) 가장 가까운 장애물 index (-1 = margin 안에 없음)
+            hit       (N, n_links) bool
+            collision (N,) bool, min_distance (N,)
+        """
+        positions = np.asarray(positions, dtype=float)
+        single = positions.ndim == 2
+        if single:
+            positions = positions[None]
+        N, n_pts = positions.shape[:2]
+        n_links = n_pts - 1
+        p0 = positions[:, :-1].reshape(-1, 3)
+        p1 = positions[:, 1:].reshape(-1, 3)
+        radius = np.broadcast_to(np.asarray(link_radius, dtype=float), (N, n_links)).reshape(-1)
+
+        distance = np.full(N * n_links, np.inf)
+        obstacle = np.full(N * n_links, -1, dtype=np.int64)
+        if len(self):
+            cap, obs = self.candidate_pairs(p0, p1, radius + margin)
+            d = np.empty(len(cap))
+            n_sph = len(self.sphere_radii)
+            sph = obs < n_sph
+            if np.any(sph):
+                o = obs[sph]
+                d[sph] = segment_sphere_distance(p0[cap[sph]], p1[cap[sph]],
+                                                 self.sphere_centers[o], self.sphere_radii[o])
+            box = ~sph
+            if np.any(box):
+                o = obs[box] - n_sph
+                d[box] = segment_box_distance(p0[cap[box]], p1[cap[box]],
+                                              self.box_centers[o], self.box_half[o])
+            d -= radius[cap]
+
+            # capsule 별 최소값: (capsule, 거리) 로 정렬 후 각 capsule 의 첫 항목
+            order = np.lexsort((d, cap))
+            cap_sorted = cap[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = cap_sorted[1:] != cap_sorted[:-1]
+            sel = order[first]
+            distance[cap[sel]] = d[sel]
+            obstacle[cap[sel]] = obs[sel]
+
+        distance = distance.reshape(N, n_links)
+        hit = distance < 0
+        result = {
+            "distance": distance,
+            "obstacle": obstacle.reshape(N, n_links),
+            "hit": hit,
+            "collision": np.any(hit, axis=1),
+            "min_distance": np.min(distance, axis=1),
+        }
+        if single:
+            result = {k: v[0] for k, v in result.items()}
+        return result
+
+def _expand_cells(cmin, cmax):
+    """
+    각 항목의 [cmin, cmax] 정수 cell 범위를 (cell key, 항목 index) 쌍으로 펼침
+    범위 크기가 달라도 최대 범위로 offset 을 만들고 mask 로 거름 (파이썬 루프 없음)
+    """
+    if len(cmin) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    span = cmax - cmin + 1
+    kmax = span.max(axis=0)
+    ox, oy, oz = np.meshgrid(np.arange(kmax[0]), np.arange(kmax[1]), np.arange(kmax[2]), indexing="ij")
+    offsets = np.stack([ox.ravel(), oy.ravel(), oz.ravel()], axis=1)            # (K, 3)
+    valid = np.all(offsets[None, :, :] < span[:, None, :], axis=2)               # (M, K)
+    item, k = np.nonzero(valid)
+    cells = cmin[item] + offsets[k]
+    return _cell_key(cells[:, 0], cells[:, 1], cells[:, 2]), item
+
+def main():
+    from kinematics import RobotModel
+
+    parser = argparse.ArgumentParser(description="Capsule collision check throughput")
+    parser.add_argument("--obstacles", type=int, default=1000)
+    parser.add_argument("--configs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = RobotModel([0, -0.425, -0.392, 0, 0, 0], [0.089, 0, 0, 0.109, 0.095, 0.082],
+                       [np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+    rng = np.random.default_rng(args.seed)
+    n_sph = args.obstacles // 2
+    scene = Scene()
+    scene.add_spheres(rng.uniform(-1, 1, (n_sph, 3)), rng.uniform(0.01, 0.04, n_sph))
+    scene.add_boxes(rng.uniform(-1, 1, (args.obstacles - n_sph, 3)), rng.uniform(0.01, 0.04, (args.obstacles - n_sph, 3)))
+    scene.build()
+
+    theta = rng.uniform(-np.pi, np.pi, (args.configs, model.n_joints))
+    _, positions = model.forward_kinematics_batch(theta)
+
+    t0 = time.perf_counter()
+    res = scene.check(positions, link_radius=0.04, margin=0.05)
+    t_batch = time.perf_counter() - t0
+    print(f"{scene}: batch {args.configs / t_batch:,.0f} configs/sec, "
+          f"{res['collision'].mean() * 100:.1f} % in collision")
+
+    t0 = time.perf_counter()
+    for pos in positions[:200]:
+        scene.check(pos, link_radius=0.04, margin=0.05)
+    print(f"single config latency: {(time.perf_counter() - t0) / 200 * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+# 역동역학 (recursive Newton-Euler, RNEA)
+# kinematics.RobotModel 의 DH 테이블 + 링크별 질량 / 무게중심 / 관성 텐서로 관절 토크 계산
+# 모터 선정 (궤적 전체의 최대 토크) 과 feed-forward 제어용
+#   - 링크 i 의 좌표계는 DH frame i (관절 i 뒤, 표준 DH). 무게중심 com[i] 과 관성 inertia[i]
+#     (무게중심 기준) 도 frame i 에서 표현
+#   - frame i-1 -> i 회전은 R_i = Rz(θ_i) Rx(α_i) 이라 3x3 행렬을 만들지 않고 성분별로 돌림
+#   - frame i 에서 본 frame i 원점 위치 p*_i = R_iᵀ [a cosθ, a sinθ, d] = [a, d sinα, d cosα] 는 상수
+#   - 중력은 base 가속도 -g 로 넣음 (Luh-Walker-Paul). 모든 계산은 (B, 3) 배열이라
+#     궤적 전체 (q, qd, qdd) 를 한 번에 넣으면 링크 수만큼의 루프만 돔
+#   - 단일 자세 (feed-forward 제어 주기마다 한 번) 는 numpy 호출 비용이 계산보다 커서 math + float tuple 로 따로 계산
+#   - 질량 행렬은 CRBA (composite rigid body): 링크 i 바깥 전체를 하나의 강체 관성으로 모아가며
+#     안쪽으로 누적. forward_dynamics 는 M qdd = tau - (C qd + g) 를 batch 로 풂
+#   - batch 가 SMALL_BATCH 이하 (팔 하나 시뮬레이션 등) 면 RNEA / CRBA 모두 자세마다 float tuple 경로
+#
+# 검증용으로 에너지 식에서 직접 세운 Lagrangian 역동역학 (M(q) qdd + C(q, qd) qd + g(q),
+# M 미분과 위치 에너지 미분은 중앙 차분) 도 있음. 느리지만 RNEA 와 독립적인 계산
+#
+# 사용법
+# python3 dynamics.py                  # Lagrangian 과 비교 (2~4 관절, M(q) 포함) + UR5 처리량 + 궤적 토크
+# python3 dynamics.py --batch 100000
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from kinematics import RobotModel
+
+GRAVITY = np.array([0.0, 0.0, -9.81])
+# 이 batch 크기 이하는 자세마다 float tuple 경로가 numpy batch 호출보다 빠름 (UR5, 약 10~20 에서 역전)
+SMALL_BATCH = 8
+
+def _cross(a, b):
+    """(..., 3) x (..., 3), np.cross 보다 작은 배열에서 빠름"""
+    out = np.empty(np.broadcast_shapes(a.shape, b.shape))
+    out[..., 0] = a[..., 1] * b[..., 2] - a[..., 2] * b[..., 1]
+    out[..., 1] = a[..., 2] * b[..., 0] - a[..., 0] * b[..., 2]
+    out[..., 2] = a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+    return out
+
+def _rotate_back(v, ct, st, ca, sa):
+    """R_iᵀ v = Rx(-α) Rz(-θ) v  (frame i-1 벡터 -> frame i), v (B, 3), ct / st (B,)"""
+    x = ct * v[:, 0] + st * v[:, 1]
+    y = ct * v[:, 1] - st * v[:, 0]
+    out = np.empty_like(v)
+    out[:, 0] = x
+    out[:, 1] = ca * y + sa * v[:, 2]
+    out[:, 2] = ca * v[:, 2] - sa * y
+    return out
+
+def _cross3(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+def _rotate_back3(v, c, s, ca, sa):
+    y = c * v[1] - s * v[0]
+    return (c * v[0] + s * v[1], ca * y + sa * v[2], ca * v[2] - sa * y)
+
+def _rotate3(v, c, s, ca, sa):
+    y = ca * v[1] - sa * v[2]
+    return (c * v[0] - s * y, s * v[0] + c * y, sa * v[1] + ca * v[2])
+
+def _rotate(v, ct, st, ca, sa):
+    """R_i v = Rz(θ) Rx(α) v  (frame i 벡터 -> frame i-1)"""
+    y = ca * v[:, 1] - sa * v[:, 2]
+    out = np.empty_like(v)
+    out[:, 0] = ct * v[:, 0] - st * y
+    out[:, 1] = st * v[:, 0] + ct * y
+    out[:, 2] = sa * v[:, 1] + ca * v[:, 2]
+    return out
+
+# --- Dynamics Model ---
+class DynamicsModel:
+    """
+    RobotModel + 링크별 관성 파라미터
+    mass (n,) kg, com (n, 3) frame i 에서 본 무게중심, inertia (n, 3, 3) 또는 주축 값 (n, 3) (무게중심 기준)
+    gravity: base 좌표계 중력 가속도 (기본 -z 9.81)
+    """
+    __slots__ = ("model", "n_joints", "mass", "com", "inertia", "gravity", "_p", "_scalar",
+                 "_h", "_I_origin", "_s", "_v", "_scalar_crba")
+
+    def __init__(self, model, mass, com, inertia, gravity=GRAVITY):
+        self.model = model
+        n = self.n_joints = model.n_joints
+        self.mass = np.ascontiguousarray(mass, dtype=float)
+        self.com = np.ascontiguousarray(com, dtype=float)
+        inertia = np.asarray(inertia, dtype=float)
+        if inertia.shape == (n, 3):
+            inertia = inertia[:, :, None] * np.eye(3)
+        self.inertia = np.ascontiguousarray(inertia)
+        if self.mass.shape != (n,) or self.com.shape != (n, 3) or self.inertia.shape != (n, 3, 3):
+            raise ValueError(f"expected mass ({n},), com ({n}, 3), inertia ({n}, 3, 3) or ({n}, 3)")
+        if np.any(self.mass < 0):
+            raise ValueError("link masses must be non-negative")
+        self.gravity = np.asarray(gravity, dtype=float)
+        # frame i 에서 본 frame i 원점 (frame i-1 원점 기준), 관절각과 무관
+        self._p = np.stack([model.a, model.d * model._sa, model.d * model._ca], axis=-1)
+        # frame i 원점 기준 링크 관성: 1차 모멘트 h = m r, I_o = I_c + m (|r|² E - r rᵀ) (평행축 정리)
+        self._h = self.mass[:, None] * self.com
+        self._I_origin = self.inertia + self.mass[:, None, None] * (
+            np.einsum("ni,ni->n", self.com, self.com)[:, None, None] * np.eye(3)
+            - self.com[:, :, None] * self.com[:, None, :])
+        # 관절 i 의 단위 운동 (frame i 원점 기준 spatial velocity): 각속도 s = 축 z_{i-1}, 선속도 v = s x p*
+        self._s = np.stack([np.zeros(n), model._sa, model._ca], axis=-1)
+        self._v = np.cross(self._s, self._p)
+        # 단일 자세 경로용 python float 사본
+        self._scalar = (model._ca.tolist(), model._sa.tolist(), [tuple(p) for p in self._p.tolist()],
+                        [tuple(r) for r in self.com.tolist()], [tuple(map(tuple, I)) for I in self.inertia.tolist()],
+                        self.mass.tolist(), [tuple(p + r for p, r in zip(p_i, r_i))
+                                             for p_i, r_i in zip(self._p.tolist(), self.com.tolist())])
+        self._scalar_crba = (model.a.tolist(), model.d.tolist(), self.mass.tolist(),
+                             [tuple(h) for h in self._h.tolist()], [tuple(map(tuple, I)) for I in self._I_origin.tolist()],
+                             [tuple(s) for s in self._s.tolist()], [tuple(v) for v in self._v.tolist()])
+
+    def __repr__(self):
+        return f"DynamicsModel(n_joints={self.n_joints}, total_mass={self.mass.sum():.3f} kg)"
+
+    # --- Inverse Dynamics ---
+    def inverse_dynamics(self, q, qd, qdd, gravity=True):
+        """
+        RNEA: q, qd, qdd (B, n) 또는 (n,) -> 관절 토크 tau (B, n), 셋 다 (n,) 일 때만 (n,)
+        하나만 (B, n) 이면 나머지를 broadcast (예: 한 자세에서 여러 가속도)
+        gravity=False 면 중력 항 없이 (가속도 / 원심력 / Coriolis 만)
+        """
+        q = np.asarray(q, dtype=float)
+        if q.ndim == 1 and np.ndim(qd) == 1 and np.ndim(qdd) == 1:
+            return self._inverse_dynamics_single(q.tolist(), np.asarray(qd, dtype=float).tolist(),
+                                                 np.asarray(qdd, dtype=float).tolist(), gravity)
+        q, qd, qdd = (np.atleast_2d(np.asarray(x, dtype=float)) for x in (q, qd, qdd))
+        q, qd, qdd = np.broadcast_arrays(q, qd, qdd)
+        B, n = q.shape
+        if n != self.n_joints:
+            raise ValueError(f"expected {self.n_joints} joint values, got {n}")
+        if B <= SMALL_BATCH:
+            return np.array([self._inverse_dynamics_single(*rows, gravity)
+                             for rows in zip(q.tolist(), qd.tolist(), qdd.tolist())]).reshape(B, n)
+        ct, st = np.cos(q), np.sin(q)
+        ca, sa = self.model._ca, self.model._sa
+
+        # --- 바깥쪽으로: 각속도 / 각가속도 / frame 원점 가속도 (frame i 기준) ---
+        w = np.zeros((B, 3))
+        dw = np.zeros((B, 3))
+        dv = np.zeros((B, 3))
+        if gravity:
+            dv[:] = -self.gravity
+        forces, moments = [], []
+        for i in range(n):
+            c, s = ct[:, i], st[:, i]
+            # 관절축 z_{i-1} 을 더한 뒤 frame i 로
+            w_prev = w
+            w_axis = w.copy()
+            w_axis[:, 2] += qd[:, i]
+            w = _rotate_back(w_axis, c, s, ca[i], sa[i])
+            dw_axis = dw.copy()
+            dw_axis[:, 2] += qdd[:, i]
+            # w_{i-1} x (z qd) = (w_y qd, -w_x qd, 0)
+            dw_axis[:, 0] += w_prev[:, 1] * qd[:, i]
+            dw_axis[:, 1] -= w_prev[:, 0] * qd[:, i]
+            dw = _rotate_back(dw_axis, c, s, ca[i], sa[i])
+            p = self._p[i]
+            dv = _rotate_back(dv, c, s, ca[i], sa[i]) + _cross(dw, p) + _cross(w, _cross(w, p))
+            # 무게중심 가속도 -> 링크에 걸리는 합력 / 합모멘트 (무게중심 기준)
+            r = self.com[i]
+            dvc = dv + _cross(dw, r) + _cross(w, _cross(w, r))
+            I = self.inertia[i]
+            forces.append(self.mass[i] * dvc)
+            moments.append(dw @ I.T + _cross(w, w @ I.T))
+
+        # --- 안쪽으로: 관절 i 가 링크 i 에 주는 힘 f / 모멘트 m (frame i 기준) ---
+        tau = np.empty((B, n))
+        f = np.zeros((B, 3))
+        m = np.zeros((B, 3))
+        for i in range(n - 1, -1, -1):
+            if i < n - 1:
+                # 바깥 링크에서 받은 힘을 frame i 로
+                c, s = ct[:, i + 1], st[:, i + 1]
+                f = _rotate(f, c, s, ca[i + 1], sa[i + 1])
+                m = _rotate(m, c, s, ca[i + 1], sa[i + 1])
+            p = self._p[i]
+            F = forces[i]
+            m = m + _cross(p, f) + _cross(p + self.com[i], F) + moments[i]
+            f = f + F
+            # 관절축 z_{i-1} 을 frame i 에서 본 것 = [0, sinα, cosα]
+            tau[:, i] = m[:, 1] * sa[i] + m[:, 2] * ca[i]
+        return tau
+
+    def _inverse_dynamics_single(self, q, qd, qdd, gravity):
+        """inverse_dynamics 와 같은 식을 float tuple 로 (단일 자세)"""
+        if len(q) != self.n_joints or len(qd) != self.n_joints or len(qdd) != self.n_joints:
+            raise ValueError(f"expected {self.n_joints} joint values")
+        ca, sa, ps, coms, inertias, masses, pcs = self._scalar
+        w = dw = (0.0, 0.0, 0.0)
+        dv = tuple(-g for g in self.gravity.tolist()) if gravity else (0.0, 0.0, 0.0)
+        trig, forces, moments = [], [], []
+        for i in range(self.n_joints):
+            c, s = math.cos(q[i]), math.sin(q[i])
+            trig.append((c, s))
+            v, a = qd[i], qdd[i]
+            dw = _rotate_back3((dw[0] + w[1] * v, dw[1] - w[0] * v, dw[2] + a), c, s, ca[i], sa[i])
+            w = _rotate_back3((w[0], w[1], w[2] + v), c, s, ca[i], sa[i])
+            p, r, I = ps[i], coms[i], inertias[i]
+            dv = _rotate_back3(dv, c, s, ca[i], sa[i])
+            t1, t2 = _cross3(dw, p), _cross3(w, _cross3(w, p))
+            dv = (dv[0] + t1[0] + t2[0], dv[1] + t1[1] + t2[1], dv[2] + t1[2] + t2[2])
+            t1, t2 = _cross3(dw, r), _cross3(w, _cross3(w, r))
+            m = masses[i]
+            forces.append((m * (dv[0] + t1[0] + t2[0]), m * (dv[1] + t1[1] + t2[1]), m * (dv[2] + t1[2] + t2[2])))
+            Iw = tuple(row[0] * w[0] + row[1] * w[1] + row[2] * w[2] for row in I)
+            t1 = _cross3(w, Iw)
+            moments.append(tuple(row[0] * dw[0] + row[1] * dw[1] + row[2] * dw[2] + t for row, t in zip(I, t1)))
+
+        tau = np.empty(self.n_joints)
+        f = n = (0.0, 0.0, 0.0)
+        for i in range(self.n_joints - 1, -1, -1):
+            if i < self.n_joints - 1:
+                c, s = trig[i + 1]
+                f = _rotate3(f, c, s, ca[i + 1], sa[i + 1])
+                n = _rotate3(n, c, s, ca[i + 1], sa[i + 1])
+            F = forces[i]
+            t1, t2, N = _cross3(ps[i], f), _cross3(pcs[i], F), moments[i]
+            n = (n[0] + t1[0] + t2[0] + N[0], n[1] + t1[1] + t2[1] + N[1], n[2] + t1[2] + t2[2] + N[2])
+            f = (f[0] + F[0], f[1] + F[1], f[2] + F[2])
+            tau[i] = n[1] * sa[i] + n[2] * ca[i]
+        return tau
+
+    # --- Mass Matrix / Forward Dynamics ---
+    def mass_matrix(self, q):
+        """
+        CRBA: q (B, n) 또는 (n,) -> M (B, n, n) 또는 (n, n)
+        composite 관성 (질량 m, 1차 모멘트 h, 원점 기준 관성 I) 을 frame i 로 옮겨가며 안쪽으로 누적하고,
+        관절 j 를 단위 가속할 때 필요한 spatial 힘을 j 부터 안쪽 관절축에 투영해서 M[i, j]
+        """
+        q = np.asarray(q, dtype=float)
+        single = q.ndim == 1
+        q = np.atleast_2d(q)
+        B, n = q.shape
+        if n != self.n_joints:
+            raise ValueError(f"expected {self.n_joints} joint values, got {n}")
+        if B <= SMALL_BATCH:
+            M = np.array([self._mass_matrix_single(row) for row in q.tolist()]).reshape(B, n, n)
+            return M[0] if single else M
+        ct, st = np.cos(q), np.sin(q)
+        ca, sa = self.model._ca, self.model._sa
+        # R_i = Rz(θ) Rx(α) (frame i -> i-1), o_i = frame i-1 에서 본 frame i 원점
+        R = np.empty((B, n, 3, 3))
+        R[..., 0, 0] = ct
+        R[..., 0, 1] = -st * ca
+        R[..., 0, 2] = st * sa
+        R[..., 1, 0] = st
+        R[..., 1, 1] = ct * ca
+        R[..., 1, 2] = -ct * sa
+        R[..., 2, 0] = 0.0
+        R[..., 2, 1] = sa
+        R[..., 2, 2] = ca
+        o = np.empty((B, n, 3))
+        o[..., 0] = self.model.a * ct
+        o[..., 1] = self.model.a * st
+        o[..., 2] = self.model.d
+
+        # --- composite 관성, 바깥에서 안쪽으로 ---
+        comp_m = np.empty(n)
+        comp_h = np.empty((B, n, 3))
+        comp_I = np.empty((B, n, 3, 3))
+        diag = np.arange(3)
+        for i in range(n - 1, -1, -1):
+            comp_m[i] = self.mass[i]
+            comp_h[:, i] = self._h[i]
+            comp_I[:, i] = self._I_origin[i]
+            if i == n - 1:
+                continue
+            # 자식 composite (frame i+1) 를 frame i 로: c = R h, h' = c + m p,
+            # I' = R I Rᵀ + m (|p|² E - p pᵀ) + 2 (p·c) E - c pᵀ - p cᵀ
+            Rc, p, m = R[:, i + 1], o[:, i + 1], comp_m[i + 1]
+            c = np.einsum("bij,bj->bi", Rc, comp_h[:, i + 1])
+            pc = np.einsum("bi,bi->b", p, c)
+            pp = np.einsum("bi,bi->b", p, p)
+            # -m p pᵀ - c pᵀ = -(m p + c) pᵀ 로 외적 하나를 줄이고, 대각 항은 대각선에만 더함
+            u = c + m * p
+            comp_m[i] += m
+            comp_h[:, i] += u
+            comp_I[:, i] += (Rc @ comp_I[:, i + 1] @ np.swapaxes(Rc, 1, 2)
+                             - u[:, :, None] * p[:, None, :] - p[:, :, None] * c[:, None, :])
+            comp_I[:, i, diag, diag] += (m * pp + 2.0 * pc)[:, None]
+
+        # --- 관절 j 단위 가속에 필요한 힘을 안쪽 관절로 전달 ---
+        M = np.empty((B, n, n))
+        for j in range(n):
+            s, v = self._s[j], self._v[j]
+            h = comp_h[:, j]
+            # momentum (n = I ω + h x v, f = m v + ω x h), ω = s, v = v
+            moment = comp_I[:, j] @ s + _cross(h, v)
+            force = comp_m[j] * v + _cross(s, h)
+            M[:, j, j] = moment @ s + force @ v
+            for i in range(j - 1, -1, -1):
+                force = _rotate(force, ct[:, i + 1], st[:, i + 1], ca[i + 1], sa[i + 1])
+                moment = _rotate(moment, ct[:, i + 1], st[:, i + 1], ca[i + 1], sa[i + 1]) + _cross(o[:, i + 1], force)
+                M[:, i, j] = M[:, j, i] = moment @ self._s[i] + force @ self._v[i]
+        return M[0] if single else M
+
+    def _mass_matrix_single(self, q):
+        """mass_matrix 와 같은 CRBA 를 float tuple 로 (단일 자세) -> n x n 리스트"""
+        n = self.n_joints
+        ca, sa = self._scalar[0], self._scalar[1]
+        a, d, masses, hs, inertias, axes, lins = self._scalar_crba
+        trig = [(math.cos(x), math.sin(x)) for x in q]
+        # R_i = Rz(θ) Rx(α) 의 행, frame i-1 에서 본 frame i 원점
+        R = [((c, -s * ca[i], s * sa[i]), (s, c * ca[i], -c * sa[i]), (0.0, sa[i], ca[i]))
+             for i, (c, s) in enumerate(trig)]
+        o = [(a[i] * c, a[i] * s, d[i]) for i, (c, s) in enumerate(trig)]
+
+        comp_m, comp_h, comp_I = [0.0] * n, [None] * n, [None] * n
+        comp_m[-1], comp_h[-1], comp_I[-1] = masses[-1], hs[-1], inertias[-1]
+        for i in range(n - 2, -1, -1):
+            Rc, p, m, h, Ic = R[i + 1], o[i + 1], comp_m[i + 1], comp_h[i + 1], comp_I[i + 1]
+            c = tuple(row[0] * h[0] + row[1] * h[1] + row[2] * h[2] for row in Rc)
+            u = (c[0] + m * p[0], c[1] + m * p[1], c[2] + m * p[2])
+            RI = [tuple(row[0] * Ic[0][k] + row[1] * Ic[1][k] + row[2] * Ic[2][k] for k in range(3)) for row in Rc]
+            diag = m * (p[0] * p[0] + p[1] * p[1] + p[2] * p[2]) + 2.0 * (p[0] * c[0] + p[1] * c[1] + p[2] * c[2])
+            I0 = inertias[i]
+            comp_I[i] = tuple(tuple(I0[r][k] + RI[r][0] * Rc[k][0] + RI[r][1] * Rc[k][1] + RI[r][2] * Rc[k][2]
+                                    - u[r] * p[k] - p[r] * c[k] + (diag if r == k else 0.0) for k in range(3))
+                              for r in range(3))
+            comp_m[i] = masses[i] + m
+            h0 = hs[i]
+            comp_h[i] = (h0[0] + u[0], h0[1] + u[1], h0[2] + u[2])
+
+        M = [[0.0] * n for _ in range(n)]
+        for j in range(n):
+            s, v, h, I, m = axes[j], lins[j], comp_h[j], comp_I[j], comp_m[j]
+            hv, sh = _cross3(h, v), _cross3(s, h)
+            moment = tuple(row[0] * s[0] + row[1] * s[1] + row[2] * s[2] + t for row, t in zip(I, hv))
+            force = (m * v[0] + sh[0], m * v[1] + sh[1], m * v[2] + sh[2])
+            M[j][j] = moment[1] * s[1] + moment[2] * s[2] + force[0] * v[0] + force[1] * v[1] + force[2] * v[2]
+            for i in range(j - 1, -1, -1):
+                c, s_ = trig[i + 1]
+                force = _rotate3(force, c, s_, ca[i + 1], sa[i + 1])
+                moment = _rotate3(moment, c, s_, ca[i + 1], sa[i + 1])
+                t = _cross3(o[i + 1], force)
+                moment = (moment[0] + t[0], moment[1] + t[1], moment[2] + t[2])
+                si, vi = axes[i], lins[i]
+                M[i][j] = M[j][i] = (moment[1] * si[1] + moment[2] * si[2]
+                                     + force[0] * vi[0] + force[1] * vi[1] + force[2] * vi[2])
+        return M
+
+    def forward_dynamics(self, q, qd, tau):
+        """qdd = M(q)⁻¹ (tau - C(q, qd) qd - g(q)), (B, n) 또는 (n,) (inverse_dynamics 처럼 broadcast)"""
+        q, qd, tau = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (q, qd, tau)))
+        rhs = tau - self.bias_torques(q, qd)
+        return np.linalg.solve(self.mass_matrix(q), rhs[..., None])[..., 0]
+
+    def gravity_torques(self, q):
+        """g(q): 정지 자세를 유지하는 토크"""
+        q = np.asarray(q, dtype=float)
+        zero = np.zeros_like(q)
+        return self.inverse_dynamics(q, zero, zero)
+
+    def coriolis_torques(self, q, qd):
+        """C(q, qd) qd: 원심력 + Coriolis 항 (중력 제외)"""
+        q = np.asarray(q, dtype=float)
+        return self.inverse_dynamics(q, qd, np.zeros_like(q), gravity=False)
+
+    def bias_torques(self, q, qd):
+        """C(q, qd) qd + g(q) (qdd = 0 인 RNEA 한 번)"""
+        q = np.asarray(q, dtype=float)
+        return self.inverse_dynamics(q, qd, np.zeros_like(q))
+
+# --- Lagrangian Reference ---
+def _com_jacobians(dyn, q):
+    """단일 자세 -> 링크별 무게중심 위치 (n, 3), 선속도 Jacobian (n, 3, n), 각속도 Jacobian (n, 3, n), 회전 (n, 3, 3)"""
+    T_0i = dyn.model.frames(q).copy()
+    n = dyn.n_joints
+    z = T_0i[:-1, :3, 2]
+    o = T_0i[:-1, :3, 3]
+    R = T_0i[1:, :3, :3]
+    pc = T_0i[1:, :3, 3] + np.einsum("nij,nj->ni", R, dyn.com)
+    Jv = np.zeros((n, 3, n))
+    Jw = np.zeros((n, 3, n))
+    for i in range(n):
+        for j in range(i + 1):
+            Jv[i, :, j] = np.cross(z[j], pc[i] - o[j])
+            Jw[i, :, j] = z[j]
+    return pc, Jv, Jw, R
+
+def lagrangian_mass_matrix(dyn, q):
+    """M(q) = Σ m Jvᵀ Jv + Jwᵀ R I Rᵀ Jw (단일 자세)"""
+    _, Jv, Jw, R = _com_jacobians(dyn, q)
+    I_world = R @ dyn.inertia @ np.swapaxes(R, 1, 2)
+    return (np.einsum("k,kin,kim->nm", dyn.mass, Jv, Jv)
+            + np.einsum("kin,kij,kjm->nm", Jw, I_world, Jw))
+
+def lagrangian_potential(dyn, q):
+    pc = _com_jacobians(dyn, q)[0]
+    return -float(dyn.mass @ (pc @ dyn.gravity))
+
+def lagrangian_inverse_dynamics(dyn, q, qd, qdd, eps=1e-6):
+    """
+    검증용 (느림): tau = M qdd + C qd + g, 단일 자세
+    C 는 M 의 편미분으로 만든 Christoffel 기호, g 는 위치 에너지의 편미분 (둘 다 중앙 차분)
+    """
+    q, qd, qdd = (np.asarray(x, dtype=float) for x in (q, qd, qdd))
+    n = len(q)
+    M = lagrangian_mass_matrix(dyn, q)
+    dM = np.empty((n, n, n))    # dM[k] = ∂M / ∂q_k
+    g = np.empty(n)
+    for k in range(n):
+        step = np.zeros(n)
+        step[k] = eps
+        dM[k] = (lagrangian_mass_matrix(dyn, q + step) - lagrangian_mass_matrix(dyn, q - step)) / (2 * eps)
+        g[k] = (lagrangian_potential(dyn, q + step) - lagrangian_potential(dyn, q - step)) / (2 * eps)
+    # c_k = Σ_ij (∂M_kj/∂q_i - ½ ∂M_ij/∂q_k) qd_i qd_j
+    coriolis = np.einsum("ikj,i,j->k", dM, qd, qd) - 0.5 * np.einsum("kij,i,j->k", dM, qd, qd)
+    return M @ qdd + coriolis + g
+
+def random_dynamics(n, rng, scale=1.0):
+    """검증용 임의의 팔: DH 와 관성 파라미터 (관성 텐서는 양의 정부호 + 삼각 부등식 만족)"""
+    model = RobotModel(rng.uniform(-0.5, 0.5, n) * scale, rng.uniform(-0.3, 0.3, n) * scale,
+                       rng.uniform(-np.pi, np.pi, n))
+    mass = rng.uniform(0.5, 5.0, n)
+    com = rng.uniform(-0.2, 0.2, (n, 3)) * scale
+    # 직육면체 주관성 -> 임의 회전
+    sides = rng.uniform(0.05, 0.4, (n, 3)) * scale
+    principal = mass[:, None] / 12.0 * (sides[:, [1, 0, 0]] ** 2 + sides[:, [2, 2, 1]] ** 2)
+    Q = np.linalg.qr(rng.normal(size=(n, 3, 3)))[0]
+    inertia = Q @ (principal[:, :, None] * np.eye(3)) @ np.swapaxes(Q, 1, 2)
+    return DynamicsModel(model, mass, com, inertia)
+
+# UR 공개 DH / 질량 / 무게중심 값 기준, 관성은 링크를 원기둥으로 본 근사
+UR5_DH = ([0, -0.425, -0.392, 0, 0, 0], [0.089, 0, 0, 0.109, 0.095, 0.082],
+          [np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+UR5_MASS = [3.7, 8.393, 2.33, 1.219, 1.219, 0.1879]
+UR5_COM = [[0.0, -0.02561, 0.00193], [0.2125, 0.0, 0.11336], [0.15, 0.0, 0.0265],
+           [0.0, -0.0018, 0.01634], [0.0, 0.0018, 0.01634], [0.0, 0.0, -0.001159]]
+UR5_INERTIA = [[0.0103, 0.0103, 0.0067], [0.0151, 0.2269, 0.2269], [0.0041, 0.0494, 0.0494],
+               [0.0026, 0.0026, 0.0022], [0.0026, 0.0026, 0.0022], [0.0001, 0.0001, 0.0001]]
+
+def ur5_dynamics():
+    return DynamicsModel(RobotModel(*UR5_DH), UR5_MASS, UR5_COM, UR5_INERTIA)
+
+def main():
+    from trajectory import plan_trajectory
+
+    parser = argparse.ArgumentParser(description="Batched RNEA: validation against Lagrangian + throughput")
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--checks", type=int, default=50, help="random (arm, state) pairs per joint count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    # --- 검증: 작은 임의의 팔에서 RNEA vs Lagrangian ---
+    for n in (2, 3, 4):
+        worst_abs, worst_rel = 0.0, 0.0
+        for _ in range(args.checks):
+            dyn = random_dynamics(n, rng)
+            q, qd, qdd = rng.uniform(-np.pi, np.pi, n), rng.normal(0, 2, n), rng.normal(0, 5, n)
+            ref = lagrangian_inverse_dynamics(dyn, q, qd, qdd)
+            err = np.abs(dyn.inverse_dynamics(q, qd, qdd) - ref).max()
+            worst_abs = max(worst_abs, err)
+            worst_rel = max(worst_rel, err / max(np.abs(ref).max(), 1e-12))
+        print(f"{n} joints: RNEA vs Lagrangian over {args.checks} arms, max |Δτ| {worst_abs:.2e} N·m "
+              f"(relative {worst_rel:.2e})")
+
+    # batch 결과가 자세별 결과와 같은지
+    dyn = ur5_dynamics()
+    B = args.batch
+    q, qd, qdd = rng.uniform(-np.pi, np.pi, (B, 6)), rng.normal(0, 1, (B, 6)), rng.normal(0, 3, (B, 6))
+    tau = dyn.inverse_dynamics(q, qd, qdd)
+    single = np.array([dyn.inverse_dynamics(q[k], qd[k], qdd[k]) for k in range(20)])
+    print(f"batch vs single-state max |Δτ| {np.abs(tau[:20] - single).max():.1e} N·m")
+    split = (dyn.inverse_dynamics(q[:20], np.zeros((20, 6)), qdd[:20], gravity=False)
+             + dyn.bias_torques(q[:20], qd[:20]))
+    print(f"M qdd + (C qd + g) vs full RNEA max |Δτ| {np.abs(tau[:20] - split).max():.1e} N·m")
+
+    # CRBA 질량 행렬 vs Lagrangian M(q), forward_dynamics 가 RNEA 의 역인지
+    worst_mass = max(np.abs(dyn.mass_matrix(q[k]) - lagrangian_mass_matrix(dyn, q[k])).max() for k in range(20))
+    print(f"CRBA vs Lagrangian mass matrix max |ΔM| {worst_mass:.1e} kg·m²")
+    qdd_fd = dyn.forward_dynamics(q, qd, tau)
+    print(f"forward_dynamics(inverse_dynamics(qdd)) max |Δqdd| {np.abs(qdd_fd - qdd).max():.1e} rad/s²")
+
+    # --- 처리량 ---
+    start = time.perf_counter()
+    for k in range(200):
+        dyn.inverse_dynamics(q[k], qd[k], qdd[k])
+    t_single = (time.perf_counter() - start) / 200
+    start = time.perf_counter()
+    dyn.inverse_dynamics(q, qd, qdd)
+    t_batch = time.perf_counter() - start
+    print(f"UR5 single state: {t_single * 1e6:7.1f} us/call; batch {B:,}: {t_batch * 1e3:.1f} ms "
+          f"({B / t_batch:,.0f} states/s, {t_single * B / t_batch:.0f}x)")
+    start = time.perf_counter()
+    dyn.forward_dynamics(q, qd, tau)
+    t_fd = time.perf_counter() - start
+    print(f"UR5 forward dynamics batch {B:,}: {t_fd * 1e3:.1f} ms ({B / t_fd:,.0f} states/s)")
+
+    # --- 궤적 전체 토크 (한 번 호출) ---
+    waypoints = rng.uniform(-np.pi, np.pi, (4, 6))
+    samples = plan_trajectory(waypoints, "quintic", max_velocity=3.15, max_acceleration=8.0).sample(0.001)
+    start = time.perf_counter()
+    torque = dyn.inverse_dynamics(samples["q"], samples["qd"], samples["qdd"])
+    elapsed = time.perf_counter() - start
+    gravity_share = np.abs(dyn.gravity_torques(samples["q"])).max(axis=0) / np.abs(torque).max(axis=0)
+    print(f"quintic trajectory, {len(samples['t']):,} samples at 1 ms: torque profile in {elapsed * 1e3:.1f} ms")
+    print(f"  peak |tau| per joint (N·m): {np.round(np.abs(torque).max(axis=0), 2).tolist()}")
+    print(f"  gravity-only peak / total peak: {np.round(gravity_share, 2).tolist()}")
+
+if __name__ == "__main__":
+    main()
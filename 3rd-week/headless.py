@@ -0,0 +1,310 @@
+# GUI 없이 쓰는 batch 분석 진입점 (CLI + 라이브러리)
+# think.py / eva-centi.py 는 import 하는 순간 input() 으로 파라미터를 받고 matplotlib 창을 만들어서
+# batch 작업에서 재사용할 수 없음. 여기서는
+#   - 로봇 파라미터는 파일에서 읽음 (DH 표 텍스트 또는 JSON)
+#   - 관절각 배열 (.npy / .csv / .txt) 에 대해 FK / Jacobian / condition number / 충돌 검사
+#   - 결과는 .npz (배열 그대로) 또는 .csv (자세별 요약) 로 저장
+#   - numpy 와 kinematics 만 module 시작 시 import, collision / matplotlib 은 필요할 때만 import
+#     (scipy 는 쓰지 않음)
+#
+# 파라미터 파일
+#   텍스트: 관절마다 한 줄 "a d alpha" (alpha 는 도, '#' 주석), input_robot_parameters() 와 같은 단위
+#   JSON  : {"a": [...], "d": [...], "alpha": [...], "alpha_unit": "deg" | "rad"}  (기본 deg)
+# 장애물 파일 (JSON): {"spheres": [[x, y, z, r], ...], "boxes": [[cx, cy, cz, hx, hy, hz], ...]}
+#
+# 사용법
+# python3 headless.py robot.txt joints.npy -o result.npz --degrees --analyses fk jacobian condition
+# python3 headless.py robot.txt joints.csv -o result.csv --obstacles scene.json --link-radius 2 --timing
+# python3 headless.py robot.txt joints.npy -o result.csv --obstacles scene.json --margin 20   # 20 안쪽 거리만
+# python3 headless.py robot.txt joints.npy -o result.npz --plot preview.png
+# python3 headless.py --self-check     # 크기 0 장애물 / NaN 자세에서 analyze 가 끝나는지, 거리가 전수 계산과 같은지
+
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from kinematics import RobotModel
+
+ANALYSES = ("fk", "jacobian", "condition", "collision")
+# 충돌 검사 한 번에 넣는 (링크, 장애물) 쌍 상한 -> chunk 크기를 링크 수 x 장애물 수로 나눠 메모리 제한
+COLLISION_PAIRS_PER_CHUNK = 1 << 20
+
+# --- Loading ---
+def load_robot_parameters(path):
+    """파라미터 파일 -> RobotModel (alpha 는 라디안으로 변환)"""
+    if path.endswith(".json"):
+        with open(path) as f:
+            spec = json.load(f)
+        alpha = np.asarray(spec["alpha"], dtype=float)
+        if spec.get("alpha_unit", "deg") == "deg":
+            alpha = np.radians(alpha)
+        return RobotModel(spec["a"], spec["d"], alpha)
+    table = np.loadtxt(path, comments="#", ndmin=2)
+    if table.shape[1] != 3:
+        raise ValueError(f"{path}: expected one 'a d alpha' row per joint, got {table.shape[1]} columns")
+    return RobotModel(table[:, 0], table[:, 1], np.radians(table[:, 2]))
+
+def load_joints(path, mmap=True):
+    """
+    관절각 파일 -> (N, n) 배열 (단위 변환 없음). .npy 는 memory map 으로 읽어서
+    analyze 가 chunk 단위로 필요한 부분만 읽게 함
+    """
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r" if mmap else None)
+    return np.loadtxt(path, delimiter="," if path.endswith(".csv") else None, comments="#", ndmin=2)
+
+def load_scene(path, cell_size=None):
+    from collision import Scene
+
+    with open(path) as f:
+        spec = json.load(f)
+    scene = Scene(cell_size)
+    spheres = np.asarray(spec.get("spheres", []), dtype=float).reshape(-1, 4)
+    boxes = np.asarray(spec.get("boxes", []), dtype=float).reshape(-1, 6)
+    if len(spheres):
+        scene.add_spheres(spheres[:, :3], spheres[:, 3])
+    if len(boxes):
+        scene.add_boxes(boxes[:, :3], boxes[:, 3:])
+    return scene.build()
+
+# --- Analysis ---
+def analyze(model, theta, analyses=("fk",), scene=None, link_radius=0.0, degrees=False, chunk_size=65536,
+            margin=None):
+    """
+    theta (N, n) 관절각 (degrees=True 면 도) 에 대해 analyses 를 chunk 단위로 계산
+    returns dict
+        fk        -> T (N, 4, 4), positions (N, n + 1, 3)
+        jacobian  -> J (N, 6, n)
+        condition -> condition (N,), manipulability (N,)
+        collision -> collision (N,), min_distance (N,)   (scene 필요, NaN 이 든 자세는 False / nan)
+    margin: min_distance 를 이 거리까지만 계산 (그 밖은 inf). None 이면 정확한 최소 거리 (nearest_distances)
+    충돌 검사는 chunk 를 다시 COLLISION_PAIRS_PER_CHUNK / (링크 수 x 장애물 수) 자세씩 나눠서 계산
+    """
+    analyses = tuple(analyses)
+    unknown = set(analyses) - set(ANALYSES)
+    if unknown:
+        raise ValueError(f"unknown analyses: {sorted(unknown)}")
+    if "collision" in analyses and scene is None:
+        raise ValueError("collision analysis needs a scene (--obstacles)")
+    if "condition" in analyses:
+        from singularity import conditioning_metrics
+
+    theta = np.atleast_2d(theta)
+    N, n = theta.shape
+    if n != model.n_joints:
+        raise ValueError(f"joint array has {n} columns, robot has {model.n_joints} joints")
+
+    out = {}
+    if "fk" in analyses:
+        out["T"] = np.empty((N, 4, 4))
+        out["positions"] = np.empty((N, n + 1, 3))
+    if "jacobian" in analyses:
+        out["J"] = np.empty((N, 6, n))
+    if "condition" in analyses:
+        out["condition"] = np.empty(N)
+        out["manipulability"] = np.empty(N)
+    if "collision" in analyses:
+        out["collision"] = np.empty(N, dtype=bool)
+        out["min_distance"] = np.empty(N)
+        collision_chunk = max(1, COLLISION_PAIRS_PER_CHUNK // max(1, n * len(scene)))
+
+    need_jacobian = "jacobian" in analyses or "condition" in analyses
+    for s in range(0, N, chunk_size):
+        e = min(s + chunk_size, N)
+        chunk = np.asarray(theta[s:e], dtype=float)
+        if degrees:
+            chunk = np.radians(chunk)
+        if need_jacobian:
+            T, positions, J = model.forward_kinematics_jacobian_batch(chunk)
+        else:
+            T, positions = model.forward_kinematics_batch(chunk)
+        if "fk" in analyses:
+            out["T"][s:e] = T
+            out["positions"][s:e] = positions
+        if "jacobian" in analyses:
+            out["J"][s:e] = J
+        if "condition" in analyses:
+            metrics = conditioning_metrics(J)
+            out["condition"][s:e] = metrics["condition"]
+            out["manipulability"][s:e] = metrics["manipulability"]
+        if "collision" in analyses:
+            for cs in range(s, e, collision_chunk):
+                ce = min(cs + collision_chunk, e)
+                pts = positions[cs - s:ce - s]
+                # NaN / inf 자세는 spatial hash cell 을 만들 수 없으므로 검사에서 빼고 collision False, 거리 nan
+                finite = np.isfinite(pts).all(axis=(1, 2))
+                if not finite.all():
+                    pts = pts[finite]
+                res = scene.check(pts, link_radius=link_radius, margin=0.0 if margin is None else margin)
+                collided = np.zeros(ce - cs, dtype=bool)
+                distance = np.full(ce - cs, np.nan)
+                collided[finite] = res["collision"]
+                if margin is None:
+                    distance[finite] = nearest_distances(scene, pts, link_radius)
+                else:
+                    distance[finite] = res["min_distance"]
+                out["collision"][cs:ce] = collided
+                out["min_distance"][cs:ce] = distance
+    return out
+
+def nearest_distances(scene, positions, link_radius=0.0):
+    """
+    positions (N, n + 1, 3) -> 장애물까지의 정확한 최소 거리 (N,)
+    scene.check 는 margin 안쪽만 보므로, 그 안에서 못 찾은 자세만 margin 을 4 배씩 키워 다시 검사
+    (처음부터 margin 을 크게 잡으면 broadphase 후보가 전체 장애물이 되어 느림)
+    시작 margin 은 장애물 크기 x 2, 단 장면 + 자세 범위의 1e-3 이상 (크기 0 인 장애물에서도 커지도록)
+    NaN / inf 가 들어간 자세는 거리를 정의할 수 없으므로 nan
+    """
+    distance = np.full(len(positions), np.inf)
+    if not len(scene) or not len(positions):
+        return distance
+    finite = np.isfinite(positions).all(axis=(1, 2))
+    distance[~finite] = np.nan
+    pending = np.flatnonzero(finite)
+    if not len(pending):
+        return distance
+    lo, hi = scene._bounds()
+    pts = positions[pending]
+    extent = float(np.max(np.maximum(hi.max(0), pts.max(axis=(0, 1))) - np.minimum(lo.min(0), pts.min(axis=(0, 1)))))
+    margin = 2.0 * max(scene.sphere_radii.max(initial=0.0), scene.box_half.max(initial=0.0))
+    margin = max(margin, 1e-3 * extent, 1e-9)
+    while len(pending) and np.isfinite(margin):
+        d = scene.check(positions[pending], link_radius=link_radius, margin=margin)["min_distance"]
+        distance[pending] = d
+        # margin 안에서 찾은 최소값은 정확 (margin 밖의 링크는 그보다 멂)
+        pending = pending[~(d <= margin)]
+        margin *= 4.0
+    return distance
+
+# --- Output ---
+def save_results(path, results):
+    """.npz 면 배열 그대로, .csv 면 자세별 요약 (end-effector 위치, 스칼라 지표)"""
+    if path.endswith(".csv"):
+        columns, header = [], []
+        if "T" in results:
+            columns.append(results["T"][:, :3, 3])
+            header += ["x", "y", "z"]
+        for key in ("condition", "manipulability", "collision", "min_distance"):
+            if key in results:
+                columns.append(results[key].astype(float)[:, None])
+                header.append(key)
+        if not columns:
+            raise ValueError("nothing to write as CSV (use .npz for Jacobians only)")
+        np.savetxt(path, np.hstack(columns), delimiter=",", header=",".join(header), comments="")
+    else:
+        np.savez(path, **results)
+
+def save_plot(path, model, theta, degrees=False, max_arms=50):
+    """앞쪽 몇 자세의 팔 모양을 이미지로 저장 (matplotlib 은 여기서만 import)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    theta = np.asarray(np.atleast_2d(theta)[:max_arms], dtype=float)
+    _, positions = model.forward_kinematics_batch(np.radians(theta) if degrees else theta)
+    fig = plt.figure(figsize=(8, 8))
+    ax = fig.add_subplot(111, projection='3d')
+    for pts in positions:
+        ax.plot(pts[:, 0], pts[:, 1], pts[:, 2], 'b-', alpha=0.4)
+    ax.scatter(positions[:, -1, 0], positions[:, -1, 1], positions[:, -1, 2], color='green', s=8)
+    ax.set_xlabel('X-axis')
+    ax.set_ylabel('Y-axis')
+    ax.set_zlabel('Z-axis')
+    fig.savefig(path)
+    plt.close(fig)
+
+# --- Self Check ---
+def self_check(seed=0):
+    """
+    analyze 의 충돌 거리 경계 사례
+      - 크기 0 인 장애물 (점 구) 만 있는 장면: 시작 margin 이 0 이어도 거리 탐색이 끝나야 함
+      - NaN 이 든 자세: collision False, min_distance nan, 나머지 자세는 영향 없음
+    거리는 scene.check(margin=inf) (모든 쌍 전수 계산) 과 비교, 틀리면 ValueError
+    """
+    from collision import Scene
+
+    model = RobotModel([0.0, 425.0, 392.0], [89.0, 0.0, 0.0], np.radians([90.0, 0.0, 0.0]))
+    theta = np.random.default_rng(seed).uniform(-np.pi, np.pi, (64, 3))
+    theta[5, 1] = np.nan
+    finite = np.isfinite(theta).all(axis=1)
+    scenes = {
+        "point sphere": Scene().add_spheres([5.0, 5.0, 5.0], 0.0),
+        "mixed": Scene().add_spheres([[5.0, 5.0, 5.0], [300.0, 0.0, 100.0]], [0.0, 50.0])
+                        .add_boxes([0.0, 400.0, 0.0], 10.0),
+    }
+    _, positions = model.forward_kinematics_batch(theta[finite])
+    for name, scene in scenes.items():
+        scene.build()
+        start = time.perf_counter()
+        res = analyze(model, theta, ["collision"], scene)
+        elapsed = time.perf_counter() - start
+        reference = scene.check(positions, margin=np.inf)["min_distance"]
+        error = np.max(np.abs(res["min_distance"][finite] - reference))
+        if error > 1e-9 or not np.all(np.isnan(res["min_distance"][~finite])) or np.any(res["collision"][~finite]):
+            raise ValueError(f"self-check failed on {name}: max |Δd| {error:.2e}, "
+                             f"non-finite rows -> {res['min_distance'][~finite]}")
+        print(f"{name:13s}: {len(theta)} configs ({np.count_nonzero(~finite)} NaN) in {elapsed * 1e3:.1f} ms, "
+              f"max |Δd| vs all pairs {error:.1e}")
+
+def main(argv=None):
+    t_main = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Headless FK / Jacobian / collision batch analysis")
+    parser.add_argument("robot", nargs="?", help="DH parameter file (.txt table or .json)")
+    parser.add_argument("joints", nargs="?", help="joint angle array (.npy, .csv, .txt), one configuration per row")
+    parser.add_argument("-o", "--output", help="result file (.npz or .csv)")
+    parser.add_argument("--analyses", nargs="+", choices=ANALYSES, default=["fk"])
+    parser.add_argument("--degrees", action="store_true", help="joint angles are in degrees")
+    parser.add_argument("--obstacles", help="obstacle JSON file (enables the collision analysis)")
+    parser.add_argument("--link-radius", type=float, default=0.0)
+    parser.add_argument("--margin", type=float, default=None,
+                        help="report min_distance only up to this distance, inf beyond (default: exact nearest distance)")
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--plot", help="save a preview image of the first configurations")
+    parser.add_argument("--timing", action="store_true", help="report startup / load / compute time")
+    parser.add_argument("--self-check", action="store_true",
+                        help="run analyze on degenerate scenes / NaN configurations and exit")
+    args = parser.parse_args(argv)
+    if args.self_check:
+        self_check()
+        return 0
+    if not (args.robot and args.joints and args.output):
+        parser.error("robot, joints and -o/--output are required")
+
+    analyses = list(args.analyses)
+    if args.obstacles and "collision" not in analyses:
+        analyses.append("collision")
+
+    t0 = time.perf_counter()
+    model = load_robot_parameters(args.robot)
+    theta = load_joints(args.joints)
+    scene = load_scene(args.obstacles) if args.obstacles else None
+    t_load = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    results = analyze(model, theta, analyses, scene, args.link_radius, args.degrees, args.chunk_size,
+                      args.margin)
+    t_compute = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    save_results(args.output, results)
+    if args.plot:
+        save_plot(args.plot, model, theta, args.degrees)
+    t_save = time.perf_counter() - t0
+
+    print(f"{len(theta):,} configurations x {model} -> {args.output} ({', '.join(analyses)})")
+    if args.timing:
+        print(f"startup (imports) : {(t_main - _START) * 1e3:8.1f} ms")
+        print(f"load              : {t_load * 1e3:8.1f} ms")
+        print(f"compute           : {t_compute * 1e3:8.1f} ms ({len(theta) / max(t_compute, 1e-12):,.0f} configs/sec)")
+        print(f"save              : {t_save * 1e3:8.1f} ms")
+        print(f"heavy modules loaded: {sorted(m for m in ('matplotlib', 'scipy') if m in sys.modules) or 'none'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
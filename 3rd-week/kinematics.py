@@ -0,0 +1,439 @@
+import math
+
+import numpy as np
+
+# --- Forward Kinematics Core Functions ---
+# 아래 함수들은 (theta, a, d, alpha) 대신 (theta, RobotModel) 로도 호출 가능
+def dh_transform(theta, d, a, alpha):
+    return np.array([
+        [np.cos(theta), -np.sin(theta) * np.cos(alpha),  np.sin(theta) * np.sin(alpha), a * np.cos(theta)],
+        [np.sin(theta),  np.cos(theta) * np.cos(alpha), -np.cos(theta) * np.sin(alpha), a * np.sin(theta)],
+        [0,              np.sin(alpha),                   np.cos(alpha),                  d],
+        [0,              0,                                  0,                             1]
+    ])
+
+def forward_kinematics(theta_list, a, d=None, alpha=None):
+    if isinstance(a, RobotModel):
+        return a.forward_kinematics(theta_list)
+    T = np.eye(4)
+    positions = []
+    for i in range(len(theta_list)):
+        T_i = dh_transform(theta_list[i], d[i], a[i], alpha[i])
+        T = T @ T_i
+        positions.append(T[:3, 3])
+    return T, positions
+
+def jacobian(theta_list, a, d=None, alpha=None):
+    if isinstance(a, RobotModel):
+        return a.jacobian(theta_list)
+    num_joints = len(theta_list)
+    J = np.zeros((6, num_joints))
+    T_0i = [np.eye(4)] * (num_joints + 1)
+    for i in range(num_joints):
+        T_i = dh_transform(theta_list[i], d[i], a[i], alpha[i])
+        T_0i[i+1] = T_0i[i] @ T_i
+    p_n = T_0i[-1][:3, 3]
+    for i in range(num_joints):
+        z_i = T_0i[i][:3, 2]
+        p_i = T_0i[i][:3, 3]
+        J[:3, i] = np.cross(z_i, (p_n - p_i))
+        J[3:, i] = z_i
+    return J
+
+def _jacobian_from_frames(T_0i):
+    """T_0i: (..., n + 1, 4, 4) base 기준 누적 변환 -> (..., 6, n) geometric Jacobian"""
+    z = T_0i[..., :-1, :3, 2]
+    p = T_0i[..., :-1, :3, 3]
+    p_n = T_0i[..., -1:, :3, 3]
+    J = np.empty(T_0i.shape[:-3] + (6, T_0i.shape[-3] - 1))
+    J[..., :3, :] = np.swapaxes(np.cross(z, p_n - p), -1, -2)
+    J[..., 3:, :] = np.swapaxes(z, -1, -2)
+    return J
+
+def forward_kinematics_jacobian(theta_list, a, d=None, alpha=None):
+    """
+    forward_kinematics + jacobian 을 체인 한번 순회로 계산
+    returns: T (4, 4), positions (forward_kinematics 와 같은 list), J (6, n)
+    """
+    if isinstance(a, RobotModel):
+        return a.forward_kinematics_jacobian(theta_list)
+    num_joints = len(theta_list)
+    T_0i = np.empty((num_joints + 1, 4, 4))
+    T_0i[0] = np.eye(4)
+    for i in range(num_joints):
+        T_0i[i+1] = T_0i[i] @ dh_transform(theta_list[i], d[i], a[i], alpha[i])
+    return T_0i[-1], list(T_0i[1:, :3, 3]), _jacobian_from_frames(T_0i)
+
+# --- Batched Forward Kinematics ---
+def _fill_dh(A, ct, st, ca, sa, a):
+    # theta 에 의존하는 8개 항만 채움 (나머지 상수항은 A 에 이미 들어있어야 함)
+    A[..., 0, 0] = ct
+    A[..., 0, 1] = -st * ca
+    A[..., 0, 2] = st * sa
+    A[..., 0, 3] = a * ct
+    A[..., 1, 0] = st
+    A[..., 1, 1] = ct * ca
+    A[..., 1, 2] = -ct * sa
+    A[..., 1, 3] = a * st
+
+def _fill_dh_constants(A, ca, sa, d):
+    A[..., 2, 1] = sa
+    A[..., 2, 2] = ca
+    A[..., 2, 3] = d
+    A[..., 3, 3] = 1.0
+
+def dh_transform_batch(theta, d, a, alpha):
+    """
+    dh_transform 을 여러 관절/자세에 대해 한번에 계산
+    theta: (..., n) 관절각, d/a/alpha: (n,) 링크 파라미터 -> (..., n, 4, 4)
+    """
+    theta = np.asarray(theta, dtype=float)
+    ca = np.cos(alpha)
+    sa = np.sin(alpha)
+    A = np.zeros(theta.shape + (4, 4))
+    _fill_dh_constants(A, ca, sa, d)
+    _fill_dh(A, np.cos(theta), np.sin(theta), ca, sa, a)
+    return A
+
+def _chain_batch(A):
+    """A: (N, n, 4, 4) 링크 변환 -> T_0i (N, n + 1, 4, 4), T_0i[:, 0] = I"""
+    N, n = A.shape[:2]
+    T_0i = np.empty((N, n + 1, 4, 4))
+    T_0i[:, 0] = np.eye(4)
+    for i in range(n):
+        np.matmul(T_0i[:, i], A[:, i], out=T_0i[:, i + 1])
+    return T_0i
+
+def forward_kinematics_batch(theta, a, d=None, alpha=None):
+    """
+    N 개의 관절 자세를 한번에 계산하는 FK
+    theta: (N, n_joints) 라디안
+    returns: T (N, 4, 4) end-effector pose, positions (N, n_joints + 1, 3)
+             positions[:, 0] 은 base 원점, positions[:, i + 1] 은 i 번째 관절 뒤의 원점
+    The only Python loop is over the joints; every step is one stacked matmul over all N.
+    """
+    if isinstance(a, RobotModel):
+        return a.forward_kinematics_batch(theta)
+    theta = np.atleast_2d(np.asarray(theta, dtype=float))
+    T_0i = _chain_batch(dh_transform_batch(theta, d, a, alpha))
+    return T_0i[:, -1], T_0i[:, :, :3, 3]
+
+def forward_kinematics_jacobian_batch(theta, a, d=None, alpha=None):
+    """
+    forward_kinematics_jacobian 의 batch 버전
+    returns: T (N, 4, 4), positions (N, n_joints + 1, 3), J (N, 6, n_joints)
+    """
+    if isinstance(a, RobotModel):
+        return a.forward_kinematics_jacobian_batch(theta)
+    theta = np.atleast_2d(np.asarray(theta, dtype=float))
+    T_0i = _chain_batch(dh_transform_batch(theta, d, a, alpha))
+    return T_0i[:, -1], T_0i[:, :, :3, 3], _jacobian_from_frames(T_0i)
+
+# --- Robot Model ---
+class RobotModel:
+    """
+    DH 테이블(a, d, alpha)로 한번 만들어두고 계속 쓰는 로봇 모델 (회전 관절 전용)
+    cos(alpha), sin(alpha), a, d 와 링크 변환의 상수항은 생성 시 한번만 계산해두고
+    호출마다 theta 에 의존하는 항만 채움.
+    내부 버퍼를 재사용하므로 한 인스턴스를 여러 스레드에서 동시에 쓰면 안됨.
+    """
+    __slots__ = ("n_joints", "a", "d", "alpha", "_ca", "_sa", "_nca", "_nsa", "_A", "_T_0i")
+
+    def __init__(self, a, d, alpha):
+        self.a = np.ascontiguousarray(a, dtype=float)
+        self.d = np.ascontiguousarray(d, dtype=float)
+        self.alpha = np.ascontiguousarray(alpha, dtype=float)
+        if not (self.a.shape == self.d.shape == self.alpha.shape) or self.a.ndim != 1:
+            raise ValueError("a, d, alpha must be 1-D arrays of the same length")
+        self.n_joints = len(self.a)
+        self._ca = np.cos(self.alpha)
+        self._sa = np.sin(self.alpha)
+        self._nca = -self._ca
+        self._nsa = -self._sa
+
+        # 링크별 변환 행렬 버퍼: 상수항(3행, 4행)은 여기서 한번만 채움
+        self._A = np.zeros((self.n_joints, 4, 4))
+        _fill_dh_constants(self._A, self._ca, self._sa, self.d)
+        self._T_0i = np.empty((self.n_joints + 1, 4, 4))
+        self._T_0i[0] = np.eye(4)
+
+    def __repr__(self):
+        return f"RobotModel(n_joints={self.n_joints})"
+
+    def dh_params(self):
+        """input_robot_parameters() 와 같은 형태의 (a, d, alpha)"""
+        return self.a, self.d, self.alpha
+
+    def link_transforms(self, theta_list):
+        """각 링크의 변환 행렬 (n, 4, 4). 내부 버퍼의 view 를 반환함"""
+        theta = np.asarray(theta_list, dtype=float)
+        _fill_dh(self._A, np.cos(theta), np.sin(theta), self._ca, self._sa, self.a)
+        return self._A
+
+    def frames(self, theta_list):
+        """base 기준 누적 변환 T_0i (n + 1, 4, 4). 내부 버퍼의 view 를 반환함"""
+        A = self.link_transforms(theta_list)
+        T_0i = self._T_0i
+        for i in range(self.n_joints):
+            np.matmul(T_0i[i], A[i], out=T_0i[i + 1])
+        return T_0i
+
+    def buffers(self, batch=None):
+        """out= 인자용 KinematicsBuffers (batch=None: 단일 자세, 정수: 자세 N 개)"""
+        return KinematicsBuffers(self, batch)
+
+    def forward_kinematics(self, theta_list, out=None):
+        """out (KinematicsBuffers) 을 주면 out.T, out.positions 에 쓰고 out 을 반환 (새 배열 할당 없음)"""
+        if out is not None:
+            return out._evaluate(self, theta_list, False)
+        T_0i = self.frames(theta_list)
+        return T_0i[-1].copy(), list(T_0i[1:, :3, 3].copy())
+
+    def jacobian(self, theta_list, out=None):
+        if out is not None:
+            return out._evaluate(self, theta_list, True)
+        return _jacobian_from_frames(self.frames(theta_list))
+
+    def forward_kinematics_jacobian(self, theta_list, out=None):
+        if out is not None:
+            return out._evaluate(self, theta_list, True)
+        T_0i = self.frames(theta_list)
+        return T_0i[-1].copy(), list(T_0i[1:, :3, 3].copy()), _jacobian_from_frames(T_0i)
+
+    def frames_batch(self, theta):
+        """theta (N, n) -> T_0i (N, n + 1, 4, 4)"""
+        theta = np.atleast_2d(np.asarray(theta, dtype=float))
+        A = np.empty(theta.shape + (4, 4))
+        A[:] = self._A
+        _fill_dh(A, np.cos(theta), np.sin(theta), self._ca, self._sa, self.a)
+        return _chain_batch(A)
+
+    def forward_kinematics_batch(self, theta, out=None):
+        if out is not None:
+            return out._evaluate(self, theta, False)
+        T_0i = self.frames_batch(theta)
+        return T_0i[:, -1], T_0i[:, :, :3, 3]
+
+    def forward_kinematics_jacobian_batch(self, theta, out=None):
+        if out is not None:
+            return out._evaluate(self, theta, True)
+        T_0i = self.frames_batch(theta)
+        return T_0i[:, -1], T_0i[:, :, :3, 3], _jacobian_from_frames(T_0i)
+
+# --- Preallocated Output Buffers ---
+class KinematicsBuffers:
+    """
+    RobotModel 의 out= 인자용 caller 소유 버퍼. 한번 만들어서 매 호출 재사용 (1 kHz 제어 루프 등)
+    batch=None 이면 단일 자세, 정수 N 이면 모든 배열 앞에 (N,) 축
+        T         (..., 4, 4)         end-effector pose (T_0i 마지막 항목의 view)
+        positions (..., n + 1, 3)     관절 원점 (base 포함, forward_kinematics_batch 와 같은 배치)
+        J         (..., 6, n)         geometric Jacobian
+        T_0i      (..., n + 1, 4, 4)  누적 변환
+    중간 계산은 성분별로 연속인 structure-of-arrays 작업 배열 (링크 변환 8개 항, z 축, p_n - p_j, 외적) 에서
+    ufunc 의 out= 로만 하고, 결과 배치 (4x4, (..., 6, n)) 로는 np.copyto 로 옮김.
+    ufunc 는 broadcast 되거나 연속이 아닌 피연산자가 있으면 내부 버퍼를 할당하므로
+    DH 상수도 (..., n) 모양으로 미리 펼쳐둠 -> warm-up 뒤 호출마다 새 NumPy 배열이 생기지 않음
+    theta 는 모양이 맞는 float64 ndarray 로 넘겨야 함 (list 는 변환하면서 할당)
+    만든 model 에 묶여 있고, 한 버퍼를 여러 스레드에서 같이 쓰면 안됨
+    """
+    __slots__ = ("model", "batch", "T_0i", "T", "positions", "J",
+                 "_theta_shape", "_E", "_E_rows", "_k", "_product", "_A_dst", "_E_src", "_links", "_positions_src",
+                 "_z", "_z_src", "_p", "_p_src", "_pn", "_pn_src", "_cross", "_cross_ops", "_tmp", "_J_lin", "_J_ang")
+
+    def __init__(self, model, batch=None):
+        n = model.n_joints
+        lead = () if batch is None else (int(batch),)
+        shape = lead + (n,)
+        self.model = model
+        self.batch = batch
+        self._theta_shape = shape
+        self.T_0i = np.empty(lead + (n + 1, 4, 4))
+        self.T_0i[..., 0, :, :] = np.eye(4)
+        self.T = self.T_0i[..., -1, :, :]
+        self.positions = np.empty(lead + (n + 1, 3))
+        self.J = np.empty(lead + (6, n))
+
+        # 링크 변환의 theta 의존 8개 항 (_fill_dh 순서): E[0] = cos, E[4] = sin
+        self._E = np.empty((8,) + shape)
+        self._E_rows = list(self._E)
+        # DH 상수 -cos α, sin α, a, cos α, -sin α 를 (..., n) 로 펼침
+        self._k = list(np.empty((5,) + shape))
+        for row, const in zip(self._k, (model._nca, model._sa, model.a, model._ca, model._nsa)):
+            row[...] = const
+        A = np.zeros(lead + (n, 4, 4))
+        _fill_dh_constants(A, model._ca, model._sa, model.d)
+        self._A_dst = np.moveaxis(A[..., :2, :], (-2, -1), (0, 1))       # (2, 4, ..., n)
+        self._E_src = self._E.reshape((2, 4) + shape)
+        # 단일 자세는 np.dot (4x4 에서 matmul 보다 빠르고 iterator 를 만들지 않음), batch 는 stacked matmul
+        self._product = np.matmul if batch is not None else np.dot
+        self._links = [(self.T_0i[..., i, :, :], A[..., i, :, :], self.T_0i[..., i + 1, :, :]) for i in range(n)]
+        self._positions_src = self.T_0i[..., :, :3, 3]
+
+        # Jacobian 열 j: 선속도 z_j × (p_n - p_j), 각속도 z_j (성분별 (3, ..., n))
+        self._z = np.empty((3,) + shape)
+        self._z_src = np.moveaxis(self.T_0i[..., :-1, :3, 2], -1, 0)
+        self._p = np.empty((3,) + shape)
+        self._p_src = np.moveaxis(self.T_0i[..., :-1, :3, 3], -1, 0)
+        self._pn = np.empty((3,) + shape)
+        self._pn_src = np.broadcast_to(np.moveaxis(self.T_0i[..., -1:, :3, 3], -1, 0), self._pn.shape)
+        self._cross = np.empty((3,) + shape)
+        self._tmp = np.empty(shape)
+        z, dp = list(self._z), list(self._pn)
+        self._cross_ops = [(row, z[(r + 1) % 3], dp[(r + 2) % 3], z[(r + 2) % 3], dp[(r + 1) % 3])
+                           for r, row in enumerate(self._cross)]
+        self._J_lin = np.moveaxis(self.J[..., :3, :], -2, 0)
+        self._J_ang = np.moveaxis(self.J[..., 3:, :], -2, 0)
+
+    def __repr__(self):
+        return f"KinematicsBuffers(n_joints={self.model.n_joints}, batch={self.batch})"
+
+    def _evaluate(self, model, theta, jacobian):
+        if model is not self.model:
+            raise ValueError("buffers belong to a different RobotModel")
+        if not isinstance(theta, np.ndarray) or theta.shape != self._theta_shape:
+            theta = np.asarray(theta, dtype=float).reshape(self._theta_shape)
+        E = self._E_rows
+        nca, sa, a, ca, nsa = self._k
+        c, s = E[0], E[4]
+        np.cos(theta, out=c)
+        np.sin(theta, out=s)
+        np.multiply(s, nca, out=E[1])
+        np.multiply(s, sa, out=E[2])
+        np.multiply(c, a, out=E[3])
+        np.multiply(c, ca, out=E[5])
+        np.multiply(c, nsa, out=E[6])
+        np.multiply(s, a, out=E[7])
+        np.copyto(self._A_dst, self._E_src)
+        product = self._product
+        for prev, A_i, nxt in self._links:
+            product(prev, A_i, out=nxt)
+        np.copyto(self.positions, self._positions_src)
+        if jacobian:
+            dp, tmp = self._pn, self._tmp
+            np.copyto(self._z, self._z_src)
+            np.copyto(self._p, self._p_src)
+            np.copyto(dp, self._pn_src)
+            np.subtract(dp, self._p, out=dp)
+            for row, z_u, dp_v, z_v, dp_u in self._cross_ops:
+                np.multiply(z_u, dp_v, out=row)
+                np.multiply(z_v, dp_u, out=tmp)
+                np.subtract(row, tmp, out=row)
+            np.copyto(self._J_lin, self._cross)
+            np.copyto(self._J_ang, self._z)
+        return self
+
+# --- Incremental Kinematic State ---
+class KinematicState:
+    """
+    슬라이더처럼 관절 하나씩 바뀌는 경우용 FK / Jacobian 캐시
+    T_0^k (k = 0..n) 중 앞쪽은 바뀐 관절보다 앞이면 그대로 재사용하고,
+    관절 i 가 바뀌면 링크 변환 A_i 만 다시 만들고 T_0^(i+1) 부터 다시 곱함.
+    Jacobian 은 열 j 의 z_j, p_j, z_j × p_j 가 T_0^j 에만 의존하므로 앞쪽 열은 캐시,
+    선속도 부분 z_j × (p_n - p_j) = z_j × p_n - z_j × p_j 에서 p_n 항만 전체 열에 대해 다시 계산.
+    RobotModel 과 마찬가지로 내부 버퍼를 재사용하므로 여러 스레드에서 같이 쓰면 안됨.
+    """
+    __slots__ = ("model", "theta", "_A", "_T_0i", "_valid", "_zp", "_J", "_J_valid",
+                 "links_updated", "products_updated")
+
+    def __init__(self, model, theta=None):
+        self.model = model
+        n = model.n_joints
+        self.theta = np.zeros(n)
+        self._A = model._A.copy()
+        self._T_0i = np.empty((n + 1, 4, 4))
+        self._T_0i[0] = np.eye(4)
+        self._zp = np.empty((3, n))               # 열 j = z_j × p_j
+        self._J = np.empty((6, n))
+        # 카운터: 다시 계산한 링크 변환 수 / 행렬곱 수 (벤치마크용)
+        self.links_updated = 0
+        self.products_updated = 0
+        _fill_dh(self._A, np.cos(self.theta), np.sin(self.theta), model._ca, model._sa, model.a)
+        self._valid = 0                           # T_0i[0..valid] 가 최신
+        self._J_valid = 0                         # Jacobian 열 0..J_valid-1 의 z, z × p 가 최신
+        if theta is not None:
+            self.set_theta(theta)
+
+    def __repr__(self):
+        return f"KinematicState(n_joints={self.model.n_joints}, valid={self._valid})"
+
+    def _invalidate(self, i):
+        self._valid = min(self._valid, i)
+        self._J_valid = min(self._J_valid, i)
+
+    def set_joint(self, i, value):
+        """관절 i 만 바꿈 (값이 같으면 아무것도 안함)"""
+        value = float(value)
+        if value == self.theta[i]:
+            return
+        self.theta[i] = value
+        m = self.model
+        ct, st = math.cos(value), math.sin(value)
+        ca, sa, a = m._ca[i], m._sa[i], m.a[i]
+        A = self._A[i]
+        A[0, 0] = ct
+        A[0, 1] = -st * ca
+        A[0, 2] = st * sa
+        A[0, 3] = a * ct
+        A[1, 0] = st
+        A[1, 1] = ct * ca
+        A[1, 2] = -ct * sa
+        A[1, 3] = a * st
+        self.links_updated += 1
+        self._invalidate(i)
+
+    def set_theta(self, theta_list):
+        """전체 관절각을 받아서 바뀐 관절만 갱신"""
+        theta = np.asarray(theta_list, dtype=float)
+        changed = np.flatnonzero(theta != self.theta)
+        if len(changed) == 0:
+            return
+        if len(changed) == 1:
+            self.set_joint(changed[0], theta[changed[0]])
+            return
+        m = self.model
+        self.theta[changed] = theta[changed]
+        # fancy index 는 복사본이라 채운 뒤 다시 써넣음
+        A = self._A[changed]
+        _fill_dh(A, np.cos(theta[changed]), np.sin(theta[changed]), m._ca[changed], m._sa[changed], m.a[changed])
+        self._A[changed] = A
+        self.links_updated += len(changed)
+        self._invalidate(int(changed[0]))
+
+    def frames(self):
+        """T_0i (n + 1, 4, 4), 무효화된 부분만 다시 곱함. 내부 버퍼의 view 를 반환함"""
+        n = self.model.n_joints
+        T_0i, A = self._T_0i, self._A
+        for i in range(self._valid, n):
+            np.matmul(T_0i[i], A[i], out=T_0i[i + 1])
+        self.products_updated += n - self._valid
+        self._valid = n
+        return T_0i
+
+    def forward_kinematics(self):
+        T_0i = self.frames()
+        return T_0i[-1].copy(), list(T_0i[1:, :3, 3].copy())
+
+    def jacobian(self):
+        """(6, n) geometric Jacobian. 내부 버퍼의 view 를 반환함"""
+        T_0i = self.frames()
+        J, zp, k = self._J, self._zp, self._J_valid
+        n = self.model.n_joints
+        if k < n:
+            z = T_0i[k:n, :3, 2].T
+            p = T_0i[k:n, :3, 3].T
+            J[3:, k:] = z
+            zp[0, k:] = z[1] * p[2] - z[2] * p[1]
+            zp[1, k:] = z[2] * p[0] - z[0] * p[2]
+            zp[2, k:] = z[0] * p[1] - z[1] * p[0]
+            self._J_valid = n
+        # z_j × p_n = [p_n]ₓᵀ z_j -> 모든 열을 3x3 행렬곱 한번으로
+        x, y, w = T_0i[n, :3, 3].tolist()
+        S = np.array(((0.0, w, -y), (-w, 0.0, x), (y, -x, 0.0)))
+        np.matmul(S, J[3:], out=J[:3])
+        J[:3] -= zp
+        return J
+
+    def forward_kinematics_jacobian(self):
+        J = self.jacobian()
+        T_0i = self._T_0i
+        return T_0i[-1].copy(), list(T_0i[1:, :3, 3].copy()), J.copy()
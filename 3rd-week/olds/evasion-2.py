@@ -1,7 +1,13 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider
 
+# 드래그 중 쌓이는 슬라이더 이벤트를 최신 값 하나로 병합 (3rd-week/scheduler.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduler import coalesce
+
 # --- Forward Kinematics Core Functions ---
 def dh_transform(theta, d, a, alpha):
     return np.array([
@@ -138,7 +144,7 @@ slider_ax = [plt.axes([0.3, 0.2 + i * 0.05, 0.4, 0.03]) for i in range(6)]
 for i in range(6):
     slider = Slider(slider_ax[i], f'Theta {i+1}', -180, 180, valinit=theta_degrees[i])
     sliders.append(slider)
-    slider.on_changed(update)
+    slider.on_changed(coalesce(fig.canvas, update))
 
 plt.tight_layout()
 plt.show()
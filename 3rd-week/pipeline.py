@@ -0,0 +1,103 @@
+# 슬라이더 GUI 의 계산 (compute) / 표시 (present) 단계
+# think.py, eva-centi.py 와 session_log.py 의 재생이 같은 함수를 쓰도록 한 곳에 둠
+# (재생용으로 복사해두면 GUI 쪽이 바뀔 때 재생 결과가 실제와 달라짐)
+#   - compute(theta): worker thread. FK + Jacobian, 충돌, condition number (+ 파이프라인별 추가 단계)
+#   - present(result): GUI thread. renderer 가 None 이면 present 도 None (계산만)
+#   - PIPELINES: 세션 header 의 source (기록한 스크립트 이름) -> 파이프라인 생성 함수
+#
+# think.py     : cond > 1e3 이면 DLS 로 관절 속도 계산 후 경고 표시, 아니면 그림
+# eva-centi.py : DLS 없음. 특이점 근처면 그리지 않음
+#
+# 사용법
+# compute, present = PIPELINES[source](state, scene, singularity, renderer, profiler)
+# scheduler = ComputeScheduler(compute, present, fig.canvas)
+
+import numpy as np
+
+from ik import damped_least_squares
+from profiling import StageProfiler
+
+SINGULAR_CONDITION = 1e3
+# think.py 의 DLS 예제 목표 end-effector 속도 (임의, 0.1씩)
+DLS_TARGET_VELOCITY = np.array([0.1, 0.1, 0.1, 0, 0, 0])
+
+def _base_compute(state, scene, profiler):
+    """FK + Jacobian + 충돌 (두 파이프라인 공통) -> (T, positions, J, collided)"""
+    base = np.zeros((1, 3))
+
+    def fk_collision(theta):
+        with profiler.stage("fk+jacobian"):
+            state.set_theta(theta)
+            T, positions, J = state.forward_kinematics_jacobian()
+        with profiler.stage("collision"):
+            collided = scene.check(np.vstack([base, positions]))["collision"]
+        return T, positions, J, collided
+    return fk_collision
+
+def think_pipeline(state, scene, singularity, renderer=None, profiler=None, echo=False):
+    """
+    think.py: 특이점 근처 (cond > 1e3) 면 DLS 로 관절 속도를 구해 경고만 표시
+    echo=True 면 present 가 DLS 관절 속도를 print (GUI 에서만, 재생 시에는 끔)
+    """
+    profiler = profiler if profiler is not None else StageProfiler(enabled=False)
+    fk_collision = _base_compute(state, scene, profiler)
+
+    def compute(theta):
+        # 슬라이더 하나만 움직이면 그 관절 앞쪽의 T_0^k 는 state 에 캐시된 것을 재사용
+        T, positions, J, collided = fk_collision(theta)
+        result = {"T": T, "positions": positions, "cond": None, "joint_velocities": None, "collision": collided}
+        try:
+            with profiler.stage("cond"):
+                result["cond"] = singularity.condition_number(theta, J)
+        except np.linalg.LinAlgError:
+            return result
+        if result["cond"] > SINGULAR_CONDITION:
+            with profiler.stage("dls"):
+                result["joint_velocities"] = damped_least_squares(J, DLS_TARGET_VELOCITY, damping=0.1)
+        return result
+
+    if renderer is None:
+        return compute, None
+
+    def present(result):
+        if result["cond"] is None:
+            renderer.set_status("⚠️ SINGULARITY DETECTED!", 'red')
+        elif result["joint_velocities"] is not None:
+            renderer.set_status("⚠️ NEAR SINGULARITY! Applying damping...", 'orange')
+            if echo:
+                # 여기선 실제로 조인트를 업데이트하진 않지만, 시뮬레이션에 활용 가능
+                print("Adjusted joint velocities:", result["joint_velocities"])
+        else:
+            renderer.draw(result["positions"], result["T"], collided=result["collision"])
+    return compute, present
+
+def eva_centi_pipeline(state, scene, singularity, renderer=None, profiler=None, echo=False):
+    """eva-centi.py: DLS 없음, 특이점 근처면 그리지 않고 넘어감 (echo 는 think_pipeline 과 인자 맞춤용)"""
+    profiler = profiler if profiler is not None else StageProfiler(enabled=False)
+    fk_collision = _base_compute(state, scene, profiler)
+
+    def compute(theta):
+        T, positions, J, collided = fk_collision(theta)
+        result = {"T": T, "positions": positions, "singular": False, "near_singularity": False,
+                  "collision": collided}
+        try:
+            with profiler.stage("cond"):
+                result["near_singularity"] = singularity.condition_number(theta, J) > SINGULAR_CONDITION
+        except np.linalg.LinAlgError:
+            result["singular"] = True
+        return result
+
+    if renderer is None:
+        return compute, None
+
+    def present(result):
+        if result["singular"]:
+            renderer.set_status("⚠️ SINGULARITY DETECTED!", 'red')
+        elif result["near_singularity"]:
+            # ax.set_title("!!! SINGULARITY DETECTED !!!", color='red')
+            pass
+        else:
+            renderer.draw(result["positions"], result["T"], collided=result["collision"])
+    return compute, present
+
+PIPELINES = {"think.py": think_pipeline, "eva-centi.py": eva_centi_pipeline}
@@ -0,0 +1,299 @@
+# 관절 공간 경로 계획 (RRT-Connect + shortcut smoothing)
+# olds/evasion.py 의 avoid_singularity 는 관절에 잡음만 더할 뿐 장애물을 돌아가는 경로를 만들지 않음
+# 여기서는 start / goal 양쪽에서 tree 를 키워서 (RRT-Connect) 만나면 경로를 만들고, 중간 waypoint 를 줄임
+#
+#   - edge 검사: continuous_collision.MotionValidator.check_edges (관절 공간 직선 edge 를 연속 검사)
+#     한 iteration 에서 샘플 batch 개를 한번에 extend 하고, 상대 tree 의 connect 단계는
+#     step 간격으로 자른 edge 들을 모두 모아 한번에 검사 -> 충돌 검사 호출 수가 iteration 수 정도로 줄어듦
+#   - nearest neighbor: tree 마다 KD-tree (scipy cKDTree) + 아직 index 에 안 넣은 최근 노드는 직접 비교
+#     꼬리가 index 크기만큼 쌓이면 다시 만듦 (재구성 비용은 노드 수에 대해 상각 O(log N))
+#     scipy 가 없으면 전부 직접 비교 (노드 수백개 수준에서는 큰 차이 없음)
+#   - smoothing: 각 waypoint 에서 이후 waypoint 들로 가는 edge 를 한번에 검사해서 가장 먼 곳으로 건너뜀 (greedy shortcut)
+# 관절 공간 거리는 가중치 없는 Euclidean, 관절각은 감싸지 않음 (joint_limits 안의 직선)
+#
+# 사용법 (장애물이 많은 scene 에서 무작위 질의의 계획 시간 / 노드 수)
+# python3 planner.py --queries 20 --obstacles 40
+
+import argparse
+import time
+
+import numpy as np
+
+from continuous_collision import MotionValidator
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# --- Nearest Neighbor ---
+class _Tree:
+    """노드 배열 + parent + KD-tree index (마지막 재구성 이후 추가된 노드는 직접 비교)"""
+
+    def __init__(self, root, capacity=1024, min_tail=64):
+        self.points = np.empty((capacity, len(root)))
+        self.parent = np.empty(capacity, dtype=np.int64)
+        self.points[0] = root
+        self.parent[0] = -1
+        self.size = 1
+        self._index = None
+        self._indexed = 0
+        self._min_tail = min_tail
+
+    def __len__(self):
+        return self.size
+
+    def add(self, q, parent):
+        if self.size == len(self.points):
+            self.points = np.concatenate([self.points, np.empty_like(self.points)])
+            self.parent = np.concatenate([self.parent, np.empty_like(self.parent)])
+        self.points[self.size] = q
+        self.parent[self.size] = parent
+        self.size += 1
+        return self.size - 1
+
+    def nearest(self, X):
+        """X (K, n) -> 가장 가까운 노드 index (K,)"""
+        tail = self.size - self._indexed
+        if cKDTree is not None and tail > max(self._min_tail, self._indexed):
+            self._index = cKDTree(self.points[:self.size].copy())
+            self._indexed = self.size
+        best = np.zeros(len(X), dtype=np.int64)
+        best_d = np.full(len(X), np.inf)
+        if self._index is not None:
+            best_d, best = self._index.query(X)
+        if self._indexed < self.size:
+            diff = X[:, None, :] - self.points[None, self._indexed:self.size]
+            d = np.sqrt(np.einsum("kmi,kmi->km", diff, diff))
+            j = np.argmin(d, axis=1)
+            dj = d[np.arange(len(X)), j]
+            closer = dj < best_d
+            best = np.where(closer, j + self._indexed, best)
+        return best
+
+    def path_to_root(self, i):
+        path = []
+        while i >= 0:
+            path.append(self.points[i])
+            i = self.parent[i]
+        return path
+
+# --- Planner ---
+class RRTConnect:
+    """
+    model + Scene 위의 관절 공간 planner
+    step: tree 를 한번에 늘리는 최대 관절 공간 거리 (rad)
+    batch: iteration 마다 뽑는 샘플 수 (edge 검사를 묶는 단위)
+    joint_limits: (n, 2) 또는 None (모든 관절 [-π, π])
+    tolerance: MotionValidator 해상도 (이보다 가까운 접근은 충돌로 취급)
+    """
+
+    def __init__(self, model, scene, link_radius=0.0, step=1.0, batch=8, joint_limits=None,
+                 tolerance=5e-3, seed=None):
+        self.model = model
+        self.validator = MotionValidator(model, scene, link_radius, tolerance)
+        self.step = step
+        self.batch = batch
+        if joint_limits is None:
+            joint_limits = np.tile([-np.pi, np.pi], (model.n_joints, 1))
+        self.joint_limits = np.asarray(joint_limits, dtype=float)
+        self.rng = np.random.default_rng(seed)
+        self.edges_checked = 0
+
+    def _check(self, q_from, q_to):
+        if len(q_from) == 0:
+            return np.zeros(0, dtype=bool)
+        self.edges_checked += len(q_from)
+        return self.validator.check_edges(q_from, q_to, any_contact=True)[0]
+
+    def is_free(self, q):
+        """q (M, n) 자세들이 충돌 없는지 (모든 링크 clearance >= tolerance)"""
+        v = self.validator
+        _, positions = self.model.forward_kinematics_batch(np.atleast_2d(q))
+        return v.scene.check(positions, v.link_radius, v.tolerance)["min_distance"] >= v.tolerance
+
+    def _extend(self, tree, targets):
+        """targets 쪽으로 step 만큼 늘린 edge 들을 한번에 검사해서 추가 -> 새 노드 index, 자세"""
+        near = tree.nearest(targets)
+        q_near = tree.points[near]
+        delta = targets - q_near
+        dist = np.linalg.norm(delta, axis=1)
+        keep = dist > 1e-9
+        q_new = q_near + delta * np.minimum(1.0, self.step / np.maximum(dist, 1e-12))[:, None]
+        free = keep & self._check(q_near, q_new)
+        added = [tree.add(q, p) for q, p in zip(q_new[free], near[free])]
+        return np.array(added, dtype=np.int64), q_new[free]
+
+    def _connect(self, tree, targets):
+        """
+        각 target 까지 step 간격 직선으로 tree 를 늘림 (모든 target 의 조각 edge 를 한번에 검사)
+        returns: 도착한 첫 target 의 (target 번호, tree 노드 index), 없으면 None
+        """
+        near = tree.nearest(targets)
+        q_near = tree.points[near]
+        dist = np.linalg.norm(targets - q_near, axis=1)
+        pieces = np.maximum(np.ceil(dist / self.step).astype(np.int64), 1)
+        owner = np.repeat(np.arange(len(targets)), pieces)
+        k = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        s0 = (k / pieces[owner])[:, None]
+        s1 = ((k + 1) / pieces[owner])[:, None]
+        delta = targets[owner] - q_near[owner]
+        q_a, q_b = q_near[owner] + s0 * delta, q_near[owner] + s1 * delta
+        free = self._check(q_a, q_b)
+
+        reached = None
+        offset = 0
+        for g, count in enumerate(pieces):
+            blocked = np.flatnonzero(~free[offset:offset + count])
+            n_free = blocked[0] if len(blocked) else count
+            parent = near[g]
+            for j in range(n_free):
+                parent = tree.add(q_b[offset + j], parent)
+            if n_free == count and reached is None:
+                reached = (g, parent)
+            offset += count
+        return reached
+
+    def plan(self, q_start, q_goal, max_time=5.0, max_iterations=10000, smooth=True):
+        """
+        returns dict
+            success        bool
+            path           (K, n) 관절 경로 (smoothing 후), 실패하면 None
+            raw_path       smoothing 전 경로
+            planning_time  tree 를 키워 연결하기까지 (초), smoothing_time
+            nodes          (start tree 노드 수, goal tree 노드 수), iterations, edges_checked, configs_checked
+        """
+        q_start = np.asarray(q_start, dtype=float)
+        q_goal = np.asarray(q_goal, dtype=float)
+        free = self.is_free(np.stack([q_start, q_goal]))
+        if not free[0]:
+            raise ValueError("start configuration is in collision")
+        if not free[1]:
+            raise ValueError("goal configuration is in collision")
+
+        start = time.perf_counter()
+        edges0, configs0 = self.edges_checked, self.validator.configs_checked
+        trees = [_Tree(q_start), _Tree(q_goal)]
+        lo, hi = self.joint_limits[:, 0], self.joint_limits[:, 1]
+        raw_path = None
+        iterations = 0
+
+        # 바로 이어지면 tree 없이 끝
+        if self._check(q_start[None], q_goal[None])[0]:
+            raw_path = np.stack([q_start, q_goal])
+        while raw_path is None and iterations < max_iterations and time.perf_counter() - start < max_time:
+            iterations += 1
+            a, b = trees[iterations % 2], trees[(iterations + 1) % 2]
+            samples = self.rng.uniform(lo, hi, (self.batch, len(lo)))
+            new_idx, q_new = self._extend(a, samples)
+            if len(new_idx):
+                reached = self._connect(b, q_new)
+                if reached is not None:
+                    g, node_b = reached
+                    half_a = a.path_to_root(new_idx[g])[::-1]
+                    half_b = b.path_to_root(node_b)[1:]
+                    raw_path = np.array(half_a + half_b)
+                    if a is trees[1]:
+                        raw_path = raw_path[::-1]
+        planning_time = time.perf_counter() - start
+
+        path = raw_path
+        t0 = time.perf_counter()
+        if raw_path is not None and smooth:
+            path = self.shortcut(raw_path)
+        smoothing_time = time.perf_counter() - t0
+        return {
+            "success": raw_path is not None,
+            "path": path,
+            "raw_path": raw_path,
+            "planning_time": planning_time,
+            "smoothing_time": smoothing_time,
+            "nodes": (len(trees[0]), len(trees[1])),
+            "iterations": iterations,
+            "edges_checked": self.edges_checked - edges0,
+            "configs_checked": self.validator.configs_checked - configs0,
+        }
+
+    def shortcut(self, path):
+        """
+        greedy shortcut: 현재 waypoint 에서 이후 모든 waypoint 로 가는 edge 를 한번에 검사하고
+        충돌 없는 것 중 가장 먼 waypoint 로 바로 건너뜀 (바로 다음 waypoint 는 원래 edge 라서 항상 가능)
+        """
+        path = np.asarray(path, dtype=float)
+        keep = [0]
+        i = 0
+        while i < len(path) - 1:
+            j = np.arange(i + 2, len(path))
+            free = self._check(np.broadcast_to(path[i], (len(j), path.shape[1])), path[j])
+            i = int(j[free].max()) if np.any(free) else i + 1
+            keep.append(i)
+        return path[keep]
+
+def path_length(path):
+    return float(np.sum(np.linalg.norm(np.diff(path, axis=0), axis=1)))
+
+def main():
+    from collision import Scene
+    from kinematics import RobotModel
+
+    parser = argparse.ArgumentParser(description="RRT-Connect planning time in a cluttered scene")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--obstacles", type=int, default=40)
+    parser.add_argument("--step", type=float, default=1.0)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = RobotModel([0, -0.425, -0.392, 0, 0, 0], [0.089, 0, 0, 0.109, 0.095, 0.082],
+                       [np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+    rng = np.random.default_rng(args.seed)
+    scene = Scene()
+    # 팔이 닿는 껍질 (0.35 ~ 0.8 m) 에 구 / 박스를 흩뿌림 + 바닥 판
+    direction = rng.normal(size=(args.obstacles, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    centers = direction * rng.uniform(0.35, 0.8, (args.obstacles, 1))
+    scene.add_spheres(centers[::2], rng.uniform(0.04, 0.09, len(centers[::2])))
+    scene.add_boxes(centers[1::2], rng.uniform(0.02, 0.07, (len(centers[1::2]), 3)))
+    scene.add_boxes([0.0, 0.0, -0.45], [1.2, 1.2, 0.02])
+    scene.build()
+    radius = 0.03
+    planner = RRTConnect(model, scene, radius, args.step, args.batch, seed=args.seed)
+
+    # 충돌 없는 start / goal 쌍 (직선으로는 이어지지 않는 것만)
+    queries = []
+    while len(queries) < args.queries:
+        q = rng.uniform(-np.pi, np.pi, (64, model.n_joints))
+        q = q[planner.is_free(q)]
+        for q0, q1 in zip(q[::2], q[1::2]):
+            if len(queries) < args.queries and not planner._check(q0[None], q1[None])[0]:
+                queries.append((q0, q1))
+
+    times, nodes, raw_len, smooth_len, waypoints = [], [], [], [], []
+    failures = unsafe = 0
+    for q0, q1 in queries:
+        res = planner.plan(q0, q1)
+        if not res["success"]:
+            failures += 1
+            continue
+        times.append(res["planning_time"] + res["smoothing_time"])
+        nodes.append(sum(res["nodes"]))
+        raw_len.append(path_length(res["raw_path"]))
+        smooth_len.append(path_length(res["path"]))
+        waypoints.append((len(res["raw_path"]), len(res["path"])))
+        # 독립 검증: 최종 경로 전체를 연속 검사
+        if not planner.validator.check_trajectory(res["path"])["collision_free"]:
+            unsafe += 1
+    times = np.array(times)
+    print(f"{scene}, link radius {radius}, step {args.step} rad, batch {args.batch}, "
+          f"{len(queries)} queries (none connectable by a straight line)")
+    print(f"success       : {len(times)}/{len(queries)}, unsafe final paths: {unsafe}")
+    if len(times):
+        print(f"time          : p50 {np.percentile(times, 50) * 1e3:7.1f} ms, "
+              f"p90 {np.percentile(times, 90) * 1e3:7.1f} ms, max {times.max() * 1e3:7.1f} ms")
+        print(f"tree nodes    : p50 {np.median(nodes):.0f}, max {max(nodes)}")
+        w = np.array(waypoints)
+        print(f"waypoints     : raw {w[:, 0].mean():.1f} -> smoothed {w[:, 1].mean():.1f}")
+        print(f"path length   : raw {np.mean(raw_len):.2f} rad -> smoothed {np.mean(smooth_len):.2f} rad")
+
+if __name__ == "__main__":
+    main()
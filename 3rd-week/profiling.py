@@ -0,0 +1,224 @@
+# 슬라이더 GUI 파이프라인 단계별 시간 측정
+# GUI 가 버벅일 때 FK / jacobian / cond / 오일러 각 / matplotlib 그리기 중 어디가 느린지 보려고 만듦
+#   - stage 별로 최근 capacity 개 측정값을 고정 크기 ring buffer (numpy 배열) 에 저장 -> 메모리 일정
+#   - summary() 는 ring 에 남은 값으로 p50 / p90 / p99 / max, histogram() 은 고정 로그 bin 으로 개수
+#   - overlay_text() 는 화면 표시용 한 줄씩 (RobotRenderer 가 0.5 초마다 갱신)
+#   - dump(path) 는 JSON, dump_on_exit(path) 는 atexit 으로 종료 시 저장
+#   - 꺼져 있으면 stage() 는 아무것도 안하는 공용 context manager 를 돌려주고 wrap() 은 원래 함수 그대로
+#     -> 속성 확인 한번 + with 문 비용뿐
+# 한 stage 이름은 한 thread 에서만 기록 (compute 단계는 worker, 그리기는 GUI thread) -> lock 없음
+#
+# 사용법
+# with profiler.stage("fk"):
+#     T, positions = model.forward_kinematics(theta)
+#
+# THINK_PROFILE=stages.json python3 think.py   # 오버레이 표시 + 종료 시 stages.json 저장
+# python3 profiling.py --frames 500            # GUI 없이 파이프라인을 돌려 단계별 표 + 오버헤드 출력
+
+import argparse
+import atexit
+import json
+import os
+import time
+
+import numpy as np
+
+# 1 us .. 10 s, 10 단위당 8 bin
+HISTOGRAM_EDGES = np.logspace(-6, 1, 7 * 8 + 1)
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    """stage 하나의 ring buffer. 같은 객체를 with 문마다 재사용 (할당 없음)"""
+    __slots__ = ("name", "samples", "count", "_start")
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.samples = np.zeros(capacity)
+        self.count = 0
+        self._start = 0.0
+
+    def add(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+
+    def recent(self):
+        """ring 에 남아 있는 값 (순서 무관) 복사본"""
+        return self.samples[:min(self.count, len(self.samples))].copy()
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.add(time.perf_counter() - self._start)
+        return False
+
+class StageProfiler:
+    """
+    stage 이름별 최근 capacity 개 지연시간 (초)
+    enabled=False 면 기록하지 않음. 실행 중에 profiler.enabled 를 바꿔도 됨 (wrap 은 생성 시점 기준)
+    """
+
+    def __init__(self, capacity=1024, enabled=True):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.enabled = enabled
+        self._stages = {}
+
+    def __repr__(self):
+        return f"StageProfiler(stages={list(self._stages)}, capacity={self.capacity}, enabled={self.enabled})"
+
+    def _get(self, name):
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(name, self.capacity)
+        return stage
+
+    # --- Recording ---
+    def stage(self, name):
+        """with profiler.stage("fk"): ... 블록 시간을 기록"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._get(name)
+
+    def record(self, name, seconds):
+        """이미 잰 시간을 직접 기록 (다른 곳에서 perf_counter 로 잰 값 등)"""
+        if self.enabled:
+            self._get(name).add(seconds)
+
+    def wrap(self, name, fn):
+        """fn 호출마다 기록하는 함수. 꺼져 있으면 fn 그대로 반환"""
+        if not self.enabled:
+            return fn
+        stage = self._get(name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stage.add(time.perf_counter() - start)
+        timed.__wrapped__ = fn
+        return timed
+
+    def reset(self):
+        self._stages.clear()
+
+    # --- Reporting ---
+    def summary(self):
+        """stage -> dict count (전체 기록 수), window (ring 에 남은 수), mean / p50 / p90 / p99 / max (초)"""
+        result = {}
+        for name, stage in list(self._stages.items()):
+            samples = stage.recent()
+            if not len(samples):
+                continue
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+            result[name] = {"count": stage.count, "window": len(samples), "mean": float(samples.mean()),
+                            "p50": float(p50), "p90": float(p90), "p99": float(p99),
+                            "max": float(samples.max())}
+        return result
+
+    def histogram(self, name):
+        """ring 에 남은 값의 HISTOGRAM_EDGES bin 별 개수 (범위 밖은 양 끝 bin 에 포함)"""
+        samples = np.clip(self._stages[name].recent(), HISTOGRAM_EDGES[0], HISTOGRAM_EDGES[-1])
+        return np.histogram(samples, HISTOGRAM_EDGES)[0]
+
+    def overlay_text(self):
+        """화면 표시용: stage 마다 'name  p50 x.xx ms  p99 x.xx ms'"""
+        summary = self.summary()
+        if not summary:
+            return ""
+        width = max(len(name) for name in summary)
+        return "\n".join(f"{name:<{width}} p50 {s['p50'] * 1e3:6.2f} ms  p99 {s['p99'] * 1e3:6.2f} ms"
+                         for name, s in summary.items())
+
+    def dump(self, path):
+        """summary + histogram 을 JSON 으로 저장"""
+        summary = self.summary()
+        for name, s in summary.items():
+            s["histogram"] = self.histogram(name).tolist()
+        data = {"capacity": self.capacity, "histogram_edges": HISTOGRAM_EDGES.tolist(), "stages": summary}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, path)
+
+    def dump_on_exit(self, path):
+        """프로세스 종료 시 dump(path). 꺼져 있으면 아무것도 안함"""
+        if self.enabled:
+            atexit.register(self.dump, path)
+
+def main():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from kinematics import KinematicState, RobotModel
+    from renderer import RobotRenderer
+
+    parser = argparse.ArgumentParser(description="Per-stage latency of the slider pipeline (headless)")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=1024)
+    parser.add_argument("--dump", default=None, help="write the stage summary JSON here")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = RobotModel([0, -42.5, -39.2, 0, 0, 0], [8.9, 0, 0, 10.9, 9.5, 8.2],
+                       [np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+    state = KinematicState(model)
+    rng = np.random.default_rng(args.seed)
+    # 슬라이더 하나씩 움직이는 것처럼 관절 하나만 조금씩 바뀌는 입력
+    theta = np.zeros((args.frames, model.n_joints))
+    theta[np.arange(args.frames), rng.integers(0, model.n_joints, args.frames)] = rng.normal(0, 0.05, args.frames)
+    theta = np.cumsum(theta, axis=0)
+
+    profiler = StageProfiler(args.capacity)
+    fig = plt.figure(figsize=(8, 8))
+    renderer = RobotRenderer(fig.add_subplot(111, projection='3d'), [30.0, 0.0, 80.0], 10.0, [10., 10., 10.],
+                             profiler=profiler)
+    for q in theta:
+        with profiler.stage("fk+jacobian"):
+            state.set_theta(q)
+            T, positions, J = state.forward_kinematics_jacobian()
+        with profiler.stage("cond"):
+            np.linalg.cond(J)
+        renderer.draw(positions, T)
+
+    print(f"{args.frames} frames, last {min(args.frames, args.capacity)} per stage")
+    print(profiler.overlay_text())
+    if args.dump:
+        profiler.dump(args.dump)
+        print(f"saved {args.dump}")
+
+    # 측정 자체의 비용: 빈 블록을 profiler 없이 / 꺼진 profiler / 켜진 profiler 로 감쌌을 때의 차이
+    calls = 200000
+
+    def loop(prof):
+        start = time.perf_counter()
+        if prof is None:
+            for _ in range(calls):
+                pass
+        else:
+            for _ in range(calls):
+                with prof.stage("empty"):
+                    pass
+        return (time.perf_counter() - start) / calls
+
+    base = min(loop(None) for _ in range(5))
+    for label, prof in (("disabled", StageProfiler(enabled=False)), ("enabled", StageProfiler())):
+        t = min(loop(prof) for _ in range(5))
+        print(f"{label:8s} profiler: {(t - base) * 1e9:5.0f} ns per stage")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# 도달 가능 맵 (reachability map)
+# DH 테이블 하나에 대해 voxel 격자를 미리 만들어두고 "이 점에 닿을 수 있나?" 를 O(1) 로 답함
+# 각 voxel 에는 도달 여부와 대표 관절 자세(voxel 중심에 가장 가까운 샘플)를 저장
+#
+# 저장 형식 (디렉토리)
+#   index.npy    (nx, ny, nz) int32, -1 = 도달 불가, 그 외 configs 의 행 번호
+#   configs.npy  (K, n_joints) float32 대표 관절 자세 (rad)
+#   meta.json    origin, voxel_size, DH 테이블
+# load() 는 np.load(mmap_mode='r') 로 열기 때문에 즉시 로드되고 여러 프로세스가 page cache 를 공유함
+#
+# 사용법
+# python3 reachability.py build ur5_map --samples 5000000 --voxel 0.02
+# python3 reachability.py query ur5_map 0.3 0.1 0.4
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from kinematics import RobotModel
+from workspace import workspace_grid
+
+class ReachabilityMap:
+    __slots__ = ("index", "configs", "origin", "voxel_size", "dh", "_flat", "_inv", "_dims", "_ox", "_oy", "_oz", "_sx", "_sy", "_view")
+
+    def __init__(self, index, configs, origin, voxel_size, dh):
+        self.index = index
+        self.configs = configs
+        self.origin = np.asarray(origin, dtype=float)
+        self.voxel_size = float(voxel_size)
+        self.dh = dh
+        # memmap 을 일반 ndarray view 로 (memmap 의 __getitem__ 오버헤드 회피, 메모리는 공유)
+        self._flat = np.asarray(index).reshape(-1)
+        self._inv = 1.0 / self.voxel_size
+        self._dims = index.shape
+        self._ox, self._oy, self._oz = (float(v) for v in self.origin)
+        self._sx = index.shape[1] * index.shape[2]
+        self._sy = index.shape[2]
+        self._view = memoryview(self._flat)  # 단일 점 조회용: 원소 접근이 numpy 스칼라보다 빠름
+
+    def __repr__(self):
+        return f"ReachabilityMap(dims={self._dims}, voxel_size={self.voxel_size}, reachable={len(self.configs)})"
+
+    # --- Queries ---
+    def _cell(self, x, y, z):
+        # 단일 점 경로는 numpy 연산 없이 파이썬 float 로만 계산
+        if x < self._ox or y < self._oy or z < self._oz:
+            return -1
+        ix = int((x - self._ox) * self._inv)
+        iy = int((y - self._oy) * self._inv)
+        iz = int((z - self._oz) * self._inv)
+        nx, ny, nz = self._dims
+        if ix >= nx or iy >= ny or iz >= nz:
+            return -1
+        return self._view[ix * self._sx + iy * self._sy + iz]
+
+    def is_reachable(self, point):
+        """단일 점 (x, y, z) 도달 가능 여부"""
+        x, y, z = point
+        return self._cell(float(x), float(y), float(z)) >= 0
+
+    def configuration(self, point):
+        """단일 점이 속한 voxel 의 대표 관절 자세 (rad), 도달 불가면 None"""
+        x, y, z = point
+        row = self._cell(float(x), float(y), float(z))
+        return None if row < 0 else np.asarray(self.configs[row], dtype=float)
+
+    def lookup(self, points):
+        """points (N, 3) -> configs 행 번호 (N,) int, 도달 불가/격자 밖은 -1"""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        idx = np.floor((points - self.origin) * self._inv).astype(np.intp)
+        inside = np.all((idx >= 0) & (idx < self._dims), axis=1)
+        rows = np.full(len(points), -1, dtype=np.int64)
+        flat = np.ravel_multi_index(idx[inside].T, self._dims)
+        rows[inside] = self._flat[flat]
+        return rows
+
+    def query(self, points):
+        """points (N, 3) -> (N,) bool 도달 가능 여부"""
+        return self.lookup(points) >= 0
+
+    def query_configurations(self, points):
+        """points (N, 3) -> (reachable (N,), configs (N, n_joints)), 도달 불가 행은 NaN"""
+        rows = self.lookup(points)
+        reachable = rows >= 0
+        out = np.full((len(rows), self.configs.shape[1]), np.nan)
+        out[reachable] = self.configs[rows[reachable]]
+        return reachable, out
+
+    # --- Persistence ---
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "index.npy"), np.ascontiguousarray(self.index))
+        np.save(os.path.join(path, "configs.npy"), np.ascontiguousarray(self.configs))
+        meta = {"origin": self.origin.tolist(), "voxel_size": self.voxel_size, "dh": self.dh}
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mode = "r" if mmap else None
+        index = np.load(os.path.join(path, "index.npy"), mmap_mode=mode)
+        configs = np.load(os.path.join(path, "configs.npy"), mmap_mode=mode)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(index, configs, meta["origin"], meta["voxel_size"], meta["dh"])
+
+# --- Build ---
+def build_reachability_map(a, d=None, alpha=None, n_samples=5_000_000, voxel_size=0.02,
+                           joint_limits=None, chunk_size=20000, seed=0, verbose=False):
+    """
+    관절 공간을 chunk 단위로 샘플링해서 reachability map 생성
+    voxel 마다 voxel 중심에 가장 가까운 end-effector 위치를 만든 관절 자세를 대표로 저장
+    """
+    model = a if isinstance(a, RobotModel) else RobotModel(a, d, alpha)
+    n = model.n_joints
+    if joint_limits is None:
+        joint_limits = np.tile([-np.pi, np.pi], (n, 1))
+    joint_limits = np.asarray(joint_limits, dtype=float)
+    lo, hi = joint_limits[:, 0], joint_limits[:, 1]
+
+    origin, dims = workspace_grid(model, voxel_size)
+    dims = tuple(int(v) for v in dims)
+    n_cells = int(np.prod(dims))
+    best_dist = np.full(n_cells, np.inf, dtype=np.float32)
+    best_theta = {}
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+
+    done = 0
+    while done < n_samples:
+        count = min(chunk_size, n_samples - done)
+        theta = rng.uniform(lo, hi, size=(count, n))
+        T, _ = model.forward_kinematics_batch(theta)
+        p = T[:, :3, 3]
+        idx = np.clip(np.floor((p - origin) / voxel_size).astype(np.intp), 0, np.array(dims) - 1)
+        flat = np.ravel_multi_index(idx.T, dims)
+        dist = np.sum((p - (origin + (idx + 0.5) * voxel_size)) ** 2, axis=1).astype(np.float32)
+
+        # 같은 voxel 끼리 묶어서 가장 가까운 샘플 하나만 남김
+        order = np.lexsort((dist, flat))
+        flat, dist, theta = flat[order], dist[order], theta[order]
+        first = np.ones(len(flat), dtype=bool)
+        first[1:] = flat[1:] != flat[:-1]
+        flat, dist, theta = flat[first], dist[first], theta[first]
+
+        better = dist < best_dist[flat]
+        best_dist[flat[better]] = dist[better]
+        for cell, th in zip(flat[better].tolist(), theta[better]):
+            best_theta[cell] = th
+        done += count
+        if verbose and (done // chunk_size) % 50 == 0:
+            print(f"  {done:>12d} samples  {len(best_theta)} cells  ({done / (time.perf_counter() - start):,.0f} samples/sec)")
+
+    cells = np.fromiter(best_theta.keys(), dtype=np.int64, count=len(best_theta))
+    cells.sort()
+    index = np.full(n_cells, -1, dtype=np.int32)
+    index[cells] = np.arange(len(cells), dtype=np.int32)
+    configs = np.array([best_theta[c] for c in cells.tolist()], dtype=np.float32).reshape(-1, n)
+
+    dh = {"a": model.a.tolist(), "d": model.d.tolist(), "alpha": model.alpha.tolist()}
+    return ReachabilityMap(index.reshape(dims), configs, origin, voxel_size, dh)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reachability map builder / query")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build")
+    build.add_argument("path")
+    build.add_argument("--a", type=float, nargs="+", default=[0, -0.425, -0.392, 0, 0, 0])
+    build.add_argument("--d", type=float, nargs="+", default=[0.089, 0, 0, 0.109, 0.095, 0.082])
+    build.add_argument("--alpha", type=float, nargs="+", default=[90, 0, 0, 90, -90, 0], help="twist angles (deg)")
+    build.add_argument("--samples", type=int, default=5_000_000)
+    build.add_argument("--voxel", type=float, default=0.02)
+    build.add_argument("--seed", type=int, default=0)
+
+    query = sub.add_parser("query")
+    query.add_argument("path")
+    query.add_argument("point", type=float, nargs=3)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        rmap = build_reachability_map(args.a, args.d, np.radians(args.alpha), n_samples=args.samples,
+                                      voxel_size=args.voxel, seed=args.seed, verbose=True)
+        rmap.save(args.path)
+        print(rmap)
+    else:
+        rmap = ReachabilityMap.load(args.path)
+        config = rmap.configuration(args.point)
+        if config is None:
+            print("unreachable")
+        else:
+            print("reachable, seed config (deg):", np.round(np.degrees(config), 2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# 슬라이더 GUI 용 retained-mode 3D 렌더러
+# plot_robot 은 이벤트마다 ax.cla() 후 링크/legend/장애물 구 표면(np.mgrid)을 전부 새로 그렸음
+# 여기서는
+#   - artist 는 생성 시 한번만 만들고, 이벤트마다 line 데이터와 text 만 바꿈
+#   - 장애물 구 mesh 는 (중심, 반지름) 별로 한번만 계산해서 캐시
+#   - 정적인 배경(축, 장애물, 특이점 표시)은 저장해두고 blitting 으로 움직이는 artist 만 다시 그림
+#     (마우스로 시점을 돌리면 draw_event 에서 배경을 다시 저장)
+#   - 오일러 각은 scipy 대신 rotations.py 로 계산
+#   - FPS / 렌더 지연시간 표시
+#   - profiler (profiling.StageProfiler) 를 주면 오일러 각 / 그리기 단계 시간을 기록하고 p50 / p99 오버레이 표시
+#
+# 사용법 (GUI 없이 렌더 속도 비교)
+# python3 renderer.py --frames 200
+
+import argparse
+import time
+from collections import deque
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from profiling import StageProfiler
+from rotations import matrix_to_euler_zyx
+
+_SPHERE_MESH = {}
+
+def sphere_mesh(center, radius, n_u=20, n_v=10):
+    """장애물 구 표면 (x, y, z), 같은 (center, radius) 는 캐시에서 반환"""
+    key = (tuple(np.asarray(center, dtype=float).tolist()), float(radius), n_u, n_v)
+    mesh = _SPHERE_MESH.get(key)
+    if mesh is None:
+        u, v = np.mgrid[0:2*np.pi:complex(n_u), 0:np.pi:complex(n_v)]
+        mesh = (radius * np.cos(u) * np.sin(v) + key[0][0],
+                radius * np.sin(u) * np.sin(v) + key[0][1],
+                radius * np.cos(v) + key[0][2])
+        _SPHERE_MESH[key] = mesh
+    return mesh
+
+class RobotRenderer:
+    """
+    ax (3d axes) 에 로봇을 그리는 retained-mode 렌더러
+    draw(positions, T, status) 만 이벤트마다 호출하면 됨
+    positions: forward_kinematics 의 관절 원점 list (base 제외), T: end-effector pose
+    status: 제목 자리에 표시할 (문구, 색) 또는 None.
+            None 이면 기존 plot_robot 처럼 특이점 근접 / 충돌 여부로 자동 결정
+    profiler: StageProfiler. 켜져 있으면 "euler" / "draw" 단계를 기록하고 모든 단계의 p50 / p99 를
+              좌하단에 overlay_interval 초마다 갱신
+    """
+
+    def __init__(self, ax, obstacle_center, obstacle_radius, singularity_point,
+                 limits=((-300, 300), (-300, 300), (0, 300)), arrow_length=20, blit=True,
+                 profiler=None, overlay_interval=0.5):
+        self.ax = ax
+        self.fig = ax.figure
+        self.canvas = self.fig.canvas
+        self.singularity_point = np.asarray(singularity_point, dtype=float)
+        self.arrow_length = arrow_length
+        self.blit = blit and self.canvas.supports_blit
+        self._background = None
+        self._frame_times = deque(maxlen=60)
+        self._render_times = deque(maxlen=60)
+        self.profiler = profiler if profiler is not None else StageProfiler(enabled=False)
+        self.overlay_interval = overlay_interval
+        self._overlay_at = 0.0
+
+        # --- 정적 artist ---
+        ax.set_xlim(limits[0])
+        ax.set_ylim(limits[1])
+        ax.set_zlim(limits[2])
+        ax.set_xlabel('X-axis')
+        ax.set_ylabel('Y-axis')
+        ax.set_zlabel('Z-axis')
+        ax.grid(True)
+        ax.plot_surface(*sphere_mesh(obstacle_center, obstacle_radius), color='r', alpha=0.3)
+        sp = self.singularity_point
+        ax.scatter(sp[0], sp[1], sp[2], color='purple', s=100, marker='x', label='Singularity Point')
+        ax.scatter(sp[0], sp[1], sp[2], color='orange', marker='^', s=100, label='Singularity')
+
+        # --- 움직이는 artist (blit 이면 animated 로 두고 직접 그림) ---
+        animated = self.blit
+        self.base_line, = ax.plot([], [], [], 'ro-', animated=animated)
+        self.link_line, = ax.plot([], [], [], 'bo-', animated=animated)
+        self.end_effector, = ax.plot([], [], [], 'o', color='green', animated=animated, label='End-effector')
+        self.z_arrow, = ax.plot([], [], [], color='red', animated=animated)
+        self.title = ax.text2D(0.5, 1.02, "", transform=ax.transAxes, ha='center', animated=animated)
+        self.pose_text = ax.text2D(0.0, 0.98, "", transform=ax.transAxes, va='top', fontsize=8,
+                                   family='monospace', animated=animated)
+        self.fps_text = ax.text2D(1.0, 0.0, "", transform=ax.transAxes, ha='right', fontsize=8,
+                                  family='monospace', animated=animated)
+        self.profile_text = ax.text2D(0.0, 0.0, "", transform=ax.transAxes, va='bottom', fontsize=7,
+                                      family='monospace', animated=animated)
+        self._artists = [self.base_line, self.link_line, self.end_effector, self.z_arrow,
+                         self.title, self.pose_text, self.fps_text, self.profile_text]
+        ax.legend(loc='upper right')
+
+        if self.blit:
+            self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def attach_sliders(self, sliders):
+        """
+        Slider.set_val 은 값이 바뀔 때마다 draw_idle (figure 전체 다시 그리기) 을 부름
+        -> drawon 을 끄고 슬라이더 막대/값 text 도 animated 로 바꿔서 로봇과 같이 blit
+        """
+        if not self.blit:
+            return
+        for slider in sliders:
+            slider.drawon = False
+            for artist in (slider.poly, getattr(slider, '_handle', None), slider.valtext):
+                if artist is not None:
+                    artist.set_animated(True)
+                    self._artists.append(artist)
+        self._background = None
+
+    def _draw_artists(self):
+        for artist in self._artists:
+            artist.axes.draw_artist(artist)
+
+    def _on_draw(self, event):
+        # 전체 다시 그리기(창 크기 변경, 시점 회전) 뒤 배경을 새로 저장하고 움직이는 artist 를 올림
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def set_status(self, text, color='black'):
+        """제목 문구만 바꿈 (로봇은 그대로)"""
+        self.title.set_text(text)
+        self.title.set_color(color)
+        self._present()
+
+    def draw(self, positions, T, status=None, collided=False):
+        start = time.perf_counter()
+        pts = np.asarray(positions, dtype=float)
+        if len(pts):
+            self.base_line.set_data_3d([0, pts[0, 0]], [0, pts[0, 1]], [0, pts[0, 2]])
+            self.link_line.set_data_3d(pts[:, 0], pts[:, 1], pts[:, 2])
+            ee = pts[-1]
+            self.end_effector.set_data_3d([ee[0]], [ee[1]], [ee[2]])
+            tip = ee + self.arrow_length * np.asarray(T)[:3, 2]
+            self.z_arrow.set_data_3d([ee[0], tip[0]], [ee[1], tip[1]], [ee[2], tip[2]])
+            with self.profiler.stage("euler"):
+                orientation = matrix_to_euler_zyx(np.asarray(T)[:3, :3], extrinsic=True, degrees=True)
+            self.pose_text.set_text(f"Pos: ({ee[0]:.2f}, {ee[1]:.2f}, {ee[2]:.2f})\n"
+                                    f"Ori: ({orientation[2]:.2f}, {orientation[0]:.2f}, {orientation[1]:.2f})")
+            if status is None:
+                if collided:
+                    status = ("⚠️ COLLISION DETECTED!", 'red')
+                elif np.linalg.norm(ee - self.singularity_point) < 10:  # 10cm 이내 경고
+                    status = ("⚠️ NEAR SINGULARITY!", 'orange')
+        text, color = status if status is not None else ("", 'black')
+        self.title.set_text(text)
+        self.title.set_color(color)
+        with self.profiler.stage("draw"):
+            self._present()
+        self._render_times.append(time.perf_counter() - start)
+
+    def _present(self):
+        now = time.perf_counter()
+        self._frame_times.append(now)
+        fps, latency = self.stats()
+        self.fps_text.set_text(f"{fps:5.1f} fps | render {latency * 1e3:5.2f} ms")
+        if self.profiler.enabled and now - self._overlay_at >= self.overlay_interval:
+            # percentile 계산은 stage 수 x ring 크기라서 매 프레임 하지 않음
+            self._overlay_at = now
+            self.profile_text.set_text(self.profiler.overlay_text())
+        if not self.blit:
+            self.canvas.draw_idle()
+            return
+        if self._background is None:
+            # 첫 프레임: 전체 그리기 -> _on_draw 에서 배경 저장
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_artists()
+        self.canvas.blit(self.fig.bbox)
+
+    def stats(self):
+        """(최근 프레임 FPS, 평균 draw 시간 초)"""
+        times = self._frame_times
+        fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        latency = sum(self._render_times) / len(self._render_times) if self._render_times else 0.0
+        return fps, latency
+
+def _plot_robot_full(ax, positions, T, obstacle_center, obstacle_radius, singularity_point):
+    # 비교용: 기존 plot_robot 과 같은 방식 (매번 ax.cla() + 전체 다시 그리기)
+    ax.cla()
+    orientation = matrix_to_euler_zyx(T[:3, :3], extrinsic=True, degrees=True)
+    ax.plot([0, positions[0][0]], [0, positions[0][1]], [0, positions[0][2]], 'ro-')
+    for i in range(len(positions) - 1):
+        ax.plot([positions[i][0], positions[i + 1][0]],
+                [positions[i][1], positions[i + 1][1]],
+                [positions[i][2], positions[i + 1][2]], 'bo-')
+    ee = positions[-1]
+    ax.scatter(ee[0], ee[1], ee[2], color='green',
+               label=f'Pos: ({ee[0]:.2f}, {ee[1]:.2f}, {ee[2]:.2f})\nOri: {orientation}')
+    ax.scatter(*singularity_point, color='purple', s=100, marker='x', label='Singularity Point')
+    ax.legend()
+    u, v = np.mgrid[0:2*np.pi:20j, 0:np.pi:10j]
+    ax.plot_surface(obstacle_radius * np.cos(u) * np.sin(v) + obstacle_center[0],
+                    obstacle_radius * np.sin(u) * np.sin(v) + obstacle_center[1],
+                    obstacle_radius * np.cos(v) + obstacle_center[2], color='r', alpha=0.3)
+    ax.set_xlim([-300, 300])
+    ax.set_ylim([-300, 300])
+    ax.set_zlim([0, 300])
+    ax.figure.canvas.draw()
+
+def main():
+    from kinematics import RobotModel
+
+    parser = argparse.ArgumentParser(description="Retained-mode renderer vs ax.cla() redraw")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    plt.switch_backend("Agg")
+    model = RobotModel([0, -42.5, -39.2, 0, 0, 0], [8.9, 0, 0, 10.9, 9.5, 8.2],
+                       [np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+    theta = np.linspace(0, np.pi, args.frames)[:, None] * np.ones(model.n_joints)
+    obstacle_center, obstacle_radius, singularity_point = np.array([0.3, 0, 0.8]), 0.1, np.array([10., 10., 10.])
+
+    fig = plt.figure(figsize=(8, 8))
+    ax = fig.add_subplot(111, projection='3d')
+    t0 = time.perf_counter()
+    for th in theta:
+        T, positions = model.forward_kinematics(th)
+        _plot_robot_full(ax, positions, T, obstacle_center, obstacle_radius, singularity_point)
+    t_full = (time.perf_counter() - t0) / len(theta)
+    plt.close(fig)
+
+    fig = plt.figure(figsize=(8, 8))
+    ax = fig.add_subplot(111, projection='3d')
+    renderer = RobotRenderer(ax, obstacle_center, obstacle_radius, singularity_point)
+    t0 = time.perf_counter()
+    for th in theta:
+        T, positions = model.forward_kinematics(th)
+        renderer.draw(positions, T)
+    t_retained = (time.perf_counter() - t0) / len(theta)
+    plt.close(fig)
+
+    print(f"ax.cla() + full redraw : {t_full * 1e3:7.2f} ms/frame ({1 / t_full:6.1f} fps)")
+    print(f"retained + blit        : {t_retained * 1e3:7.2f} ms/frame ({1 / t_retained:6.1f} fps)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# 회전 표현 변환 (scipy.spatial.transform 없이, numpy 만 사용)
+# 모든 함수는 (..., 3, 3) 행렬 / (..., 3) 각 / (..., 4) quaternion 배열을 한번에 처리
+#
+# ZYX Euler
+#   intrinsic (기본): R = Rz(yaw) Ry(pitch) Rx(roll), [yaw, pitch, roll] 순서
+#                     scipy 'ZYX', olds/ 의 rotation_matrix_to_euler_angles 와 같은 정의
+#   extrinsic=True  : 고정축 z -> y -> x, R = Rx(c) Ry(b) Rz(a), [a, b, c] 순서
+#                     scipy as_euler('zyx') (think.py 가 쓰던 것) 와 같은 정의
+#   gimbal lock (|pitch| = 90°) 에서는 roll = 0 으로 두고 나머지 회전을 yaw 에 몰아줌 (scipy 와 같음)
+# quaternion: [x, y, z, w] (scalar 가 마지막, scipy 와 같은 순서), w >= 0 으로 정규화
+# axis-angle: 회전 벡터 axis * angle (angle ∈ [0, π]), π 근처에서도 축을 안정적으로 복원
+#
+# 사용법 (정확도 / 처리량 측정, scipy 가 있으면 비교)
+# python3 rotations.py --poses 1000000
+
+import argparse
+import time
+
+import numpy as np
+
+_GIMBAL_EPS = 1e-9
+
+# --- Elementary Rotations ---
+def _axis_rotation(angle, axis):
+    c, s = np.cos(angle), np.sin(angle)
+    R = np.zeros(np.shape(angle) + (3, 3))
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    R[..., axis, axis] = 1.0
+    R[..., i, i] = c
+    R[..., j, j] = c
+    R[..., i, j] = -s
+    R[..., j, i] = s
+    return R
+
+# --- ZYX Euler ---
+def euler_zyx_to_matrix(angles, extrinsic=False, degrees=False):
+    """angles (..., 3) -> R (..., 3, 3), 각 순서와 정의는 module 설명 참고"""
+    angles = np.asarray(angles, dtype=float)
+    if degrees:
+        angles = np.radians(angles)
+    a, b, c = angles[..., 0], angles[..., 1], angles[..., 2]
+    if extrinsic:
+        return _axis_rotation(c, 0) @ _axis_rotation(b, 1) @ _axis_rotation(a, 2)
+    return _axis_rotation(a, 2) @ _axis_rotation(b, 1) @ _axis_rotation(c, 0)
+
+def matrix_to_euler_zyx(R, extrinsic=False, degrees=False):
+    """R (..., 3, 3) -> angles (..., 3)"""
+    R = np.asarray(R, dtype=float)
+    if extrinsic:
+        # Rx(c) Ry(b) Rz(a) = (Rz(-a) Ry(-b) Rx(-c))ᵀ -> Rᵀ 의 intrinsic 각에 부호만 바꿈
+        return -matrix_to_euler_zyx(np.swapaxes(R, -1, -2), degrees=degrees)
+    sin_pitch = np.clip(-R[..., 2, 0], -1.0, 1.0)
+    pitch = np.arcsin(sin_pitch)
+    lock = np.abs(sin_pitch) > 1.0 - _GIMBAL_EPS
+    yaw = np.where(lock, np.arctan2(-R[..., 0, 1], R[..., 1, 1]), np.arctan2(R[..., 1, 0], R[..., 0, 0]))
+    roll = np.where(lock, 0.0, np.arctan2(R[..., 2, 1], R[..., 2, 2]))
+    angles = np.stack([yaw, pitch, roll], axis=-1)
+    return np.degrees(angles) if degrees else angles
+
+# --- Quaternion ---
+def quaternion_to_matrix(q):
+    """q (..., 4) [x, y, z, w] (정규화 안돼 있어도 됨) -> R (..., 3, 3)"""
+    q = np.asarray(q, dtype=float)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    x, y, z, w = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    R = np.empty(q.shape[:-1] + (3, 3))
+    R[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    R[..., 0, 1] = 2 * (x * y - z * w)
+    R[..., 0, 2] = 2 * (x * z + y * w)
+    R[..., 1, 0] = 2 * (x * y + z * w)
+    R[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    R[..., 1, 2] = 2 * (y * z - x * w)
+    R[..., 2, 0] = 2 * (x * z - y * w)
+    R[..., 2, 1] = 2 * (y * z + x * w)
+    R[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return R
+
+def matrix_to_quaternion(R):
+    """
+    R (..., 3, 3) -> q (..., 4) [x, y, z, w], w >= 0
+    Shepperd 방식: trace 와 대각 성분 중 가장 큰 것을 기준으로 골라서 나눗셈이 작은 수로 안 떨어지게 함
+    """
+    R = np.asarray(R, dtype=float)
+    m00, m11, m22 = R[..., 0, 0], R[..., 1, 1], R[..., 2, 2]
+    trace = m00 + m11 + m22
+    # 후보 4개: 각각 x, y, z, w 를 기준으로 계산한 (비정규화) quaternion
+    cand = np.empty(R.shape[:-2] + (4, 4))
+    cand[..., 0, :] = np.stack([1 + m00 - m11 - m22, R[..., 0, 1] + R[..., 1, 0],
+                                R[..., 0, 2] + R[..., 2, 0], R[..., 2, 1] - R[..., 1, 2]], axis=-1)
+    cand[..., 1, :] = np.stack([R[..., 0, 1] + R[..., 1, 0], 1 - m00 + m11 - m22,
+                                R[..., 1, 2] + R[..., 2, 1], R[..., 0, 2] - R[..., 2, 0]], axis=-1)
+    cand[..., 2, :] = np.stack([R[..., 0, 2] + R[..., 2, 0], R[..., 1, 2] + R[..., 2, 1],
+                                1 - m00 - m11 + m22, R[..., 1, 0] - R[..., 0, 1]], axis=-1)
+    cand[..., 3, :] = np.stack([R[..., 2, 1] - R[..., 1, 2], R[..., 0, 2] - R[..., 2, 0],
+                                R[..., 1, 0] - R[..., 0, 1], 1 + trace], axis=-1)
+    pivot = np.argmax(np.stack([m00, m11, m22, trace], axis=-1), axis=-1)
+    q = np.take_along_axis(cand, pivot[..., None, None], axis=-2)[..., 0, :]
+    q /= np.linalg.norm(q, axis=-1, keepdims=True)
+    return np.where(q[..., 3:] < 0, -q, q)
+
+# --- Axis-Angle (rotation vector) ---
+def axis_angle_to_matrix(rotvec):
+    """rotvec (..., 3) = axis * angle -> R (..., 3, 3) (Rodrigues)"""
+    rotvec = np.asarray(rotvec, dtype=float)
+    angle = np.linalg.norm(rotvec, axis=-1)
+    small = angle < 1e-8
+    safe = np.where(small, 1.0, angle)
+    # 작은 각에서는 sin(θ)/θ, (1 - cos θ)/θ² 의 Taylor 전개 사용
+    a = np.where(small, 1.0 - angle ** 2 / 6.0, np.sin(angle) / safe)
+    b = np.where(small, 0.5 - angle ** 2 / 24.0, (1.0 - np.cos(angle)) / safe ** 2)
+    x, y, z = rotvec[..., 0], rotvec[..., 1], rotvec[..., 2]
+    K = np.zeros(rotvec.shape[:-1] + (3, 3))
+    K[..., 0, 1], K[..., 0, 2] = -z, y
+    K[..., 1, 0], K[..., 1, 2] = z, -x
+    K[..., 2, 0], K[..., 2, 1] = -y, x
+    return np.eye(3) + a[..., None, None] * K + b[..., None, None] * (K @ K)
+
+def matrix_to_axis_angle(R):
+    """
+    R (..., 3, 3) -> rotvec (..., 3), angle ∈ [0, π]
+    angle 이 π 근처이면 sin 으로 나누는 식이 부정확해서 대칭 부분 R + Rᵀ - 2c I = 2 (1 - c) k kᵀ 에서 축을 복원
+    """
+    R = np.asarray(R, dtype=float)
+    cos_angle = np.clip((np.trace(R, axis1=-2, axis2=-1) - 1.0) / 2.0, -1.0, 1.0)
+    angle = np.arccos(cos_angle)
+    v = np.stack([R[..., 2, 1] - R[..., 1, 2],
+                  R[..., 0, 2] - R[..., 2, 0],
+                  R[..., 1, 0] - R[..., 0, 1]], axis=-1)
+
+    out = np.zeros(v.shape)
+    small = angle < 1e-9
+    near_pi = cos_angle < -0.99
+    regular = ~small & ~near_pi
+    out[regular] = v[regular] * (angle[regular] / (2.0 * np.sin(angle[regular])))[..., None]
+
+    if np.any(near_pi):
+        Rn, c = R[near_pi], cos_angle[near_pi]
+        B = (Rn + np.swapaxes(Rn, -1, -2)) / 2.0 - c[:, None, None] * np.eye(3)   # (1 - c) k kᵀ
+        # 가장 큰 대각 성분의 행을 쓰면 나눗셈이 안정적
+        i = np.argmax(np.diagonal(B, axis1=-2, axis2=-1), axis=-1)
+        rows = np.arange(len(i))
+        k = B[rows, i, :] / np.sqrt((1.0 - c) * B[rows, i, i])[:, None]
+        k /= np.linalg.norm(k, axis=-1, keepdims=True)
+        # k 와 -k 중 반대칭 부분 (2 sin θ k) 과 같은 방향을 고름 (θ = π 면 둘 다 맞음)
+        k *= np.where(np.sum(k * v[near_pi], axis=-1) < 0, -1.0, 1.0)[:, None]
+        out[near_pi] = k * angle[near_pi][:, None]
+    return out
+
+def quaternion_to_axis_angle(q):
+    """q (..., 4) [x, y, z, w] -> rotvec (..., 3)"""
+    q = np.asarray(q, dtype=float)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    q = np.where(q[..., 3:] < 0, -q, q)
+    xyz_norm = np.linalg.norm(q[..., :3], axis=-1)
+    angle = 2.0 * np.arctan2(xyz_norm, q[..., 3])
+    small = xyz_norm < 1e-12
+    scale = np.where(small, 2.0, angle / np.where(small, 1.0, xyz_norm))
+    return q[..., :3] * scale[..., None]
+
+def axis_angle_to_quaternion(rotvec):
+    """rotvec (..., 3) -> q (..., 4) [x, y, z, w]"""
+    rotvec = np.asarray(rotvec, dtype=float)
+    angle = np.linalg.norm(rotvec, axis=-1)
+    small = angle < 1e-8
+    # sin(θ/2)/θ, 작은 각에서는 Taylor 전개
+    scale = np.where(small, 0.5 - angle ** 2 / 48.0, np.sin(angle / 2.0) / np.where(small, 1.0, angle))
+    q = np.empty(rotvec.shape[:-1] + (4,))
+    q[..., :3] = rotvec * scale[..., None]
+    q[..., 3] = np.cos(angle / 2.0)
+    return q
+
+def main():
+    parser = argparse.ArgumentParser(description="Rotation conversion accuracy / throughput")
+    parser.add_argument("--poses", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    q = rng.normal(size=(args.poses, 4))
+    R = quaternion_to_matrix(q)
+    # gimbal lock / π 회전 같은 경계 자세도 섞음
+    edge = euler_zyx_to_matrix([[0.3, np.pi / 2, 0.0], [-1.0, -np.pi / 2, 0.0], [0.0, 0.0, np.pi]])
+    R[:len(edge)] = edge
+
+    conversions = [
+        ("matrix -> euler zyx", lambda: matrix_to_euler_zyx(R)),
+        ("matrix -> quaternion", lambda: matrix_to_quaternion(R)),
+        ("matrix -> axis-angle", lambda: matrix_to_axis_angle(R)),
+    ]
+    for label, fn in conversions:
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        print(f"{label:22s}: {args.poses / dt / 1e6:6.2f} M poses/sec")
+
+    for label, forward, inverse in [
+        ("euler zyx", matrix_to_euler_zyx, euler_zyx_to_matrix),
+        ("euler zyx (extrinsic)", lambda m: matrix_to_euler_zyx(m, extrinsic=True),
+         lambda a: euler_zyx_to_matrix(a, extrinsic=True)),
+        ("quaternion", matrix_to_quaternion, quaternion_to_matrix),
+        ("axis-angle", matrix_to_axis_angle, axis_angle_to_matrix),
+    ]:
+        err = np.max(np.abs(inverse(forward(R)) - R))
+        print(f"round trip {label:22s}: max |ΔR| {err:.1e}")
+
+    try:
+        from scipy.spatial.transform import Rotation
+    except ImportError:
+        return
+    ref = Rotation.from_matrix(R)
+    print("vs scipy: euler ZYX", np.max(np.abs(matrix_to_euler_zyx(R[3:]) - ref[3:].as_euler("ZYX"))),
+          "| quaternion", np.max(np.abs(np.abs(np.sum(matrix_to_quaternion(R) * ref.as_quat(), axis=-1)) - 1)),
+          "| rotvec", np.max(np.abs(matrix_to_axis_angle(R[3:]) - ref[3:].as_rotvec())))
+
+if __name__ == "__main__":
+    main()
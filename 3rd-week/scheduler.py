@@ -0,0 +1,167 @@
+# 슬라이더 이벤트 병합 (coalescing) + 백그라운드 계산
+# Slider.on_changed 는 드래그 중 이벤트를 수십개씩 보내고, 각각이 GUI thread 에서 update() 를 끝까지 돌림
+# -> 이미 지난 값에 대한 계산이 줄줄이 밀림
+#
+# ComputeScheduler
+#   submit(request)  GUI thread: 최신 요청만 한칸짜리 slot 에 덮어씀 (latest wins), 바로 반환
+#   worker thread    slot 에서 꺼내 compute(request) 실행 (FK, 특이점, 충돌 등 numpy 계산)
+#   poll()           GUI thread: 계산이 끝난 가장 최근 결과만 present(result) 로 렌더러에 넘김
+#                    canvas 를 주면 canvas timer 가 주기적으로 poll 을 부름
+# matplotlib artist 는 GUI thread 에서만 건드리고, compute 는 worker 에서만 돌기 때문에
+# RobotModel 같은 내부 버퍼를 쓰는 객체도 worker 하나만 쓰면 안전함
+#
+# coalesce(canvas, callback)
+#   worker 없이 GUI thread 안에서만 병합 (olds/ 스크립트처럼 그리기와 계산이 섞여 있는 경우)
+
+import threading
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+
+class ComputeScheduler:
+    """
+    compute(request) -> result 는 worker thread, present(result) 는 GUI thread 에서 실행
+    요청이 계산보다 빨리 들어오면 중간 요청은 버리고 (dropped_requests),
+    결과가 화면 갱신보다 빨리 나오면 중간 결과를 버림 (dropped_results)
+    """
+
+    def __init__(self, compute, present, canvas=None, interval=15):
+        self.compute = compute
+        self.present = present
+        self._cond = threading.Condition()
+        self._pending = None            # (seq, request, submit 시각)
+        self._result = None             # (seq, result, submit 시각)
+        self._seq = 0
+        self._busy = False
+        self._closed = False
+        self.submitted = 0
+        self.computed = 0
+        self.presented = 0
+        self.dropped_requests = 0
+        self.dropped_results = 0
+        self._latency = deque(maxlen=512)
+        self._compute_time = deque(maxlen=512)
+
+        self._thread = threading.Thread(target=self._run, name="compute-scheduler", daemon=True)
+        self._thread.start()
+        self._timer = None
+        if canvas is not None:
+            self._timer = canvas.new_timer(interval=interval)
+            self._timer.add_callback(self.poll)
+            self._timer.start()
+
+    def __repr__(self):
+        return (f"ComputeScheduler(submitted={self.submitted}, computed={self.computed}, "
+                f"presented={self.presented})")
+
+    # --- GUI thread ---
+    def submit(self, request):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is closed")
+            if self._pending is not None:
+                self.dropped_requests += 1
+            self._seq += 1
+            self._pending = (self._seq, request, time.perf_counter())
+            self.submitted += 1
+            self._cond.notify_all()
+
+    def poll(self):
+        """완료된 최신 결과가 있으면 present 하고 True"""
+        with self._cond:
+            item, self._result = self._result, None
+        if item is None:
+            return False
+        _, result, submitted_at = item
+        self.present(result)
+        self._latency.append(time.perf_counter() - submitted_at)
+        self.presented += 1
+        return True
+
+    def flush(self, timeout=None):
+        """대기 중인 요청 계산이 끝날 때까지 기다린 뒤 poll (timer 가 안도는 headless 환경용)"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            while self._pending is not None or self._busy:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.poll()
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.stop()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self):
+        """카운터 + submit -> present 지연시간 / compute 시간 p50, p99 (초)"""
+        latency = np.array(self._latency) if self._latency else np.zeros(1)
+        compute = np.array(self._compute_time) if self._compute_time else np.zeros(1)
+        return {
+            "submitted": self.submitted,
+            "computed": self.computed,
+            "presented": self.presented,
+            "dropped_requests": self.dropped_requests,
+            "dropped_results": self.dropped_results,
+            "latency_p50": float(np.percentile(latency, 50)),
+            "latency_p99": float(np.percentile(latency, 99)),
+            "compute_p50": float(np.percentile(compute, 50)),
+            "compute_p99": float(np.percentile(compute, 99)),
+        }
+
+    # --- worker thread ---
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                seq, request, submitted_at = self._pending
+                self._pending = None
+                self._busy = True
+            start = time.perf_counter()
+            try:
+                result = self.compute(request)
+            except Exception:
+                # worker 가 죽으면 GUI 가 더이상 갱신되지 않으므로 출력만 하고 계속 돌림
+                traceback.print_exc()
+                result = None
+            elapsed = time.perf_counter() - start
+            with self._cond:
+                self._busy = False
+                if result is not None:
+                    self.computed += 1
+                    self._compute_time.append(elapsed)
+                    if self._result is not None:
+                        self.dropped_results += 1
+                    self._result = (seq, result, submitted_at)
+                self._cond.notify_all()
+
+def coalesce(canvas, callback, interval=10):
+    """
+    slider.on_changed(coalesce(fig.canvas, update)) 처럼 사용
+    이벤트는 값만 저장하고, 단발 timer 가 GUI thread 에서 가장 최근 값으로 callback 을 한번만 호출
+    """
+    timer = canvas.new_timer(interval=interval)
+    timer.single_shot = True
+    latest = []
+
+    def fire():
+        if latest:
+            val = latest.pop()
+            callback(val)
+
+    def on_event(val):
+        if not latest:
+            timer.start()
+        latest[:] = [val]
+
+    timer.add_callback(fire)
+    return on_event
@@ -0,0 +1,305 @@
+# 슬라이더 세션 기록 + GUI 없이 재생
+# think.py / eva-centi.py 가 느려지는 상황은 누가 어떻게 드래그했는지에 달려 있어서 재현이 어려움
+# -> 슬라이더 이벤트를 (시각, 관절 index, 값) 으로 바이너리 파일에 기록하고, 같은 이벤트열을
+#    GUI 없이 같은 계산 파이프라인에 다시 넣어서 이벤트별 지연시간을 봄
+#    (파이프라인은 header 의 source 에 맞춰 pipeline.py 에서 고름: think.py / eva-centi.py)
+#
+# 파일 형식 (little endian)
+#   magic b"RSES" | version u16 | header 길이 u32 | header JSON (utf-8)
+#   이후 이벤트 레코드 반복: t f8 (기록 시작부터 초) | joint u2 | value f8 (슬라이더 값, 도)  = 18 byte
+#   header: a / d / alpha(rad) / initial(도) / spheres / boxes / singularity_point / source / created
+#   (obstacle 형식은 headless.py 의 장애물 JSON 과 같음)
+#
+# 재생
+#   speed 0   : 이벤트마다 compute + present 를 바로 실행 (최대 속도, 병합 없음) -> 순수 처리 시간
+#   speed > 0 : 기록된 시각 / speed 에 맞춰 ComputeScheduler 로 submit, 현재 thread 가 GUI thread 처럼 poll
+#               -> 실제 GUI 와 같이 밀린 이벤트는 병합되고 지연시간은 submit -> present
+#   render    : Agg canvas 에 RobotRenderer 로 그림 (없으면 계산만)
+#
+# 사용법
+# THINK_RECORD=drag.rses python3 think.py                # GUI 에서 기록
+# python3 session_log.py info drag.rses
+# python3 session_log.py replay drag.rses --speed 0      # 최대 속도
+# python3 session_log.py replay drag.rses --render --profile stages.json
+# python3 session_log.py synthesize drag.rses --events 2000   # 테스트용 가짜 세션 (드래그 흉내)
+
+import argparse
+import atexit
+import json
+import struct
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+MAGIC = b"RSES"
+VERSION = 1
+_PREAMBLE = struct.Struct("<4sHI")
+EVENT_DTYPE = np.dtype([("t", "<f8"), ("joint", "<u2"), ("value", "<f8")])
+
+# --- Recording ---
+class SessionRecorder:
+    """
+    GUI thread 에서 record(joint, value) 만 부름. 이벤트는 미리 잡아둔 structured 배열에 쌓고
+    flush_every 개마다 파일에 씀 (콜백에서는 배열 한 칸 쓰기뿐). close() 또는 종료 시 나머지 저장
+    """
+
+    def __init__(self, path, model, initial=None, spheres=(), boxes=(), singularity_point=None,
+                 source=None, flush_every=256):
+        self.path = path
+        initial = np.zeros(model.n_joints) if initial is None else np.asarray(initial, dtype=float)
+        header = {"a": model.a.tolist(), "d": model.d.tolist(), "alpha": model.alpha.tolist(),
+                  "initial": initial.tolist(), "spheres": np.asarray(spheres, dtype=float).tolist(),
+                  "boxes": np.asarray(boxes, dtype=float).tolist(),
+                  "singularity_point": None if singularity_point is None
+                  else np.asarray(singularity_point, dtype=float).tolist(),
+                  "source": source, "created": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        blob = json.dumps(header).encode()
+        self._file = open(path, "wb")
+        self._file.write(_PREAMBLE.pack(MAGIC, VERSION, len(blob)))
+        self._file.write(blob)
+        self._buffer = np.zeros(flush_every, dtype=EVENT_DTYPE)
+        self._used = 0
+        self.count = 0
+        self._t0 = time.perf_counter()
+        atexit.register(self.close)
+
+    def __repr__(self):
+        return f"SessionRecorder({self.path!r}, events={self.count})"
+
+    def record(self, joint, value, t=None):
+        """t: 기록 시작부터 초. None 이면 지금"""
+        row = self._buffer[self._used]
+        row["t"] = time.perf_counter() - self._t0 if t is None else t
+        row["joint"] = joint
+        row["value"] = value
+        self._used += 1
+        self.count += 1
+        if self._used == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        if self._file is None:
+            return
+        self._file.write(self._buffer[:self._used].tobytes())
+        self._file.flush()
+        self._used = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+def load_session(path):
+    """-> dict header (JSON), events (E,) EVENT_DTYPE"""
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{path}: not a session log (too short)")
+        magic, version, length = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a session log")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported session log version {version}")
+        header = json.loads(f.read(length).decode())
+        data = f.read()
+    # 기록 중에 죽은 파일이면 마지막 불완전 레코드는 버림
+    usable = len(data) // EVENT_DTYPE.itemsize * EVENT_DTYPE.itemsize
+    events = np.frombuffer(data[:usable], dtype=EVENT_DTYPE)
+    if len(events) and int(events["joint"].max()) >= len(header["a"]):
+        raise ValueError(f"{path}: event joint index out of range")
+    return {"header": header, "events": events}
+
+def joint_states(session):
+    """이벤트마다 그 시점의 전체 슬라이더 값 (E, n) 도. GUI 의 theta_degrees 와 같음"""
+    events = session["events"]
+    states = np.empty((len(events), len(session["header"]["a"])))
+    current = np.array(session["header"]["initial"], dtype=float)
+    for k, (joint, value) in enumerate(zip(events["joint"].tolist(), events["value"].tolist())):
+        current[joint] = value
+        states[k] = current
+    return states
+
+def synthesize(path, model, events=2000, rate=120.0, seed=0, **scene):
+    """
+    테스트용 세션: 관절 하나를 잡고 rate Hz 로 부드럽게 끌다가 잠깐 쉬고 다른 관절로 넘어가는 드래그
+    """
+    rng = np.random.default_rng(seed)
+    recorder = SessionRecorder(path, model, source="synthesize", **scene)
+    values = np.zeros(model.n_joints)
+    t = 0.0
+    written = 0
+    while written < events:
+        joint = int(rng.integers(model.n_joints))
+        steps = int(min(rng.integers(20, 200), events - written))
+        target = rng.uniform(-180.0, 180.0)
+        path_values = values[joint] + (target - values[joint]) * np.sin(np.linspace(0, np.pi / 2, steps))
+        for value in path_values:
+            t += rng.exponential(1.0 / rate)
+            recorder.record(joint, value, t)
+        values[joint] = path_values[-1]
+        written += steps
+        t += rng.uniform(0.2, 1.0)
+    recorder.close()
+    return recorder.count
+
+# --- Replay ---
+def build_pipeline(header, render=False, profiler=None):
+    """
+    header -> (compute, present). 기록한 스크립트 (header source) 의 pipeline.py 파이프라인을 그대로 씀
+    (think.py / eva-centi.py, 그 외 source (synthesize 등) 는 think.py)
+    """
+    from collision import Scene
+    from kinematics import KinematicState, RobotModel
+    from pipeline import PIPELINES
+    from singularity import SingularityChecker, SingularityMap
+
+    factory = PIPELINES.get(header.get("source"), PIPELINES["think.py"])
+    model = RobotModel(header["a"], header["d"], header["alpha"])
+    state = KinematicState(model)
+    # 재생은 처음부터 같은 격자로 (GUI 의 background 생성은 타이밍에 따라 결과가 달라짐)
+    singularity = SingularityChecker(SingularityMap.load_or_build(model), threshold=1e3)
+    scene = Scene()
+    spheres = np.asarray(header.get("spheres") or np.zeros((0, 4)), dtype=float).reshape(-1, 4)
+    boxes = np.asarray(header.get("boxes") or np.zeros((0, 6)), dtype=float).reshape(-1, 6)
+    if len(spheres):
+        scene.add_spheres(spheres[:, :3], spheres[:, 3])
+    if len(boxes):
+        scene.add_boxes(boxes[:, :3], boxes[:, 3:])
+
+    renderer = None
+    if render:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        from renderer import RobotRenderer
+
+        fig = plt.figure(figsize=(8, 8))
+        point = header.get("singularity_point") or [0.0, 0.0, 0.0]
+        center, radius = (spheres[0, :3], spheres[0, 3]) if len(spheres) else (np.zeros(3), 0.0)
+        renderer = RobotRenderer(fig.add_subplot(211, projection='3d'), center, radius, point, profiler=profiler)
+    return factory(state, scene, singularity, renderer, profiler)
+
+def replay(session, speed=1.0, render=False, profiler=None):
+    """
+    이벤트열을 파이프라인에 다시 넣음
+    -> dict events, presented, dropped, wall_time, latency (E,) 초 (병합돼서 표시 안된 이벤트는 nan)
+    """
+    if speed < 0:
+        raise ValueError("speed must be >= 0 (0 = as fast as possible)")
+    compute, present = build_pipeline(session["header"], render, profiler)
+    states = np.radians(joint_states(session))
+    times = session["events"]["t"]
+    latency = np.full(len(states), np.nan)
+    present = present or (lambda result: None)
+
+    start = time.perf_counter()
+    if speed == 0:
+        for k, theta in enumerate(states):
+            submitted = time.perf_counter()
+            present(compute(theta))
+            latency[k] = time.perf_counter() - submitted
+        return {"events": len(states), "presented": len(states), "dropped": 0,
+                "wall_time": time.perf_counter() - start, "latency": latency}
+
+    from scheduler import ComputeScheduler
+
+    # 요청에 이벤트 번호와 submit 시각을 붙여서 어느 이벤트가 언제 화면에 나왔는지 기록
+    def tagged_compute(request):
+        k, theta, submitted = request
+        return k, submitted, compute(theta)
+
+    def tagged_present(item):
+        k, submitted, result = item
+        present(result)
+        latency[k] = time.perf_counter() - submitted
+
+    scheduler = ComputeScheduler(tagged_compute, tagged_present)
+    t0 = times[0] if len(times) else 0.0
+    try:
+        for k, theta in enumerate(states):
+            due = start + (times[k] - t0) / speed
+            # 다음 이벤트 시각까지 GUI timer 처럼 결과를 poll
+            while True:
+                scheduler.poll()
+                remaining = due - time.perf_counter()
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, 0.001))
+            scheduler.submit((k, theta, time.perf_counter()))
+        scheduler.flush()
+    finally:
+        scheduler.close()
+    return {"events": len(states), "presented": scheduler.presented,
+            "dropped": scheduler.dropped_requests + scheduler.dropped_results,
+            "wall_time": time.perf_counter() - start, "latency": latency}
+
+def latency_report(result):
+    """replay() 결과 -> 표시된 이벤트 지연시간 p50 / p90 / p99 / max (초)"""
+    shown = result["latency"][~np.isnan(result["latency"])]
+    if not len(shown):
+        return {"p50": float("nan"), "p90": float("nan"), "p99": float("nan"), "max": float("nan")}
+    p50, p90, p99 = np.percentile(shown, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(shown.max())}
+
+def main():
+    from kinematics import RobotModel
+    from profiling import StageProfiler
+
+    parser = argparse.ArgumentParser(description="Record / replay slider sessions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="print header and event statistics")
+    info.add_argument("path")
+    play = sub.add_parser("replay", help="feed the recorded events through the compute pipeline")
+    play.add_argument("path")
+    play.add_argument("--speed", type=float, default=1.0, help="1 = recorded timing, 0 = as fast as possible")
+    play.add_argument("--render", action="store_true", help="also draw each result with RobotRenderer (Agg)")
+    play.add_argument("--profile", default=None, help="write per-stage latency JSON here")
+    play.add_argument("--output", default=None, help="write per-event latency (.npy, seconds, nan = dropped)")
+    synth = sub.add_parser("synthesize", help="write a synthetic drag session for a cm-scale UR5")
+    synth.add_argument("path")
+    synth.add_argument("--events", type=int, default=2000)
+    synth.add_argument("--rate", type=float, default=120.0, help="events per second while dragging")
+    synth.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "synthesize":
+        model = RobotModel([0, -42.5, -39.2, 0, 0, 0], [8.9, 0, 0, 10.9, 9.5, 8.2],
+                           [np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+        count = synthesize(args.path, model, args.events, args.rate, args.seed,
+                           spheres=[[30.0, 0.0, 80.0, 10.0]], singularity_point=[10.0, 10.0, 10.0])
+        print(f"wrote {count} events to {args.path}")
+        return
+
+    session = load_session(args.path)
+    header, events = session["header"], session["events"]
+    duration = float(events["t"][-1] - events["t"][0]) if len(events) else 0.0
+    if args.command == "info":
+        print(f"{args.path}: {len(events)} events over {duration:.2f} s, {len(header['a'])} joints, "
+              f"source {header.get('source')!r}, created {header.get('created')}")
+        if len(events):
+            counts = np.bincount(events["joint"], minlength=len(header["a"]))
+            gaps = np.diff(events["t"])
+            print(f"events per joint {counts.tolist()}, "
+                  f"median gap {np.median(gaps) * 1e3 if len(gaps) else 0.0:.2f} ms")
+        return
+
+    profiler = StageProfiler(enabled=args.profile is not None)
+    result = replay(session, args.speed, args.render, profiler)
+    report = latency_report(result)
+    mode = "max speed" if args.speed == 0 else f"{args.speed:g}x recorded timing"
+    print(f"replayed {result['events']} events ({duration:.2f} s recorded) at {mode} in "
+          f"{result['wall_time']:.2f} s, render {'on' if args.render else 'off'}")
+    print(f"presented {result['presented']}, dropped {result['dropped']}")
+    print(f"latency p50 {report['p50'] * 1e3:.3f} ms  p90 {report['p90'] * 1e3:.3f} ms  "
+          f"p99 {report['p99'] * 1e3:.3f} ms  max {report['max'] * 1e3:.3f} ms")
+    if args.profile:
+        print(profiler.overlay_text())
+        profiler.dump(args.profile)
+    if args.output:
+        np.save(args.output, result["latency"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# 순동역학 시뮬레이터 (고정 step 적분)
+# 물리 엔진 없이 제어기 robustness 를 Monte Carlo 로 보려고 만듦
+#   - 팔 B 개 (초기 자세 / 목표가 다른 같은 기종) 의 상태 q, qd 를 (B, n) 배열 하나로 두고 lockstep 으로 적분
+#     -> step 마다 dynamics.DynamicsModel.forward_dynamics (CRBA 질량 행렬 + RNEA bias + batch solve) 한 번
+#   - 적분기: rk4 (step 당 순동역학 4 번, 에너지 보존이 좋음) / semi_implicit_euler (1 번, qd 먼저 갱신 후 q)
+#   - 제어 입력은 step 시작 시점에 controller(t, q, qd) -> tau (B, n) 로 한 번 정하고 step 동안 유지 (zero-order hold,
+#     실제 제어 주기와 같음). torque_limit 를 주면 모터 한계로 자름
+#   - run() 은 달성한 step/s, 팔 x step/s, real-time factor (시뮬레이션 시간 / 벽시계 시간) 를 dict 로 돌려줌
+#   - 제어기가 쓰는 모델과 plant 모델을 따로 줄 수 있음 (perturbed_dynamics: 질량 / 무게중심 / 관성 오차)
+#   - batch 가 작으면 (팔 하나) DynamicsModel 이 자세별 float tuple 경로를 씀 (SMALL_BATCH)
+#
+# 사용법
+# sim = ArmSimulator(plant, q0, dt=1e-3, integrator="rk4",
+#                    controller=pd_gravity_controller(nominal, target, *pid_gains(nominal, target, 5.0),
+#                                                     integral_limit=5.0))
+# stats = sim.run(2000)                 # sim.q, sim.qd 가 2 초 뒤 상태
+#
+# python3 simulator.py                   # 에너지 drift (토크 0) + 적분기별 처리량 + PID+중력보상 Monte Carlo
+# python3 simulator.py --batch 4096 --plants 16 --mass-error 0.2 --integrator semi_implicit_euler
+
+import argparse
+import time
+
+import numpy as np
+
+from dynamics import DynamicsModel, ur5_dynamics
+
+INTEGRATORS = ("rk4", "semi_implicit_euler")
+
+class ArmSimulator:
+    """
+    dynamics: plant 로 쓸 DynamicsModel
+    q0, qd0: (B, n) 또는 (n,) 초기 상태 (qd0 None 이면 0)
+    controller: controller(t, q, qd) -> tau (B, n), None 이면 토크 0
+    torque_limit: None, 스칼라 또는 (n,) -> |tau| 를 그 값으로 자름
+    """
+    __slots__ = ("dynamics", "dt", "integrator", "controller", "torque_limit", "t", "q", "qd", "steps", "_step")
+
+    def __init__(self, dynamics, q0, qd0=None, dt=1e-3, integrator="rk4", controller=None, torque_limit=None):
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"unknown integrator {integrator!r}, expected one of {INTEGRATORS}")
+        if dt <= 0:
+            raise ValueError("dt must be positive")
+        self.dynamics = dynamics
+        self.dt = float(dt)
+        self.integrator = integrator
+        self.controller = controller
+        self.q = np.array(np.atleast_2d(q0), dtype=float)
+        if self.q.shape[1] != dynamics.n_joints:
+            raise ValueError(f"expected {dynamics.n_joints} joint values, got {self.q.shape[1]}")
+        self.qd = np.zeros_like(self.q) if qd0 is None else np.array(np.broadcast_to(qd0, self.q.shape), dtype=float)
+        self.torque_limit = None if torque_limit is None else np.broadcast_to(
+            np.asarray(torque_limit, dtype=float), (dynamics.n_joints,))
+        self.t = 0.0
+        self.steps = 0
+        self._step = self._rk4 if integrator == "rk4" else self._semi_implicit_euler
+
+    def __repr__(self):
+        return (f"ArmSimulator(batch={self.batch}, n_joints={self.dynamics.n_joints}, dt={self.dt}, "
+                f"integrator={self.integrator!r}, t={self.t:.4f})")
+
+    @property
+    def batch(self):
+        return len(self.q)
+
+    # --- Integration ---
+    def torques(self):
+        """현재 상태에서 제어기 출력 (B, n), torque_limit 적용"""
+        if self.controller is None:
+            return np.zeros_like(self.q)
+        tau = np.asarray(self.controller(self.t, self.q, self.qd), dtype=float)
+        if self.torque_limit is not None:
+            tau = np.clip(tau, -self.torque_limit, self.torque_limit)
+        return tau
+
+    def _semi_implicit_euler(self, tau):
+        qdd = self.dynamics.forward_dynamics(self.q, self.qd, tau)
+        self.qd += self.dt * qdd
+        self.q += self.dt * self.qd
+
+    def _rk4(self, tau):
+        fd, dt, q, qd = self.dynamics.forward_dynamics, self.dt, self.q, self.qd
+        a1 = fd(q, qd, tau)
+        v2 = qd + 0.5 * dt * a1
+        a2 = fd(q + 0.5 * dt * qd, v2, tau)
+        v3 = qd + 0.5 * dt * a2
+        a3 = fd(q + 0.5 * dt * v2, v3, tau)
+        v4 = qd + dt * a3
+        a4 = fd(q + dt * v3, v4, tau)
+        self.q = q + dt / 6.0 * (qd + 2.0 * v2 + 2.0 * v3 + v4)
+        self.qd = qd + dt / 6.0 * (a1 + 2.0 * a2 + 2.0 * a3 + a4)
+
+    def step(self):
+        self._step(self.torques())
+        self.steps += 1
+        self.t = self.steps * self.dt
+
+    def run(self, steps, record_every=0):
+        """
+        steps 번 적분 -> dict steps, batch, wall (초), steps_per_s, arm_steps_per_s, real_time_factor
+        record_every > 0 이면 그 간격마다 t (K,), q / qd (K, B, n) 도 포함 (시작 상태 포함)
+        """
+        record = record_every > 0
+        if record:
+            times, qs, qds = [self.t], [self.q.copy()], [self.qd.copy()]
+        start = time.perf_counter()
+        for k in range(1, steps + 1):
+            self.step()
+            if record and k % record_every == 0:
+                times.append(self.t)
+                qs.append(self.q.copy())
+                qds.append(self.qd.copy())
+        wall = time.perf_counter() - start
+        result = {"steps": steps, "batch": self.batch, "wall": wall,
+                  "steps_per_s": steps / wall, "arm_steps_per_s": steps * self.batch / wall,
+                  "real_time_factor": steps * self.dt / wall}
+        if record:
+            result.update(t=np.array(times), q=np.array(qs), qd=np.array(qds))
+        return result
+
+# --- Controllers / Plant Perturbation ---
+def pd_gravity_controller(dynamics, target, kp, kd, ki=0.0, integral_limit=None):
+    """
+    tau = kp e - kd qd + ki ∫e dt + g(q), e = target - q. g 는 제어기가 아는 dynamics (nominal) 로 계산
+    target / kp / kd / ki: (n,) 또는 팔마다 다르게 (B, n)
+    ki 가 있으면 ∫e 는 호출 사이의 t 차이로 누적 (ArmSimulator 는 step 마다 한 번 호출)
+    integral_limit: 스칼라 또는 (n,) -> |ki ∫e| 를 이 토크 이하로 (포화 중 windup 방지)
+    """
+    target = np.asarray(target, dtype=float)
+    kp = np.asarray(kp, dtype=float)
+    kd = np.asarray(kd, dtype=float)
+    ki = np.asarray(ki, dtype=float)
+    use_integral = bool(np.any(ki))
+    integral = None
+    t_prev = None
+
+    def controller(t, q, qd):
+        nonlocal integral, t_prev
+        error = target - q
+        tau = kp * error - kd * qd + dynamics.gravity_torques(q)
+        if use_integral:
+            if integral is None:
+                integral = np.zeros(np.broadcast_shapes(error.shape, ki.shape))
+            elif t > t_prev:
+                integral += error * (t - t_prev)
+            t_prev = t
+            if integral_limit is not None:
+                bound = np.asarray(integral_limit, dtype=float) / np.where(ki > 0, ki, np.inf)
+                np.clip(integral, -bound, bound, out=integral)
+            tau = tau + ki * integral
+        return tau
+    return controller
+
+def pd_gains(dynamics, q, frequency, damping=1.0):
+    """
+    관절마다 고유 진동수 frequency (Hz), 감쇠비 damping 이 되도록 M(q) 대각 성분으로 kp, kd 를 정함
+    (UR5 손목은 어깨보다 관성이 수천 배 작아서 같은 gain 이면 발산하거나 dt 안에서 stiff 해짐)
+    q (B, n) 또는 (n,) -> kp, kd 같은 shape
+    """
+    inertia = np.diagonal(dynamics.mass_matrix(q), axis1=-2, axis2=-1)
+    omega = 2.0 * np.pi * frequency
+    return omega ** 2 * inertia, 2.0 * damping * omega * inertia
+
+def pid_gains(dynamics, q, frequency):
+    """
+    pd_gains 와 같이 M(q) 대각으로 정규화한 PID gain, 관절마다 세 극점을 -ω 에 둠
+    kp = 3 ω² M_jj, kd = 3 ω M_jj, ki = ω³ M_jj
+    (적분항이 plant 모델 오차로 남는 중력 보상 오차를 없앰. 손목처럼 M_jj 가 작은 관절은 kp 가 작아서
+     PD 만으로는 무게중심 mm 단위 오차에도 정상상태 오차가 수 도)
+    """
+    inertia = np.diagonal(dynamics.mass_matrix(q), axis1=-2, axis2=-1)
+    omega = 2.0 * np.pi * frequency
+    return 3.0 * omega ** 2 * inertia, 3.0 * omega * inertia, omega ** 3 * inertia
+
+def perturbed_dynamics(dynamics, rng, mass_error=0.1, com_error=0.01):
+    """
+    질량을 (1 + mass_error x N(0, 1)) 배 (관성 텐서도 같은 비율), 무게중심을 com_error (m) 표준편차로 옮긴 사본
+    """
+    scale = np.clip(1.0 + mass_error * rng.normal(size=dynamics.n_joints), 0.1, None)
+    return DynamicsModel(dynamics.model, dynamics.mass * scale,
+                         dynamics.com + com_error * rng.normal(size=dynamics.com.shape),
+                         dynamics.inertia * scale[:, None, None], dynamics.gravity)
+
+def mechanical_energy(dynamics, q, qd):
+    """(B, n) -> 운동 + 위치 에너지 (B,), 토크 0 시뮬레이션의 적분 오차 확인용"""
+    q = np.atleast_2d(np.asarray(q, dtype=float))
+    qd = np.atleast_2d(np.asarray(qd, dtype=float))
+    kinetic = 0.5 * np.einsum("bi,bij,bj->b", qd, dynamics.mass_matrix(q), qd)
+    T_0i = dynamics.model.frames_batch(q)
+    pc = T_0i[:, 1:, :3, 3] + np.einsum("bnij,nj->bni", T_0i[:, 1:, :3, :3], dynamics.com)
+    return kinetic - (pc @ dynamics.gravity) @ dynamics.mass
+
+def main():
+    parser = argparse.ArgumentParser(description="Lockstep forward-dynamics simulation + controller Monte Carlo")
+    parser.add_argument("--batch", type=int, default=512, help="arms per plant")
+    parser.add_argument("--plants", type=int, default=4, help="perturbed plant models in the Monte Carlo")
+    parser.add_argument("--dt", type=float, default=1e-3)
+    parser.add_argument("--duration", type=float, default=1.0, help="simulated seconds per Monte Carlo run")
+    parser.add_argument("--integrator", choices=INTEGRATORS, default="rk4")
+    parser.add_argument("--mass-error", type=float, default=0.1)
+    parser.add_argument("--com-error", type=float, default=0.01)
+    parser.add_argument("--controller", choices=("pid", "pd"), default="pid",
+                        help="pid: integral action on the gravity-compensation error; pd: PD + gravity only")
+    parser.add_argument("--frequency", type=float, default=5.0, help="closed-loop natural frequency per joint (Hz)")
+    parser.add_argument("--damping", type=float, default=1.0, help="PD damping ratio (--controller pd)")
+    parser.add_argument("--tolerance", type=float, default=np.radians(1.0), help="final joint error for success (rad)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    nominal = ur5_dynamics()
+    n = nominal.n_joints
+    torque_limit = np.array([150.0, 150.0, 150.0, 28.0, 28.0, 28.0])
+
+    # --- 적분 오차: 토크 0, 감쇠 없음 -> 에너지 보존되어야 함 ---
+    q0 = rng.uniform(-np.pi, np.pi, (64, n))
+    for integrator in INTEGRATORS:
+        for dt in (1e-3, 5e-3):
+            sim = ArmSimulator(nominal, q0, dt=dt, integrator=integrator)
+            e0 = mechanical_energy(nominal, sim.q, sim.qd)
+            sim.run(int(round(1.0 / dt)))
+            drift = np.abs(mechanical_energy(nominal, sim.q, sim.qd) - e0)
+            print(f"{integrator:20s} dt {dt * 1e3:.0f} ms, 1 s free fall: energy drift "
+                  f"median {np.median(drift):.1e} J, max {drift.max():.1e} J")
+
+    # --- 처리량: batch 크기별 ---
+    target = np.zeros(n)
+    kp, kd = pd_gains(nominal, target, args.frequency, args.damping)
+    for integrator in INTEGRATORS:
+        for B in (1, 64, 1024, 8192):
+            sim = ArmSimulator(nominal, rng.uniform(-0.5, 0.5, (B, n)), dt=args.dt, integrator=integrator,
+                               controller=pd_gravity_controller(nominal, target, kp, kd))
+            steps = max(5, min(200, int(5e4 / B)))
+            stats = sim.run(steps)
+            print(f"{integrator:20s} batch {B:5d}: {stats['steps_per_s']:8,.0f} steps/s, "
+                  f"{stats['arm_steps_per_s']:11,.0f} arm-steps/s, real-time factor {stats['real_time_factor']:7.2f} "
+                  f"(x{B} arms)")
+
+    # --- Monte Carlo: 제어기는 nominal 모델, plant 는 질량 / 무게중심 오차가 있는 모델 ---
+    steps = int(round(args.duration / args.dt))
+    errors, diverged, wall = [], 0, 0.0
+    for _ in range(args.plants):
+        plant = perturbed_dynamics(nominal, rng, args.mass_error, args.com_error)
+        target = rng.uniform(-np.pi, np.pi, (args.batch, n))
+        start_q = target + rng.normal(0, 0.5, (args.batch, n))
+        if args.controller == "pid":
+            controller = pd_gravity_controller(nominal, target, *pid_gains(nominal, target, args.frequency),
+                                               integral_limit=0.2 * torque_limit)
+        else:
+            controller = pd_gravity_controller(nominal, target, *pd_gains(nominal, target, args.frequency,
+                                                                          args.damping))
+        sim = ArmSimulator(plant, start_q, dt=args.dt, integrator=args.integrator, torque_limit=torque_limit,
+                           controller=controller)
+        with np.errstate(all="ignore"):
+            stats = sim.run(steps)
+        wall += stats["wall"]
+        error = np.abs(sim.q - target)
+        finite = np.isfinite(error).all(axis=1)
+        diverged += int((~finite).sum())
+        errors.append(np.where(finite[:, None], error, np.inf))
+    joint_errors = np.concatenate(errors)
+    errors = joint_errors.max(axis=1)
+    total = len(errors)
+    print(f"Monte Carlo: {args.plants} plants x {args.batch} arms, {args.duration} s at {args.dt * 1e3:g} ms "
+          f"({args.integrator}, {args.controller}), mass error {args.mass_error:.0%}, com error {args.com_error * 1e3:.0f} mm")
+    print(f"  {total * steps / wall:,.0f} arm-steps/s, {total * args.duration / wall:,.1f} simulated arm-seconds per second")
+    print(f"  final max joint error: median {np.degrees(np.median(errors)):.3f} deg, "
+          f"p95 {np.degrees(np.percentile(errors, 95)):.3f} deg; "
+          f"within {np.degrees(args.tolerance):.1f} deg: {np.mean(errors < args.tolerance):.1%}, diverged {diverged}")
+    print(f"  median error per joint (deg): {np.round(np.degrees(np.median(joint_errors, axis=0)), 3).tolist()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# 특이점(singularity) 분석
+# 1) conditioning_metrics: 여러 자세의 Jacobian 에 대해 manipulability, 최소/최대 특이값,
+#    condition number 를 한번에 계산 (batched SVD, 특이값만)
+#    JJᵀ 의 eigvalsh 는 관절이 6 개 미만이면 항상 rank 부족 (σ_min = 0) 이고, 제곱해서 cond 1e7 이상에선 부정확
+# 2) SingularityMap: 관절 공간 격자에 1 / condition number 를 미리 계산해두고
+#    슬라이더 이벤트마다 다선형 보간으로 수 마이크로초 안에 조회, 필요하면 정확히 재확인
+#    격자는 MAX_GRID_CELLS 이하가 되도록 해상도를 낮추고, 자세는 chunk 단위로 만들어서 메모리 일정
+# 3) SingularityChecker.in_background: GUI 시작을 막지 않도록 격자는 thread 에서 만들고
+#    준비될 때까지는 np.linalg.cond(J) 로 정확히 계산
+#
+# 1번 관절(base 회전)은 특이값에 영향이 없고, 마지막 관절도 a_n = 0 이면 영향이 없어서 격자에서 뺌
+# UR5 계열이면 2~5번 관절 4차원 격자만 있으면 됨
+#
+# 사용법
+# python3 singularity.py                 (UR5 테이블로 격자 생성 + 정확도/속도 비교)
+
+import argparse
+import hashlib
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from kinematics import RobotModel
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+# 자유 관절 5 개 (a_n != 0) 면 24^5 ≈ 8M 칸이라 시작 시 수십 초 + GB 단위 메모리 -> 해상도를 낮춤
+MAX_GRID_CELLS = 1_000_000
+
+# --- Batched Metrics ---
+def conditioning_metrics(J):
+    """
+    J: (..., m, n) -> dict (각 값은 (...,)), 특이값은 min(m, n) 개
+        manipulability  특이값의 곱 (n >= m 이면 √det(J Jᵀ), n < m 이면 √det(Jᵀ J))
+        sigma_min, sigma_max  최소/최대 특이값
+        condition       sigma_max / sigma_min (np.linalg.cond 와 같음, 특이하면 inf)
+    """
+    sigma = np.linalg.svd(J, compute_uv=False)
+    sigma_min, sigma_max = sigma[..., -1], sigma[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        condition = np.where(sigma_min > 0, sigma_max / sigma_min, np.inf)
+    return {
+        "manipulability": np.prod(sigma, axis=-1),
+        "sigma_min": sigma_min,
+        "sigma_max": sigma_max,
+        "condition": condition,
+    }
+
+def singularity_metrics_batch(model, theta, chunk_size=32768):
+    """theta (N, n) 자세들에 대한 conditioning_metrics, chunk 단위로 메모리 제한"""
+    theta = np.atleast_2d(np.asarray(theta, dtype=float))
+    out = None
+    for s in range(0, len(theta), chunk_size):
+        J = model.forward_kinematics_jacobian_batch(theta[s:s + chunk_size])[2]
+        metrics = conditioning_metrics(J)
+        if out is None:
+            out = {k: np.empty(len(theta)) for k in metrics}
+        for k, v in metrics.items():
+            out[k][s:s + chunk_size] = v
+    return out
+
+def free_joints(model):
+    """condition number 에 영향이 있는 관절 index (base 관절, a_n = 0 인 마지막 관절 제외)"""
+    joints = list(range(1, model.n_joints))
+    if model.n_joints > 1 and abs(model.a[-1]) < 1e-12:
+        joints.pop()
+    return joints
+
+def grid_resolution(model, resolution, max_cells=MAX_GRID_CELLS):
+    """resolution ^ (자유 관절 수) 가 max_cells 이하가 되도록 낮춘 해상도 (최소 2)"""
+    k = len(free_joints(model))
+    while resolution > 2 and resolution ** k > max_cells:
+        resolution -= 1
+    return resolution
+
+# --- Joint-space Lookup Grid ---
+class SingularityMap:
+    """
+    free_joints 에 대해 [-π, π) 를 resolution 칸으로 나눈 주기 격자에 1 / condition 저장
+    1 / condition (= σ_min / σ_max) 은 특이점에서 0 으로 부드럽게 떨어져서 보간이 잘 됨
+    (log condition 은 특이 격자점 근처에서 튀어서 보간 오차가 큼)
+    조회는 2^k 꼭짓점 다선형 보간. 각 축을 한칸씩 주기적으로 덧붙여 저장해서 조회 시 modulo 없음
+    """
+    __slots__ = ("joints", "resolution", "inv_cond", "_view", "_step", "_strides", "_offsets")
+
+    def __init__(self, joints, resolution, inv_cond):
+        self.joints = list(joints)
+        self.resolution = int(resolution)
+        self.inv_cond = np.ascontiguousarray(inv_cond, dtype=np.float32)
+        k = len(self.joints)
+        padded = np.pad(self.inv_cond, [(0, 1)] * k, mode="wrap")
+        self._view = memoryview(np.ascontiguousarray(padded).reshape(-1))
+        self._step = 2 * math.pi / self.resolution
+        self._strides = [(self.resolution + 1) ** (k - 1 - j) for j in range(k)]
+        # 꼭짓점 순서: 첫 축이 최상위 비트 -> 마지막 축부터 인접한 쌍끼리 보간
+        self._offsets = [sum(((c >> (k - 1 - j)) & 1) * self._strides[j] for j in range(k))
+                         for c in range(2 ** k)]
+
+    def __repr__(self):
+        return f"SingularityMap(joints={self.joints}, resolution={self.resolution})"
+
+    @classmethod
+    def build(cls, model, resolution=24, chunk_size=32768, max_cells=MAX_GRID_CELLS):
+        """격자 칸이 max_cells 를 넘으면 해상도를 낮춤 (grid_resolution). 자세는 chunk 마다 만들어서 계산"""
+        joints = free_joints(model)
+        resolution = grid_resolution(model, resolution, max_cells)
+        shape = (resolution,) * len(joints)
+        n_cells = resolution ** len(joints)
+        axis = -np.pi + np.arange(resolution) * (2 * np.pi / resolution)
+        inv_cond = np.empty(n_cells)
+        theta = np.zeros((min(chunk_size, n_cells), model.n_joints))
+        for s in range(0, n_cells, chunk_size):
+            e = min(s + chunk_size, n_cells)
+            chunk = theta[:e - s]
+            for j, index in zip(joints, np.unravel_index(np.arange(s, e), shape)):
+                chunk[:, j] = axis[index]
+            metrics = singularity_metrics_batch(model, chunk, chunk_size)
+            inv_cond[s:e] = metrics["sigma_min"] / metrics["sigma_max"]
+        return cls(joints, resolution, inv_cond.reshape(shape))
+
+    # --- Persistence ---
+    @staticmethod
+    def cache_key(model, resolution):
+        h = hashlib.sha1()
+        for arr in (model.a, model.d, model.alpha):
+            h.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+        h.update(str(resolution).encode())
+        return h.hexdigest()[:16]
+
+    def save(self, path):
+        np.savez(path, joints=np.array(self.joints), resolution=self.resolution, inv_cond=self.inv_cond)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["joints"].tolist(), int(data["resolution"]), data["inv_cond"])
+
+    @classmethod
+    def load_or_build(cls, model, resolution=24, cache_dir=CACHE_DIR):
+        """DH 테이블 hash 로 캐시 파일을 찾고, 없으면 만들어서 저장"""
+        resolution = grid_resolution(model, resolution)
+        path = os.path.join(cache_dir, f"singularity_{cls.cache_key(model, resolution)}.npz")
+        if os.path.exists(path):
+            return cls.load(path)
+        smap = cls.build(model, resolution)
+        os.makedirs(cache_dir, exist_ok=True)
+        smap.save(path)
+        return smap
+
+    # --- Queries ---
+    def inverse_condition(self, theta):
+        """단일 자세 (n,) 의 보간된 1 / condition, math 만 사용"""
+        if isinstance(theta, np.ndarray):
+            theta = theta.tolist()
+        res, step = self.resolution, self._step
+        base = 0
+        frac = []
+        for j, s in zip(self.joints, self._strides):
+            u = (theta[j] + math.pi) / step
+            i = math.floor(u)
+            frac.append(u - i)
+            base += (i % res) * s
+        view = self._view
+        vals = [view[base + o] for o in self._offsets]
+        for f in reversed(frac):
+            vals = [v0 + (v1 - v0) * f for v0, v1 in zip(vals[0::2], vals[1::2])]
+        return vals[0]
+
+    def condition_number(self, theta):
+        return 1.0 / max(self.inverse_condition(theta), 1e-16)
+
+    def condition_number_batch(self, theta):
+        """theta (N, n) -> (N,) 보간된 condition number"""
+        theta = np.atleast_2d(np.asarray(theta, dtype=float))
+        u = (theta[:, self.joints] + np.pi) / self._step
+        base = np.floor(u)
+        frac = u - base
+        base = (base.astype(np.intp) % self.resolution) @ np.array(self._strides)
+        flat = np.frombuffer(self._view, dtype=np.float32)
+        k = len(self.joints)
+        total = np.zeros(len(theta))
+        for c, offset in enumerate(self._offsets):
+            bits = np.array([(c >> (k - 1 - j)) & 1 for j in range(k)], dtype=bool)
+            w = np.prod(np.where(bits, frac, 1.0 - frac), axis=1)
+            total += w * flat[base + offset]
+        return 1.0 / np.maximum(total, 1e-16)
+
+# --- Interactive Checker ---
+class SingularityChecker:
+    """
+    슬라이더 update() 용 특이점 판정
+    격자 보간값이 threshold 의 [1/margin, margin] 구간에 있을 때만 (애매할 때만)
+    np.linalg.cond(J) 로 정확히 재확인. exact=True 거나 격자가 아직 없으면 (smap None) 항상 정확히 계산
+    """
+
+    def __init__(self, smap, threshold=1e3, margin=3.0):
+        self.smap = smap
+        self.threshold = threshold
+        self.margin = margin
+
+    @classmethod
+    def in_background(cls, model, resolution=24, threshold=1e3, margin=3.0):
+        """격자를 daemon thread 에서 load_or_build, 끝나면 smap 을 채움 (그 전에는 정확히 계산)"""
+        checker = cls(None, threshold, margin)
+
+        def build():
+            checker.smap = SingularityMap.load_or_build(model, resolution)
+        threading.Thread(target=build, name="singularity-map", daemon=True).start()
+        return checker
+
+    def condition_number(self, theta, J=None, exact=False):
+        smap = self.smap
+        if smap is None and J is None:
+            raise ValueError("singularity map is not ready yet; pass J for the exact condition number")
+        if (exact or smap is None) and J is not None:
+            return float(np.linalg.cond(J))
+        cond = smap.condition_number(theta)
+        if J is not None and self.threshold / self.margin < cond < self.threshold * self.margin:
+            return float(np.linalg.cond(J))
+        return cond
+
+    def is_near_singular(self, theta, J=None, exact=False):
+        return self.condition_number(theta, J, exact) > self.threshold
+
+def main():
+    parser = argparse.ArgumentParser(description="Singularity map build / accuracy / speed")
+    parser.add_argument("--resolution", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    model = RobotModel([0, -0.425, -0.392, 0, 0, 0], [0.089, 0, 0, 0.109, 0.095, 0.082],
+                       [np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+    t0 = time.perf_counter()
+    smap = SingularityMap.build(model, args.resolution)
+    print(f"build: {smap} in {time.perf_counter() - t0:.2f} s")
+
+    rng = np.random.default_rng(0)
+    theta = rng.uniform(-np.pi, np.pi, size=(args.queries, model.n_joints))
+    J = model.forward_kinematics_jacobian_batch(theta)[2]
+
+    t0 = time.perf_counter()
+    exact = np.array([np.linalg.cond(j) for j in J])
+    t_exact = (time.perf_counter() - t0) / len(theta)
+    t0 = time.perf_counter()
+    metrics = conditioning_metrics(J)
+    t_batch = (time.perf_counter() - t0) / len(theta)
+    t0 = time.perf_counter()
+    approx = [smap.condition_number(th) for th in theta]
+    t_grid = (time.perf_counter() - t0) / len(theta)
+
+    print(f"np.linalg.cond per config   : {t_exact * 1e6:8.2f} us")
+    print(f"batched metrics per config  : {t_batch * 1e6:8.2f} us "
+          f"(max rel. diff vs cond {np.max(np.abs(metrics['condition'] / exact - 1)):.1e})")
+    print(f"grid lookup per query       : {t_grid * 1e6:8.2f} us")
+    agree = np.mean((np.array(approx) > 1e3) == (exact > 1e3))
+    print(f"grid vs exact agreement on cond > 1e3: {agree * 100:.2f} %")
+
+    checker = SingularityChecker(smap)
+    t0 = time.perf_counter()
+    flags = [checker.is_near_singular(th, j) for th, j in zip(theta, J)]
+    t_check = (time.perf_counter() - t0) / len(theta)
+    agree = np.mean(np.array(flags) == (exact > 1e3))
+    print(f"checker (grid + exact in band) : {t_check * 1e6:8.2f} us, agreement {agree * 100:.2f} %")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+# 대용량 관절각 로그 -> end-effector pose 스트리밍 변환
+# 제어기가 고속으로 남기는 하루치 로그를 forward_kinematics 로 한 줄씩 돌리면 몇 시간 걸리고,
+# headless.analyze 는 결과 배열을 통째로 메모리에 잡음. 여기서는
+#   - 입력은 고정 크기 chunk 로만 읽음: .npy / raw binary 는 파일 offset 으로 바로 읽고,
+#     CSV / 텍스트는 먼저 줄바꿈 위치만 훑어서 chunk 별 byte 범위를 만든 뒤 그 범위만 parse
+#   - chunk 는 process pool 에서 batched FK (RobotModel.forward_kinematics_batch(out=) 버퍼 재사용)
+#   - 결과는 순서대로 출력 파일에 이어 씀. 동시에 떠 있는 chunk 는 workers x 2 개로 제한
+#     -> 메모리는 로그 크기와 무관하게 chunk 크기 x 떠 있는 chunk 수
+#   - .npy 출력은 header 자리를 고정 길이로 잡아두고 끝에서 실제 행 수로 다시 씀
+#   - 진행률 / 처리량 / ETA 는 stderr 에 1초마다
+#
+# 입력 형식 (확장자로 판단)
+#   .npy        (N, n) C-order 배열 (dtype 아무거나, float64 로 변환)
+#   .csv / .txt 한 줄에 관절각 n 개 (',' 또는 공백 구분, '#' 주석, --skip-rows 로 header 건너뜀)
+#   그 외       raw binary, 행 하나 = 관절 n 개 x --dtype (기본 float64), 앞쪽 --header-bytes 건너뜀
+# 출력 (--pose)
+#   matrix   (N, 4, 4) 변환 행렬       position (N, 3)       pose (N, 7) [x, y, z, qx, qy, qz, qw]
+#   .npy / .csv / 그 외 (raw float64)
+#
+# 사용법
+# python3 stream_fk.py robot.txt day.npy -o poses.npy --degrees
+# python3 stream_fk.py robot.txt day.csv -o poses.csv --pose pose --skip-rows 1 --workers 8
+# python3 stream_fk.py robot.txt day.bin -o poses.bin --dtype float32 --chunk-size 16384
+
+import argparse
+import io
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from headless import load_robot_parameters
+from kinematics import RobotModel
+from rotations import matrix_to_quaternion
+
+POSES = {"matrix": (4, 4), "position": (3,), "pose": (7,)}
+_CSV_COLUMNS = {"matrix": [f"t{r}{c}" for r in range(4) for c in range(4)],
+                "position": ["x", "y", "z"], "pose": ["x", "y", "z", "qx", "qy", "qz", "qw"]}
+_NPY_HEADER_BYTES = 128
+
+# --- Input ---
+def _npy_layout(path):
+    """.npy -> (shape, dtype, data offset) (배열은 읽지 않음)"""
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if fortran:
+        raise ValueError(f"{path}: Fortran-order arrays cannot be streamed by rows")
+    if dtype.hasobject:
+        raise ValueError(f"{path}: object arrays are not supported")
+    return shape, dtype, offset
+
+def _newline_offsets(path, start, chunk_size, block_size=1 << 22):
+    """
+    start 이후 chunk_size 줄마다의 byte offset [start, ..., 파일 끝]
+    파일을 block_size 씩만 읽으며 줄바꿈 위치를 셈 (메모리 일정)
+    """
+    offsets = [start]
+    lines = 0
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+            # 이번 block 안에서 chunk 경계가 되는 줄바꿈 (다음 줄의 시작이 경계)
+            first = (-lines - 1) % chunk_size
+            for k in newlines[first::chunk_size]:
+                offsets.append(position + int(k) + 1)
+            lines += len(newlines)
+            position += len(block)
+    if offsets[-1] != position:
+        offsets.append(position)
+    return offsets
+
+def _skip_lines(path, rows):
+    with open(path, "rb") as f:
+        for _ in range(rows):
+            f.readline()
+        return f.tell()
+
+class JointSource:
+    """
+    관절각 로그를 chunk 단위로 읽는 방법. tasks(chunk_size) 는 chunk 마다 작은 tuple 하나,
+    read(f, task) 는 열린 파일에서 그 chunk 만 읽어 (rows, n) float64 로 반환
+    worker process 로 넘길 수 있게 경로 / 형식 정보만 가짐
+    """
+
+    def __init__(self, path, n_joints, dtype="float64", header_bytes=0, skip_rows=0, delimiter=None):
+        self.path = path
+        self.n_joints = n_joints
+        lower = path.lower()
+        if lower.endswith(".npy"):
+            self.kind = "npy"
+            shape, self.dtype, self.offset = _npy_layout(path)
+            if len(shape) != 2 or shape[1] != n_joints:
+                raise ValueError(f"{path}: expected an (N, {n_joints}) array, got {shape}")
+            self.rows = shape[0]
+        elif lower.endswith((".csv", ".txt")):
+            self.kind = "text"
+            self.delimiter = delimiter if delimiter is not None else ("," if lower.endswith(".csv") else None)
+            self.offset = _skip_lines(path, skip_rows)
+            self.rows = None   # 주석 / 빈 줄이 있을 수 있어서 parse 해봐야 앎
+        else:
+            self.kind = "raw"
+            self.dtype = np.dtype(dtype)
+            self.offset = header_bytes
+            row_bytes = self.dtype.itemsize * n_joints
+            payload = os.path.getsize(path) - header_bytes
+            if payload < 0 or payload % row_bytes:
+                raise ValueError(f"{path}: {payload} data bytes is not a multiple of one row "
+                                 f"({n_joints} x {self.dtype})")
+            self.rows = payload // row_bytes
+
+    def __repr__(self):
+        rows = "?" if self.rows is None else f"{self.rows:,}"
+        return f"JointSource({self.path!r}, kind={self.kind}, rows={rows})"
+
+    def tasks(self, chunk_size):
+        if self.kind == "text":
+            offsets = _newline_offsets(self.path, self.offset, chunk_size)
+            return list(zip(offsets[:-1], offsets[1:]))
+        return [(s, min(s + chunk_size, self.rows)) for s in range(0, self.rows, chunk_size)]
+
+    def read(self, f, task):
+        if self.kind == "text":
+            f.seek(task[0])
+            text = f.read(task[1] - task[0]).decode()
+            return np.loadtxt(io.StringIO(text), delimiter=self.delimiter, comments="#",
+                              ndmin=2).reshape(-1, self.n_joints)
+        start, stop = task
+        f.seek(self.offset + start * self.dtype.itemsize * self.n_joints)
+        data = np.fromfile(f, dtype=self.dtype, count=(stop - start) * self.n_joints)
+        return data.reshape(-1, self.n_joints).astype(float, copy=False)
+
+# --- Conversion (worker) ---
+class _ChunkConverter:
+    """worker 하나의 상태: 열린 입력 파일, 모델, chunk 크기 FK 버퍼"""
+
+    def __init__(self, source, dh, pose, degrees, chunk_size):
+        self.source = source
+        self.model = RobotModel(*dh)
+        self.pose = pose
+        self.degrees = degrees
+        self.csv = False
+        self._file = open(source.path, "rb")
+        self._buffers = self.model.buffers(chunk_size)
+
+    def __call__(self, task):
+        theta = self.source.read(self._file, task)
+        if self.degrees:
+            theta = np.radians(theta)
+        rows = len(theta)
+        if rows == self._buffers.batch:
+            T = self.model.forward_kinematics_batch(theta, out=self._buffers).T
+        else:
+            # 마지막 chunk 나 주석 줄이 섞인 텍스트 chunk 는 크기가 달라서 버퍼 없이
+            T = self.model.forward_kinematics_batch(theta)[0]
+        if self.pose == "matrix":
+            out = T.copy()
+        elif self.pose == "position":
+            out = T[:, :3, 3].copy()
+        else:
+            out = np.empty((rows, 7))
+            out[:, :3] = T[:, :3, 3]
+            out[:, 3:] = matrix_to_quaternion(T[:, :3, :3])
+        if self.csv:
+            text = io.StringIO()
+            np.savetxt(text, out.reshape(rows, -1), delimiter=",", fmt="%.17g")
+            return rows, text.getvalue().encode()
+        return out
+
+_converter = None
+
+def _init_worker(source, dh, pose, degrees, chunk_size, csv):
+    global _converter
+    _converter = _ChunkConverter(source, dh, pose, degrees, chunk_size)
+    _converter.csv = csv
+
+def _convert(task):
+    return _converter(task)
+
+# --- Output ---
+def _npy_header(shape):
+    """고정 길이 (_NPY_HEADER_BYTES) .npy v1.0 header. 행 수를 나중에 같은 길이로 다시 씀"""
+    text = repr({"descr": "<f8", "fortran_order": False, "shape": tuple(shape)})
+    length = _NPY_HEADER_BYTES - 10
+    if len(text) + 1 > length:
+        raise ValueError(f"shape {shape} does not fit the reserved .npy header")
+    return b"\x93NUMPY\x01\x00" + length.to_bytes(2, "little") + (text.ljust(length - 1) + "\n").encode()
+
+class PoseWriter:
+    """chunk 결과를 순서대로 이어 씀. .npy 는 close() 때 header 의 행 수를 채움"""
+
+    def __init__(self, path, pose):
+        self.path = path
+        self.pose = pose
+        self.rows = 0
+        lower = path.lower()
+        self.kind = "npy" if lower.endswith(".npy") else "csv" if lower.endswith(".csv") else "raw"
+        self._file = open(path, "wb")
+        if self.kind == "npy":
+            self._file.write(_npy_header((0,) + POSES[pose]))
+        elif self.kind == "csv":
+            self._file.write((",".join(_CSV_COLUMNS[pose]) + "\n").encode())
+
+    def write(self, result):
+        if self.kind == "csv":
+            rows, text = result
+            self._file.write(text)
+        else:
+            rows = len(result)
+            self._file.write(np.ascontiguousarray(result, dtype="<f8").tobytes())
+        self.rows += rows
+
+    def close(self):
+        if self.kind == "npy":
+            self._file.seek(0)
+            self._file.write(_npy_header((self.rows,) + POSES[self.pose]))
+        self._file.close()
+
+# --- Pipeline ---
+def _peak_rss_mb():
+    # ru_maxrss 는 Linux 에서 KB
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return self_kb / 1024, child_kb / 1024
+
+def stream_fk(source, model, output, pose="matrix", degrees=False, chunk_size=8192, workers=None,
+              progress=None):
+    """
+    source (JointSource) 전체를 chunk 단위로 FK 해서 output 파일에 씀
+    workers: process 수 (None 이면 CPU 수, 0 이면 현재 process 에서 순서대로)
+    progress(rows_done, total_rows 또는 None, elapsed): chunk 가 하나 써질 때마다 호출
+    -> dict rows, chunks, seconds, rows_per_sec
+    """
+    if pose not in POSES:
+        raise ValueError(f"unknown pose {pose!r}, expected one of {tuple(POSES)}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    workers = os.cpu_count() if workers is None else workers
+    start = time.perf_counter()
+    tasks = source.tasks(chunk_size)
+    writer = PoseWriter(output, pose)
+    args = (source, model.dh_params(), pose, degrees, chunk_size, writer.kind == "csv")
+    try:
+        if workers == 0:
+            _init_worker(*args)
+            for task in tasks:
+                writer.write(_convert(task))
+                if progress is not None:
+                    progress(writer.rows, source.rows, time.perf_counter() - start)
+        else:
+            window = 2 * workers
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=args) as pool:
+                pending = []
+                for task in tasks:
+                    pending.append(pool.submit(_convert, task))
+                    # 결과는 순서대로만 쓰므로 앞쪽 chunk 가 끝날 때까지 새 chunk 를 더 보내지 않음
+                    while len(pending) >= window:
+                        writer.write(pending.pop(0).result())
+                        if progress is not None:
+                            progress(writer.rows, source.rows, time.perf_counter() - start)
+                for future in pending:
+                    writer.write(future.result())
+                    if progress is not None:
+                        progress(writer.rows, source.rows, time.perf_counter() - start)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return {"rows": writer.rows, "chunks": len(tasks), "seconds": elapsed,
+            "rows_per_sec": writer.rows / max(elapsed, 1e-12)}
+
+class ProgressPrinter:
+    """stderr 에 interval 초마다 한 줄 (같은 줄 덮어쓰기)"""
+
+    def __init__(self, interval=1.0, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self._last = -np.inf
+
+    def __call__(self, rows, total, elapsed):
+        if elapsed - self._last < self.interval and rows != total:
+            return
+        self._last = elapsed
+        rate = rows / max(elapsed, 1e-12)
+        line = f"{rows:,} rows"
+        if total:
+            eta = (total - rows) / rate if rate > 0 else float("inf")
+            line += f" / {total:,} ({rows / total:5.1%}), ETA {eta:6.1f} s"
+        self.stream.write(f"\r{line}, {rate:,.0f} rows/s   ")
+        self.stream.flush()
+
+    def finish(self):
+        self.stream.write("\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream joint-angle logs through batched FK to a pose file")
+    parser.add_argument("robot", help="DH parameter file (.txt table or .json, see headless.py)")
+    parser.add_argument("joints", help="joint log (.npy, .csv/.txt, or raw binary)")
+    parser.add_argument("-o", "--output", required=True, help="pose file (.npy, .csv, or raw float64)")
+    parser.add_argument("--pose", choices=tuple(POSES), default="matrix")
+    parser.add_argument("--degrees", action="store_true", help="joint angles are in degrees")
+    parser.add_argument("--chunk-size", type=int, default=8192)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count, 0: no pool)")
+    parser.add_argument("--dtype", default="float64", help="element type of raw binary logs")
+    parser.add_argument("--header-bytes", type=int, default=0, help="bytes to skip at the start of raw logs")
+    parser.add_argument("--skip-rows", type=int, default=0, help="header lines to skip in text logs")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    model = load_robot_parameters(args.robot)
+    source = JointSource(args.joints, model.n_joints, args.dtype, args.header_bytes, args.skip_rows)
+    printer = None if args.quiet else ProgressPrinter()
+    result = stream_fk(source, model, args.output, args.pose, args.degrees, args.chunk_size, args.workers,
+                       printer)
+    if printer is not None:
+        printer.finish()
+    rss_main, rss_workers = _peak_rss_mb()
+    print(f"{result['rows']:,} rows in {result['chunks']} chunks -> {args.output} ({args.pose}) "
+          f"in {result['seconds']:.2f} s, {result['rows_per_sec']:,.0f} rows/s")
+    print(f"peak RSS: main {rss_main:.0f} MB, largest worker {rss_workers:.0f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
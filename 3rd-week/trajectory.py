@@ -0,0 +1,184 @@
+# 관절 공간 궤적 생성 (cubic / quintic / trapezoidal velocity)
+# 관절 waypoint 들 사이를 구간(segment)별로 잇고, 각 waypoint 에서는 정지 (속도 0, quintic 은 가속도도 0)
+# 구간 시간은 관절별 속도/가속도 한계를 지키는 최소 시간 중 가장 느린 관절에 맞추고
+# 나머지 관절은 같은 시간에 끝나도록 늦춤 (동기화)
+#
+# 평가(evaluate / sample)는 시간 배열 전체를 한번에 계산: 구간 index 는 searchsorted,
+# 위치/속도/가속도는 (샘플 수, 관절 수) 연속 배열. 그대로 forward_kinematics_batch 에 넣을 수 있음
+#
+# 사용법 (이동 1000개 생성 + 1 ms 샘플링 + FK 시간 측정)
+# python3 trajectory.py --moves 1000
+
+import argparse
+import time
+
+import numpy as np
+
+PROFILES = ("cubic", "quintic", "trapezoid")
+
+# 정규화 profile p(s), s ∈ [0, 1] 의 최대 |p'| 와 최대 |p''|
+#   cubic   p = 3s² - 2s³           -> 1.5, 6
+#   quintic p = 10s³ - 15s⁴ + 6s⁵   -> 15/8, 10/√3
+_PEAKS = {"cubic": (1.5, 6.0), "quintic": (15.0 / 8.0, 10.0 / np.sqrt(3.0))}
+
+# --- Minimum Segment Time ---
+def minimum_durations(delta, profile, max_velocity, max_acceleration):
+    """
+    delta (S, n) 구간별 관절 변위 -> (S, n) 관절별 최소 시간
+    """
+    dist = np.abs(delta)
+    if profile == "trapezoid":
+        # 최고 속도에 도달하면 |D|/v + v/a, 못하면 삼각형 profile 2√(|D|/a)
+        cruise = dist >= max_velocity ** 2 / max_acceleration
+        return np.where(cruise, dist / max_velocity + max_velocity / max_acceleration,
+                        2.0 * np.sqrt(dist / max_acceleration))
+    k_vel, k_acc = _PEAKS[profile]
+    return np.maximum(k_vel * dist / max_velocity, np.sqrt(k_acc * dist / max_acceleration))
+
+# --- Trajectory ---
+class Trajectory:
+    """
+    plan_trajectory() 결과. 시간 t 에서 q, qd, qdd 를 벡터화해서 계산
+    t_knots (S + 1,) 각 waypoint 도착 시각, durations (S,) 구간 시간
+    """
+    __slots__ = ("profile", "waypoints", "durations", "t_knots", "max_acceleration", "_delta", "_cruise")
+
+    def __init__(self, profile, waypoints, durations, max_acceleration):
+        self.profile = profile
+        self.waypoints = waypoints
+        self.durations = durations
+        self.t_knots = np.concatenate([[0.0], np.cumsum(durations)])
+        self.max_acceleration = max_acceleration
+        self._delta = np.diff(waypoints, axis=0)
+        self._cruise = None
+        if profile == "trapezoid":
+            # 구간 시간 T 가 정해졌을 때 |D| = v (T - v / a) 를 만족하는 순항 속도 v (작은 근)
+            a = np.broadcast_to(max_acceleration, self._delta.shape)
+            T = durations[:, None]
+            disc = np.maximum(a * a * T * T - 4.0 * a * np.abs(self._delta), 0.0)
+            self._cruise = (a * T - np.sqrt(disc)) / 2.0
+
+    def __repr__(self):
+        return (f"Trajectory(profile={self.profile!r}, segments={len(self.durations)}, "
+                f"duration={self.duration:.3f} s)")
+
+    @property
+    def duration(self):
+        return float(self.t_knots[-1])
+
+    def evaluate(self, t):
+        """t (M,) -> q, qd, qdd 각각 (M, n). 범위 밖의 t 는 양 끝에 고정"""
+        t = np.asarray(t, dtype=float)
+        seg = np.clip(np.searchsorted(self.t_knots, t, side="right") - 1, 0, len(self.durations) - 1)
+        T = self.durations[seg][:, None]
+        tau = np.clip(t - self.t_knots[seg], 0.0, self.durations[seg])[:, None]
+        q0 = self.waypoints[seg]
+        D = self._delta[seg]
+
+        if self.profile == "trapezoid":
+            a = np.broadcast_to(self.max_acceleration, D.shape)
+            v = self._cruise[seg]
+            sign = np.sign(D)
+            ta = v / a
+            rest = T - tau
+            accel = tau < ta
+            decel = rest < ta
+            pos = np.where(accel, 0.5 * a * tau * tau,
+                           np.where(decel, np.abs(D) - 0.5 * a * rest * rest, v * tau - 0.5 * v * ta))
+            vel = np.where(accel, a * tau, np.where(decel, a * rest, v))
+            acc = np.where(accel, a, np.where(decel, -a, 0.0))
+            acc = np.where(v > 0, acc, 0.0)
+            return q0 + sign * pos, sign * vel, sign * acc
+
+        s = tau / T
+        if self.profile == "cubic":
+            p = s * s * (3.0 - 2.0 * s)
+            dp = 6.0 * s * (1.0 - s)
+            ddp = 6.0 - 12.0 * s
+        else:
+            p = s * s * s * (10.0 + s * (-15.0 + 6.0 * s))
+            dp = 30.0 * s * s * (1.0 + s * (-2.0 + s))
+            ddp = 60.0 * s * (1.0 + s * (-3.0 + 2.0 * s))
+        return q0 + D * p, D * dp / T, D * ddp / (T * T)
+
+    def sample(self, dt):
+        """0 .. duration 을 dt 간격으로 (끝점 포함) -> dict t (M,), q / qd / qdd (M, n)"""
+        n_samples = int(np.floor(self.duration / dt + 1e-9)) + 1
+        t = np.arange(n_samples) * dt
+        if t[-1] < self.duration:
+            t = np.append(t, self.duration)
+        q, qd, qdd = self.evaluate(t)
+        return {"t": t, "q": q, "qd": qd, "qdd": qdd}
+
+def plan_trajectory(waypoints, profile="quintic", max_velocity=1.0, max_acceleration=2.0, durations=None):
+    """
+    waypoints (K, n) 라디안, K >= 2
+    max_velocity / max_acceleration: 스칼라 또는 (n,) 관절별 한계 (rad/s, rad/s²)
+    durations: None 이면 한계 안의 최소 시간, 주면 (K - 1,) 또는 스칼라 구간 시간 (한계보다 짧으면 ValueError)
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"unknown profile {profile!r}, expected one of {PROFILES}")
+    waypoints = np.ascontiguousarray(np.atleast_2d(waypoints), dtype=float)
+    if len(waypoints) < 2:
+        raise ValueError("need at least two waypoints")
+    n = waypoints.shape[1]
+    max_velocity = np.broadcast_to(np.asarray(max_velocity, dtype=float), (n,))
+    max_acceleration = np.broadcast_to(np.asarray(max_acceleration, dtype=float), (n,))
+    if np.any(max_velocity <= 0) or np.any(max_acceleration <= 0):
+        raise ValueError("velocity and acceleration limits must be positive")
+
+    delta = np.diff(waypoints, axis=0)
+    t_min = minimum_durations(delta, profile, max_velocity, max_acceleration).max(axis=1)
+    if durations is None:
+        durations = t_min
+    else:
+        durations = np.broadcast_to(np.asarray(durations, dtype=float), t_min.shape).copy()
+        short = np.flatnonzero(durations < t_min * (1 - 1e-9))
+        if len(short):
+            raise ValueError(f"segments {short.tolist()} are shorter than the limits allow "
+                             f"(minimum {np.round(t_min[short], 4).tolist()} s)")
+    # 이동이 없는 구간은 0 으로 나누지 않게 아주 짧은 시간
+    durations = np.maximum(durations, 1e-9)
+    return Trajectory(profile, waypoints, durations, max_acceleration.copy())
+
+def sample_cartesian(model, trajectory, dt):
+    """trajectory.sample(dt) + batched FK -> dict 에 T (M, 4, 4), positions (M, n + 1, 3) 추가"""
+    samples = trajectory.sample(dt)
+    T, positions = model.forward_kinematics_batch(samples["q"])
+    samples["T"] = T
+    samples["positions"] = positions
+    return samples
+
+def main():
+    from kinematics import RobotModel
+
+    parser = argparse.ArgumentParser(description="Trajectory generation + FK sampling throughput")
+    parser.add_argument("--moves", type=int, default=1000)
+    parser.add_argument("--waypoints", type=int, default=3, help="waypoints per move")
+    parser.add_argument("--dt", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = RobotModel([0, -0.425, -0.392, 0, 0, 0], [0.089, 0, 0, 0.109, 0.095, 0.082],
+                       [np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+    rng = np.random.default_rng(args.seed)
+    v_max = np.array([3.15, 3.15, 3.15, 3.2, 3.2, 3.2])
+    a_max = np.full(6, 8.0)
+    moves = rng.uniform(-np.pi, np.pi, (args.moves, args.waypoints, model.n_joints))
+
+    for profile in PROFILES:
+        start = time.perf_counter()
+        n_samples, worst_vel, worst_acc = 0, 0.0, 0.0
+        for wp in moves:
+            traj = plan_trajectory(wp, profile, v_max, a_max)
+            res = sample_cartesian(model, traj, args.dt)
+            n_samples += len(res["t"])
+            worst_vel = max(worst_vel, np.max(np.abs(res["qd"]) / v_max))
+            worst_acc = max(worst_acc, np.max(np.abs(res["qdd"]) / a_max))
+        elapsed = time.perf_counter() - start
+        print(f"{profile:9s}: {elapsed / args.moves * 1e3:6.2f} ms/move "
+              f"({n_samples / args.moves:,.0f} samples + FK each), "
+              f"peak |qd|/v_max {worst_vel:.3f}, peak |qdd|/a_max {worst_acc:.3f}")
+
+if __name__ == "__main__":
+    main()
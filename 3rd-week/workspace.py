@@ -0,0 +1,252 @@
+# Monte Carlo / voxel 기반 작업 공간(workspace) 추정기
+# 1st-Week/End-Effector.py 의 구형 근사 (4/3)πR³ 대신
+# 관절 공간을 샘플링 -> batched FK -> end-effector 위치를 voxel 격자에 표시 -> 점유 voxel 부피 합
+#
+# 사용법
+# python3 workspace.py                                   (UR5 계열 기본 테이블, 1천만 샘플)
+# python3 workspace.py --samples 50000000 --voxel 0.01 --workers 8
+# python3 workspace.py --samples 2000000 --tol 0.005 --max-samples 100000000
+# python3 workspace.py --a 0 -42.5 -39.2 0 0 0 --d 8.9 0 0 10.9 9.5 8.2 --alpha 90 0 0 90 -90 0 --voxel 1
+#
+# 메모리는 voxel 격자 + (workers 수 x chunk 크기) 로 고정, 샘플 수와 무관함
+#
+# 점유 voxel 수는 샘플이 적으면 항상 과소 추정 (아직 안 맞은 voxel). 오차는 두 가지
+#   - sampling_error: 샘플 수를 두 배로 할 때마다 부피 증가분이 일정 비율로 준다고 보고 외삽한 남은 부피
+#   - discretization_error: 경계 voxel 수 x voxel 부피 / 2
+# tol 을 주면 샘플 절반 대비 상대 변화가 tol 이하가 될 때까지 (max_samples 까지) 샘플 수를 두 배씩 늘림
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from kinematics import RobotModel
+
+# --- Grid ---
+def workspace_grid(model, voxel_size):
+    """
+    최대 도달 거리 R 로 [-R, R]^3 을 감싸는 격자
+    returns: origin (3,), dims (3,) voxel 개수
+    """
+    reach = np.sum(np.hypot(model.a, model.d)) + voxel_size
+    dims = np.full(3, int(np.ceil(2 * reach / voxel_size)))
+    origin = np.full(3, -reach)
+    return origin, dims
+
+def mark_voxels(occupancy, points, origin, voxel_size):
+    """points (N, 3) 가 속한 voxel 을 occupancy (dims bool 배열) 에 표시"""
+    dims = np.array(occupancy.shape)
+    idx = np.floor((points - origin) / voxel_size).astype(np.intp)
+    np.clip(idx, 0, dims - 1, out=idx)
+    flat = np.ravel_multi_index(idx.T, occupancy.shape)
+    occupancy.ravel()[flat] = True
+
+# --- Worker ---
+_worker_model = None
+
+def _init_worker(a, d, alpha):
+    global _worker_model
+    _worker_model = RobotModel(a, d, alpha)
+
+def _sample_task(args):
+    """한 task: n_samples 를 chunk 단위로 FK 하고 점유 격자를 packbits 로 반환"""
+    seed, n_samples, chunk_size, joint_limits, origin, dims, voxel_size = args
+    rng = np.random.default_rng(seed)
+    occupancy = np.zeros(dims, dtype=bool)
+    lo, hi = joint_limits[:, 0], joint_limits[:, 1]
+    done = 0
+    while done < n_samples:
+        count = min(chunk_size, n_samples - done)
+        theta = rng.uniform(lo, hi, size=(count, len(lo)))
+        T, _ = _worker_model.forward_kinematics_batch(theta)
+        mark_voxels(occupancy, T[:, :3, 3], origin, voxel_size)
+        done += count
+    return np.packbits(occupancy, axis=None)
+
+def _boundary_voxels(occupancy):
+    """6-이웃 중 하나라도 비어있는 점유 voxel 수 (부피 이산화 오차 추정용)"""
+    padded = np.pad(occupancy, 1)
+    interior = occupancy.copy()
+    for axis in range(3):
+        for shift in (-1, 1):
+            interior &= np.roll(padded, shift, axis=axis)[1:-1, 1:-1, 1:-1]
+    return int(occupancy.sum() - interior.sum())
+
+def _volume_at(history, n_samples):
+    """history 에서 누적 샘플 수가 n_samples 이하인 마지막 부피 (없으면 None)"""
+    volumes = [v for s, v in history if s <= n_samples]
+    return volumes[-1] if volumes else None
+
+def _relative_change(history, sampled):
+    volume, half = _volume_at(history, sampled), _volume_at(history, sampled // 2)
+    if half is None or not volume:
+        return float("nan")
+    return (volume - half) / volume
+
+def _sampling_error(history, sampled):
+    """
+    아직 못 찾은 voxel 의 부피 추정 (부피는 과소 추정이라 한쪽 오차)
+    N/4 -> N/2 -> N 증가분 비율 r 로 이후 증가분을 등비급수로 더함: Δ r / (1 - r). 줄어들지 않으면 inf
+    """
+    v1, v2, v4 = (_volume_at(history, sampled // k) for k in (1, 2, 4))
+    if v2 is None or v4 is None:
+        return float("inf")
+    recent, before = v1 - v2, v2 - v4
+    if recent <= 0:
+        return 0.0
+    if before <= recent:
+        return float("inf")
+    r = recent / before
+    return recent * r / (1 - r)
+
+# --- Estimator ---
+def estimate_workspace(a, d=None, alpha=None, n_samples=10_000_000, voxel_size=0.01,
+                       joint_limits=None, chunk_size=20000, task_size=500_000,
+                       workers=None, seed=0, verbose=False, tol=None, max_samples=None):
+    """
+    Monte Carlo 로 도달 가능한 작업 공간 부피 추정
+    a 에 RobotModel 을 넘기거나 (a, d, alpha) DH 테이블을 넘김
+    joint_limits: (n, 2) 라디안, 기본값 [-π, π]
+    tol: 주면 rel_change <= tol 이 될 때까지 샘플 수를 두 배씩 늘림 (max_samples 까지, 기본 n_samples x 16)
+    returns: dict
+        volume        점유 voxel 부피 합 (단위^3)
+        occupancy     (dims) bool voxel 격자, origin / voxel_size 와 함께 위치 복원
+        history       [(누적 샘플 수, 부피 추정치), ...] 수렴 곡선
+        rel_change    마지막 샘플 수 절반 시점 대비 부피 상대 변화 (수렴 정도)
+        sampling_error        아직 못 찾은 부피의 외삽 (volume 은 이만큼 과소 추정일 수 있음)
+        discretization_error  경계 voxel 수 x voxel 부피 / 2
+        error         sampling_error + discretization_error
+        converged     rel_change <= tol (tol 이 None 이면 None)
+    """
+    model = a if isinstance(a, RobotModel) else RobotModel(a, d, alpha)
+    n = model.n_joints
+    if joint_limits is None:
+        joint_limits = np.tile([-np.pi, np.pi], (n, 1))
+    joint_limits = np.asarray(joint_limits, dtype=float)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    origin, dims = workspace_grid(model, voxel_size)
+    occupancy = np.zeros(dims, dtype=bool)
+    voxel_volume = voxel_size ** 3
+
+    if max_samples is None:
+        max_samples = 16 * n_samples
+    # 수렴 외삽에 N/4, N/2 시점이 필요해서 history 가 최소 8 개는 되도록 task 를 나눔
+    task_size = max(1, min(task_size, -(-n_samples // 8)))
+    seeds = np.random.SeedSequence(seed)
+    target = n_samples
+    submitted = 0
+
+    def next_task():
+        nonlocal submitted
+        if submitted >= target:
+            return None
+        count = min(task_size, target - submitted)
+        submitted += count
+        return (seeds.spawn(1)[0], count, chunk_size, joint_limits, origin, tuple(dims), voxel_size)
+
+    def extend():
+        """아직 수렴하지 않았으면 목표 샘플 수를 두 배로 (max_samples 까지)"""
+        nonlocal target
+        if tol is None or target >= max_samples or _relative_change(history, sampled) <= tol:
+            return False
+        target = min(2 * target, max_samples)
+        if verbose:
+            print(f"  rel. change {_relative_change(history, sampled):.2%} > tol {tol:.2%}: "
+                  f"continuing to {target} samples")
+        return True
+
+    history = []
+    sampled = 0
+    start = time.perf_counter()
+
+    def merge(packed, count):
+        nonlocal sampled
+        occupancy.ravel()[:] |= np.unpackbits(packed, count=occupancy.size).astype(bool)
+        sampled += count
+        history.append((sampled, float(occupancy.sum()) * voxel_volume))
+        if verbose:
+            rate = sampled / (time.perf_counter() - start)
+            print(f"  {sampled:>12d} samples  volume {history[-1][1]:.6g}  ({rate:,.0f} samples/sec)")
+
+    if workers <= 1:
+        _init_worker(model.a, model.d, model.alpha)
+        while True:
+            task = next_task()
+            if task is None:
+                if extend():
+                    continue
+                break
+            merge(_sample_task(task), task[1])
+    else:
+        # 동시에 떠있는 task 는 workers 의 2배까지만: 결과 격자가 쌓이지 않도록
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model.a, model.d, model.alpha)) as pool:
+            pending = {}
+            while True:
+                while len(pending) < 2 * workers:
+                    task = next_task()
+                    if task is None:
+                        break
+                    pending[pool.submit(_sample_task, task)] = task[1]
+                if not pending:
+                    if extend():
+                        continue
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    merge(future.result(), pending.pop(future))
+
+    volume = float(occupancy.sum()) * voxel_volume
+    rel_change = _relative_change(history, sampled)
+    sampling_error = _sampling_error(history, sampled)
+    discretization_error = 0.5 * _boundary_voxels(occupancy) * voxel_volume
+    return {
+        "volume": volume,
+        "occupancy": occupancy,
+        "origin": origin,
+        "voxel_size": voxel_size,
+        "n_samples": sampled,
+        "history": history,
+        "rel_change": rel_change,
+        "sampling_error": sampling_error,
+        "discretization_error": discretization_error,
+        "error": sampling_error + discretization_error,
+        "converged": None if tol is None else bool(rel_change <= tol),
+        "elapsed": time.perf_counter() - start,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo workspace volume estimator")
+    parser.add_argument("--a", type=float, nargs="+", default=[0, -0.425, -0.392, 0, 0, 0])
+    parser.add_argument("--d", type=float, nargs="+", default=[0.089, 0, 0, 0.109, 0.095, 0.082])
+    parser.add_argument("--alpha", type=float, nargs="+", default=[90, 0, 0, 90, -90, 0], help="twist angles (deg)")
+    parser.add_argument("--samples", type=int, default=10_000_000)
+    parser.add_argument("--voxel", type=float, default=0.01, help="voxel edge length (same unit as a, d)")
+    parser.add_argument("--tol", type=float, default=0.01,
+                        help="keep doubling the samples until the half-sample relative change is below this")
+    parser.add_argument("--max-samples", type=int, default=None, help="cap for --tol (default: 16 x --samples)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = RobotModel(args.a, args.d, np.radians(args.alpha))
+    result = estimate_workspace(model, n_samples=args.samples, voxel_size=args.voxel,
+                                workers=args.workers, seed=args.seed, verbose=True,
+                                tol=args.tol, max_samples=args.max_samples)
+
+    sphere = (4/3) * np.pi * np.sum(np.hypot(model.a, model.d)) ** 3
+    print(f"\n 추정 작업 공간 부피 : {result['volume']:.6g} (± {result['error']:.3g}: 샘플링 "
+          f"+{result['sampling_error']:.3g}, voxel 경계 ±{result['discretization_error']:.3g})")
+    print(f" 수렴도 (샘플 절반 대비 상대 변화) : {result['rel_change'] * 100:.3f} %")
+    if not result["converged"]:
+        print(f" 경고: 수렴하지 않음 (상대 변화 > {args.tol:.2%}). 아직 못 찾은 voxel 이 있어 부피는 과소 추정 -> "
+              f"--max-samples 를 늘리거나 --voxel 을 키울 것")
+    print(f" 구형 근사 (4/3)πR³ : {sphere:.6g}  ->  {sphere / result['volume']:.1f}배 과대 추정")
+    print(f" {result['n_samples']} samples, {result['elapsed']:.1f} s")
+
+if __name__ == "__main__":
+    main()